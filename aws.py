@@ -1,6 +1,6 @@
 from videosdk.agents import Agent, AgentSession, Pipeline, function_tool, JobContext, RoomOptions, WorkerJob
-from videosdk.plugins.aws import NovaSonicRealtime, NovaSonicConfig
 
+import os
 import logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", handlers=[logging.StreamHandler()])
 
@@ -20,14 +20,21 @@ You are a helpful voice assistant. Respond to user queries with clear and concis
 
 
 async def start_session(context: JobContext):
-    model = NovaSonicRealtime(
-        model="amazon.nova-sonic-v1:0",
-        config=NovaSonicConfig(
-            voice="tiffany", #  "tiffany","matthew", "amy"
-            temperature=0.7,
-            top_p=0.9
+    if os.getenv("AGENT_MODEL", "").lower() == "fake":
+        # Deterministic offline model for benchmarking (needs the repo root on PYTHONPATH)
+        from fake_models import FakeRealtime
+        model = FakeRealtime()
+    else:
+        # Imported here, so only the job process that runs the model pays for the import
+        from videosdk.plugins.aws import NovaSonicRealtime, NovaSonicConfig
+        model = NovaSonicRealtime(
+            model="amazon.nova-sonic-v1:0",
+            config=NovaSonicConfig(
+                voice="tiffany", #  "tiffany","matthew", "amy"
+                temperature=0.7,
+                top_p=0.9
+            )
         )
-    )
 
 
     pipeline = Pipeline(llm=model)
@@ -1,7 +1,6 @@
 from videosdk.agents import Agent, AgentSession, Pipeline, function_tool, JobContext, RoomOptions, WorkerJob
 
-# Import modules for Google Gemini Realtime
-from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
+# Google Gemini Realtime is imported in start_session, so only the job that runs it pays for the import
 
 # # Import modules for OpenAI Realtime
 # from videosdk.plugins.openai import OpenAIRealtime, OpenAIRealtimeConfig
@@ -10,6 +9,7 @@ from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
 # # Import modules for AWS NovaSonic Realtime
 # from videosdk.plugins.aws import NovaSonicRealtime, NovaSonicConfig
 
+import os
 import logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", handlers=[logging.StreamHandler()])
 
@@ -37,13 +37,20 @@ class MyVoiceAgent(Agent):
 
 
 async def start_session(context: JobContext):
-    model = GeminiRealtime(
-        model="gemini-3.1-flash-live-preview",
-        config=GeminiLiveConfig(
-            voice="Leda", # Puck, Charon, Kore, Fenrir, Aoede, Leda, Orus, and Zephyr.
-            response_modalities=["AUDIO"]
+    if os.getenv("AGENT_MODEL", "").lower() == "fake":
+        # Deterministic offline model for benchmarking (needs the repo root on PYTHONPATH)
+        from fake_models import FakeRealtime
+        model = FakeRealtime()
+    else:
+        # Imported here, so only the job process that runs the model pays for the import
+        from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
+        model = GeminiRealtime(
+            model="gemini-3.1-flash-live-preview",
+            config=GeminiLiveConfig(
+                voice="Leda", # Puck, Charon, Kore, Fenrir, Aoede, Leda, Orus, and Zephyr.
+                response_modalities=["AUDIO"]
+            )
         )
-    )
 
 # # Uncomment the following lines to use OpenAI Realtime
 #     model = OpenAIRealtime(
@@ -0,0 +1,250 @@
+"""
+Deterministic, scriptable stand-ins for the realtime models and LLMs used by the examples.
+
+Set AGENT_MODEL=fake (with the repository root on PYTHONPATH) and every agent in
+basicAgents, fuctionTools, mcp, the root examples and sip_a2a uses these
+instead of GeminiRealtime / OpenAIRealtime / NovaSonicRealtime / OpenAILLM, so
+sessions, tool dispatch and A2A round trips can be benchmarked without network
+access or API keys.
+
+Behaviour is configured through environment variables:
+    FAKE_MODEL_FIRST_TOKEN_MS   Delay before the first token / audio frame (default 300)
+    FAKE_MODEL_TOKENS_PER_SEC   Token rate of replies (default 50)
+    FAKE_MODEL_FRAME_MS         Audio frame cadence of realtime replies (default 20)
+    FAKE_MODEL_SAMPLE_RATE      Sample rate of the (silent) reply audio (default 24000)
+    FAKE_MODEL_TURN_MS          Caller audio that makes up one user turn (default 2000)
+    FAKE_MODEL_SCRIPT           Path to a JSON list of turns, used in order and cycled:
+                                [{"tool": "log_expense_to_google_sheet", "args": {...}}, {"say": "Logged it."}]
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from videosdk.agents import RealtimeBaseModel, LLM, LLMResponse, ChatContext, ChatRole
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REPLY = "Thanks for your question. This is a scripted answer from the fake model."
+
+
+def fake_model_enabled() -> bool:
+    """Whether AGENT_MODEL selects the fake models."""
+    return os.getenv("AGENT_MODEL", "").lower() == "fake"
+
+
+class FakeModelConfig:
+    """Timing and script shared by the fake realtime model and LLM."""
+
+    def __init__(
+        self,
+        first_token_ms: Optional[float] = None,
+        tokens_per_second: Optional[float] = None,
+        frame_ms: Optional[float] = None,
+        sample_rate: Optional[int] = None,
+        turn_ms: Optional[float] = None,
+        script: Optional[List[Dict[str, Any]]] = None,
+    ):
+        """
+        Args:
+            first_token_ms: Delay before the first token or audio frame (env FAKE_MODEL_FIRST_TOKEN_MS)
+            tokens_per_second: Reply token rate (env FAKE_MODEL_TOKENS_PER_SEC)
+            frame_ms: Audio frame cadence (env FAKE_MODEL_FRAME_MS)
+            sample_rate: Reply audio sample rate (env FAKE_MODEL_SAMPLE_RATE)
+            turn_ms: Caller audio per user turn (env FAKE_MODEL_TURN_MS)
+            script: Turns of {"say": text} and/or {"tool": name, "args": {...}} (env FAKE_MODEL_SCRIPT, a JSON file)
+        """
+        self.first_token_ms = first_token_ms if first_token_ms is not None else float(os.getenv("FAKE_MODEL_FIRST_TOKEN_MS", 300))
+        self.tokens_per_second = tokens_per_second if tokens_per_second is not None else float(os.getenv("FAKE_MODEL_TOKENS_PER_SEC", 50))
+        self.frame_ms = frame_ms if frame_ms is not None else float(os.getenv("FAKE_MODEL_FRAME_MS", 20))
+        self.sample_rate = sample_rate if sample_rate is not None else int(os.getenv("FAKE_MODEL_SAMPLE_RATE", 24000))
+        self.turn_ms = turn_ms if turn_ms is not None else float(os.getenv("FAKE_MODEL_TURN_MS", 2000))
+        if script is None:
+            script_path = os.getenv("FAKE_MODEL_SCRIPT")
+            script = _load_script(script_path) if script_path else []
+        self.script = script or [{"say": DEFAULT_REPLY}]
+
+    def turn(self, index: int) -> Dict[str, Any]:
+        return self.script[index % len(self.script)]
+
+
+def _load_script(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        script = json.load(f)
+    if not isinstance(script, list):
+        raise ValueError(f"FAKE_MODEL_SCRIPT {path} must contain a JSON list of turns")
+    return script
+
+
+def _tool_name(tool: Any) -> str:
+    info = getattr(tool, "_tool_info", None)
+    return getattr(info, "name", None) or getattr(tool, "__name__", "")
+
+
+class FakeRealtime(RealtimeBaseModel):
+    """
+    Realtime (speech-to-speech) model that answers every user turn from a script.
+
+    Caller audio is counted, and every ``turn_ms`` of it is a user turn. The reply
+    runs any scripted tool calls against the agent's function tools, then streams
+    silent PCM frames at the configured cadence for as long as the reply text
+    takes at ``tokens_per_second``.
+    """
+
+    def __init__(self, config: Optional[FakeModelConfig] = None):
+        super().__init__()
+        self.config = config or FakeModelConfig()
+        self.audio_track = None
+        self.tools: List[Any] = []
+        self._turn_index = 0
+        self._pending_audio_ms = 0.0
+        self._reply_task: Optional[asyncio.Task] = None
+
+        self.stats: Dict[str, float] = {
+            "turns": 0,
+            "tool_calls": 0,
+            "tool_seconds": 0.0,
+            "frames": 0,
+            "first_frame_seconds": 0.0,
+        }
+
+    def set_agent(self, agent: Any) -> None:
+        self.tools = list(getattr(agent, "tools", None) or [])
+
+    async def connect(self) -> None:
+        logger.info(f"Fake realtime model connected ({len(self.tools)} tools, {len(self.config.script)} scripted turns)")
+
+    async def handle_audio_input(self, audio_data: bytes) -> None:
+        # 16-bit mono PCM at 48 kHz from the room
+        self._pending_audio_ms += len(audio_data) / 2 / 48
+        if self._pending_audio_ms >= self.config.turn_ms:
+            self._pending_audio_ms = 0.0
+            self._start_reply(self.config.turn(self._turn_index))
+            self._turn_index += 1
+
+    async def send_message(self, message: str) -> None:
+        """Speak a given message (session.say)."""
+        self._start_reply({"say": message}, self.current_utterance)
+
+    async def send_text_message(self, message: str) -> None:
+        """Treat typed text as a user turn."""
+        self._start_reply(self.config.turn(self._turn_index))
+        self._turn_index += 1
+
+    async def interrupt(self) -> None:
+        if self._reply_task and not self._reply_task.done():
+            self._reply_task.cancel()
+
+    async def aclose(self) -> None:
+        await self.interrupt()
+
+    def _start_reply(self, turn: Dict[str, Any], utterance=None):
+        if self._reply_task and not self._reply_task.done():
+            self._reply_task.cancel()
+        self._reply_task = asyncio.create_task(self._reply(turn, utterance))
+
+    async def _call_tool(self, name: str, args: Dict[str, Any]):
+        tool = next((t for t in self.tools if _tool_name(t) == name), None)
+        if tool is None:
+            logger.warning(f"Fake realtime model: scripted tool {name} is not registered on the agent")
+            return
+        started_at = time.perf_counter()
+        try:
+            await tool(**args)
+        except Exception as e:
+            logger.error(f"Fake realtime model: tool {name} failed: {e}")
+        self.stats["tool_calls"] += 1
+        self.stats["tool_seconds"] += time.perf_counter() - started_at
+
+    async def _reply(self, turn: Dict[str, Any], utterance=None):
+        started_at = time.perf_counter()
+        self.stats["turns"] += 1
+        await asyncio.sleep(self.config.first_token_ms / 1000)
+
+        if turn.get("tool"):
+            await self._call_tool(turn["tool"], turn.get("args") or {})
+
+        text = turn.get("say") or ""
+        duration = len(text.split()) / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+        frame_seconds = self.config.frame_ms / 1000
+        frame = bytes(int(self.config.sample_rate * frame_seconds) * 2)
+        frames = int(duration / frame_seconds) if frame_seconds > 0 else 0
+
+        next_frame_at = time.perf_counter()
+        for i in range(frames):
+            if i == 0:
+                # Like the real models, report speech when the first audio is produced
+                self.emit("agent_speech_started", {})
+            if self.audio_track is not None:
+                await self.audio_track.add_new_bytes(frame)
+            if i == 0:
+                self.stats["first_frame_seconds"] += time.perf_counter() - started_at
+            self.stats["frames"] += 1
+            next_frame_at += frame_seconds
+            await asyncio.sleep(max(0.0, next_frame_at - time.perf_counter()))
+
+        if self.audio_track is None:
+            # With a track, its last played byte ends the utterance; without one, the reply does
+            self.emit("agent_speech_ended", {})
+            if utterance is not None:
+                utterance._mark_done()
+
+
+class FakeLLM(LLM):
+    """
+    Text LLM that streams scripted replies token by token.
+
+    Turns without a scripted "say" echo the last user message, so answers stay
+    deterministic but distinct per query. Scripted tool turns are returned as a
+    function_call in the response metadata.
+    """
+
+    def __init__(self, config: Optional[FakeModelConfig] = None):
+        super().__init__()
+        self.config = config or FakeModelConfig()
+        self._turn_index = 0
+        self._cancelled = False
+        self.stats: Dict[str, float] = {"requests": 0, "tokens": 0, "first_token_seconds": 0.0}
+
+    @staticmethod
+    def _last_user_message(messages: ChatContext) -> str:
+        for item in reversed(getattr(messages, "items", []) or []):
+            if getattr(item, "role", None) == ChatRole.USER:
+                content = getattr(item, "content", "")
+                return " ".join(content) if isinstance(content, list) else str(content)
+        return ""
+
+    async def chat(self, messages: ChatContext, tools: Optional[List[Any]] = None, **kwargs: Any) -> AsyncIterator[LLMResponse]:
+        started_at = time.perf_counter()
+        self._cancelled = False
+        self.stats["requests"] += 1
+        turn = self.config.turn(self._turn_index)
+        self._turn_index += 1
+
+        await asyncio.sleep(self.config.first_token_ms / 1000)
+        self.stats["first_token_seconds"] += time.perf_counter() - started_at
+
+        if turn.get("tool"):
+            yield LLMResponse(
+                content="",
+                role=ChatRole.ASSISTANT,
+                metadata={"function_call": {"name": turn["tool"], "arguments": turn.get("args") or {}}},
+            )
+            return
+
+        text = turn.get("say") or f"Scripted answer about: {self._last_user_message(messages)}"
+        interval = 1 / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+        for token in text.split():
+            if self._cancelled:
+                return
+            self.stats["tokens"] += 1
+            yield LLMResponse(content=f"{token} ", role=ChatRole.ASSISTANT)
+            await asyncio.sleep(interval)
+
+    async def cancel_current_generation(self) -> None:
+        self._cancelled = True
+
+    async def aclose(self) -> None:
+        self._cancelled = True
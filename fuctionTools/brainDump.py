@@ -11,8 +11,7 @@ import os
 import dotenv
 from videosdk.agents import Agent, AgentSession, Pipeline, function_tool, JobContext, RoomOptions, WorkerJob
 
-# Import modules for Google Gemini Realtime
-from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
+# Google Gemini Realtime is imported in start_session, so only the job that runs it pays for the import
 
 # # Import modules for OpenAI Realtime
 # from videosdk.plugins.openai import OpenAIRealtime, OpenAIRealtimeConfig
@@ -23,8 +22,7 @@ from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
 
 # Google API Client libraries
 from google.oauth2 import service_account # Import for service account
-from googleapiclient.discovery import build as google_build_service
-from googleapiclient.errors import HttpError as GoogleHttpError
+# (googleapiclient is imported inside the tool that uses it)
 
 import logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", handlers=[logging.StreamHandler()])
@@ -97,6 +95,10 @@ class MyVoiceAgent(Agent):
             await self.session.say(error_message)
             return {"status": "error", "message": error_message}
 
+        # The API client is imported on first use; it is slow to import and only this tool needs it
+        from googleapiclient.discovery import build as google_build_service
+        from googleapiclient.errors import HttpError as GoogleHttpError
+
         try:
             service = google_build_service('docs', 'v1', credentials=self.google_creds)
             today_date_str = datetime.now().strftime("%Y-%m-%d %A")
@@ -139,13 +141,20 @@ class MyVoiceAgent(Agent):
 
 
 async def start_session(context: JobContext):
-    model = GeminiRealtime(
-        model="gemini-3.1-flash-live-preview",
-        config=GeminiLiveConfig(
-            voice="Leda", # Puck, Charon, Kore, Fenrir, Aoede, Leda, Orus, and Zephyr.
-            response_modalities=["AUDIO"]
+    if os.getenv("AGENT_MODEL", "").lower() == "fake":
+        # Deterministic offline model for benchmarking (needs the repo root on PYTHONPATH)
+        from fake_models import FakeRealtime
+        model = FakeRealtime()
+    else:
+        # Imported here, so only the job process that runs the model pays for the import
+        from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
+        model = GeminiRealtime(
+            model="gemini-3.1-flash-live-preview",
+            config=GeminiLiveConfig(
+                voice="Leda", # Puck, Charon, Kore, Fenrir, Aoede, Leda, Orus, and Zephyr.
+                response_modalities=["AUDIO"]
+            )
         )
-    )
 
 # # Uncomment the following lines to use OpenAI Realtime
 #     model = OpenAIRealtime(
@@ -1,7 +1,6 @@
 from videosdk.agents import Agent, AgentSession, Pipeline, function_tool, JobContext, RoomOptions, WorkerJob
-from videosdk.plugins.openai import OpenAIRealtime, OpenAIRealtimeConfig
-from openai.types.beta.realtime.session import  TurnDetection
 
+import os
 import logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", handlers=[logging.StreamHandler()])
 
@@ -21,20 +20,28 @@ You are a helpful voice assistant. Respond to user queries with clear and concis
 
 
 async def start_session(context: JobContext):
-    model = OpenAIRealtime(
-    model="gpt-4o-realtime-preview",
-    config=OpenAIRealtimeConfig(
-        voice="alloy", # alloy, ash, ballad, coral, echo, fable, onyx, nova, sage, shimmer, and verse
-        modalities=["text", "audio"],
-        turn_detection=TurnDetection(
-            type="server_vad",
-            threshold=0.5,
-            prefix_padding_ms=300,
-            silence_duration_ms=200,
-        ),
-        tool_choice="auto"
+    if os.getenv("AGENT_MODEL", "").lower() == "fake":
+        # Deterministic offline model for benchmarking (needs the repo root on PYTHONPATH)
+        from fake_models import FakeRealtime
+        model = FakeRealtime()
+    else:
+        # Imported here, so only the job process that runs the model pays for the import
+        from videosdk.plugins.openai import OpenAIRealtime, OpenAIRealtimeConfig
+        from openai.types.beta.realtime.session import TurnDetection
+        model = OpenAIRealtime(
+        model="gpt-4o-realtime-preview",
+        config=OpenAIRealtimeConfig(
+            voice="alloy", # alloy, ash, ballad, coral, echo, fable, onyx, nova, sage, shimmer, and verse
+            modalities=["text", "audio"],
+            turn_detection=TurnDetection(
+                type="server_vad",
+                threshold=0.5,
+                prefix_padding_ms=300,
+                silence_duration_ms=200,
+            ),
+            tool_choice="auto"
+        )
     )
-)
 
     pipeline = Pipeline(llm=model)
     session = AgentSession(
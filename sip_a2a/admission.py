@@ -0,0 +1,189 @@
+import os
+import time
+import heapq
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+ADMITTED = "admitted"
+QUEUED = "queued"
+REJECTED = "rejected"
+
+QUEUE_WAIT_SECONDS = metrics_registry.histogram(
+    "sip_call_queue_wait_seconds",
+    "Time callers spent in the overflow queue before being admitted",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600),
+)
+ADMISSION_DECISIONS = metrics_registry.counter(
+    "sip_admission_decisions_total",
+    "Admission decisions for new calls (admitted, queued, rejected, abandoned)",
+    ["decision"],
+)
+
+
+class AdmissionController:
+    """
+    Caps the number of concurrent calls a server runs agents for.
+
+    Calls beyond the cap wait in a bounded priority queue (known callers
+    first, then arrival order) and are admitted as slots free up. Callers who
+    cannot be queued are rejected. Slots are released when Twilio reports the
+    dialed leg finished, and leases older than ``max_call_seconds`` are
+    reclaimed in case that callback never arrives.
+    """
+
+    def __init__(
+        self,
+        max_active: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_wait: Optional[float] = None,
+        priority_numbers: Optional[Iterable[str]] = None,
+        poll_interval: Optional[float] = None,
+        max_call_seconds: float = 14400,
+    ):
+        """
+        Args:
+            max_active: Concurrent calls allowed (env MAX_CONCURRENT_CALLS)
+            max_queue: Callers allowed to wait for a slot (env CALL_QUEUE_SIZE)
+            max_wait: Seconds a caller may wait before being told to call back (env CALL_QUEUE_MAX_WAIT)
+            priority_numbers: Caller numbers served first (env PRIORITY_CALLERS, comma separated)
+            poll_interval: Seconds between hold-loop polls from Twilio (env CALL_QUEUE_POLL_SECONDS)
+            max_call_seconds: Lease after which an active slot is reclaimed
+        """
+        self.max_active = max_active if max_active is not None else int(os.getenv("MAX_CONCURRENT_CALLS", 20))
+        self.max_queue = max_queue if max_queue is not None else int(os.getenv("CALL_QUEUE_SIZE", 20))
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv("CALL_QUEUE_MAX_WAIT", 300))
+        self.poll_interval = poll_interval if poll_interval is not None else float(os.getenv("CALL_QUEUE_POLL_SECONDS", 10))
+        if priority_numbers is None:
+            priority_numbers = [n.strip() for n in os.getenv("PRIORITY_CALLERS", "").split(",") if n.strip()]
+        self.priority_numbers = set(priority_numbers)
+        self.max_call_seconds = max_call_seconds
+
+        # call_id -> admitted_at
+        self._active: Dict[str, float] = {}
+        # call_id -> (priority, seq, enqueued_at, last_seen)
+        self._waiting: Dict[str, List[float]] = {}
+        self._heap: List[Tuple[int, int, str]] = []
+        self._seq = 0
+
+        metrics_registry.gauge("sip_call_queue_depth", "Callers waiting in the overflow queue").set_function(lambda: len(self._waiting))
+        metrics_registry.gauge("sip_admitted_calls", "Calls currently holding an admission slot").set_function(lambda: len(self._active))
+
+    def free_slots(self) -> int:
+        """Calls that could be admitted right now without queueing (0 while callers are waiting)."""
+        self._expire()
+        if self._waiting:
+            return 0
+        return max(0, self.max_active - len(self._active))
+
+    def is_waiting(self, call_id: str) -> bool:
+        """Whether a call is already in the overflow queue."""
+        return call_id in self._waiting
+
+    def reserve(self) -> Optional[str]:
+        """
+        Take a slot for an outbound call before it is dialed, since its call id is not known yet.
+
+        Returns:
+            A reservation id to confirm() or release(), or None if the server is at capacity
+        """
+        self._expire()
+        if len(self._active) >= self.max_active or self._waiting:
+            return None
+        self._seq += 1
+        reservation = f"reservation-{self._seq}"
+        self._active[reservation] = time.monotonic()
+        return reservation
+
+    def confirm(self, reservation: str, call_id: str):
+        """Hand a reserved slot to the call it was reserved for."""
+        self._active[call_id] = self._active.pop(reservation, None) or time.monotonic()
+        ADMISSION_DECISIONS.inc(decision=ADMITTED)
+
+    def try_admit(self, call_id: str, caller_number: Optional[str] = None) -> str:
+        """
+        Decide what to do with a call, new or polling from the hold loop.
+
+        Returns:
+            ADMITTED, QUEUED or REJECTED
+        """
+        self._expire()
+        now = time.monotonic()
+
+        if call_id in self._active:
+            return ADMITTED
+
+        entry = self._waiting.get(call_id)
+        if entry is not None:
+            entry[3] = now
+            if len(self._active) < self.max_active and self._head() == call_id:
+                self._dequeue(call_id)
+                QUEUE_WAIT_SECONDS.observe(now - entry[2])
+                return self._admit(call_id, now)
+            if now - entry[2] > self.max_wait:
+                self._dequeue(call_id)
+                logger.info(f"Call {call_id} waited {now - entry[2]:.0f}s in queue, rejecting")
+                ADMISSION_DECISIONS.inc(decision=REJECTED)
+                return REJECTED
+            return QUEUED
+
+        if len(self._active) < self.max_active and not self._waiting:
+            return self._admit(call_id, now)
+
+        if len(self._waiting) < self.max_queue:
+            priority = 0 if caller_number in self.priority_numbers else 1
+            self._seq += 1
+            self._waiting[call_id] = [priority, self._seq, now, now]
+            heapq.heappush(self._heap, (priority, self._seq, call_id))
+            logger.info(f"Call {call_id} queued (priority={priority}, depth={len(self._waiting)})")
+            ADMISSION_DECISIONS.inc(decision=QUEUED)
+            return QUEUED
+
+        logger.warning(f"Call {call_id} rejected: {len(self._active)} active, {len(self._waiting)} queued")
+        ADMISSION_DECISIONS.inc(decision=REJECTED)
+        return REJECTED
+
+    def release(self, call_id: str):
+        """Free the slot (or queue place) held by a call."""
+        if self._active.pop(call_id, None) is not None:
+            logger.info(f"Released admission slot for call {call_id} ({len(self._active)} active)")
+        elif call_id in self._waiting:
+            self._dequeue(call_id)
+            ADMISSION_DECISIONS.inc(decision="abandoned")
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": len(self._active),
+            "max_active": self.max_active,
+            "queued": len(self._waiting),
+            "max_queue": self.max_queue,
+        }
+
+    def _admit(self, call_id: str, now: float) -> str:
+        self._active[call_id] = now
+        ADMISSION_DECISIONS.inc(decision=ADMITTED)
+        return ADMITTED
+
+    def _head(self) -> Optional[str]:
+        # Lazily drop heap entries for callers that already left the queue
+        while self._heap and self._heap[0][2] not in self._waiting:
+            heapq.heappop(self._heap)
+        return self._heap[0][2] if self._heap else None
+
+    def _dequeue(self, call_id: str):
+        self._waiting.pop(call_id, None)
+
+    def _expire(self):
+        now = time.monotonic()
+        # Callers that stopped polling have hung up
+        abandoned = [call_id for call_id, entry in self._waiting.items() if now - entry[3] > 3 * self.poll_interval]
+        for call_id in abandoned:
+            self._dequeue(call_id)
+            ADMISSION_DECISIONS.inc(decision="abandoned")
+        stale = [call_id for call_id, admitted_at in self._active.items() if now - admitted_at > self.max_call_seconds]
+        for call_id in stale:
+            logger.warning(f"Reclaiming admission slot of call {call_id} after {self.max_call_seconds}s")
+            self._active.pop(call_id, None)
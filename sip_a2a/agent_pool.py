@@ -0,0 +1,153 @@
+import os
+import time
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineShell:
+    """A pre-built pair of specialist and customer pipelines for one call."""
+
+    __slots__ = ("specialist_pipeline", "customer_pipeline", "created_at", "uses")
+
+    def __init__(self, specialist_pipeline: Any, customer_pipeline: Any):
+        self.specialist_pipeline = specialist_pipeline
+        self.customer_pipeline = customer_pipeline
+        self.created_at = time.monotonic()
+        self.uses = 0
+
+
+class AgentPool:
+    """
+    Pool of pre-built pipeline shells living in the worker process.
+
+    Building the pipelines (model client setup and config validation) is the
+    expensive part of per-call startup, so it is done ahead of time. A call
+    checks a shell out, binds fresh agents and sessions to it, and checks it
+    back in when it ends. Shells are discarded after ``recycle_after`` calls.
+
+    The pool stays inactive until ``start()``: a fresh WorkerJob process runs
+    one call and exits, so shells built there would never be used. Pooled
+    workers start the pool, filling it before they take their first call.
+    """
+
+    def __init__(
+        self,
+        specialist_factory: Optional[Callable[[], Any]],
+        customer_factory: Callable[[], Any],
+        size: Optional[int] = None,
+        recycle_after: Optional[int] = None,
+    ):
+        """
+        Args:
+            specialist_factory: Builds a specialist pipeline, or None when specialists are shared
+            customer_factory: Builds a customer pipeline
+            size: Number of idle shells to keep ready (env AGENT_POOL_SIZE, 0 disables the pool)
+            recycle_after: Calls served before a shell is rebuilt (env AGENT_POOL_RECYCLE_AFTER)
+        """
+        self._specialist_factory = specialist_factory
+        self._customer_factory = customer_factory
+        self.size = size if size is not None else int(os.getenv("AGENT_POOL_SIZE", 1))
+        self.recycle_after = max(1, recycle_after if recycle_after is not None else int(os.getenv("AGENT_POOL_RECYCLE_AFTER", 1)))
+
+        self._idle: List[PipelineShell] = []
+        self._filling = False
+        self._fill_task: Optional[asyncio.Task] = None
+        self.active = False
+
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self.build_failures = 0
+
+    def build(self) -> PipelineShell:
+        """Build a new shell. Raises if the pipeline configuration is invalid."""
+        specialist_pipeline = self._specialist_factory() if self._specialist_factory else None
+        return PipelineShell(specialist_pipeline, self._customer_factory())
+
+    async def start(self):
+        """Activate the pool in a long-lived worker process and fill it."""
+        if self.size <= 0:
+            return
+        self.active = True
+        await self.fill()
+
+    def checkout(self) -> Optional[PipelineShell]:
+        """Take an idle shell, or return None if the pool is empty or inactive."""
+        if not self.active:
+            return None
+        if self._idle:
+            self.hits += 1
+            return self._idle.pop()
+        self.misses += 1
+        return None
+
+    def checkin(self, shell: Optional[PipelineShell]):
+        """Return a shell after a call, recycling it once it has served enough calls."""
+        if shell is None or not self.active:
+            return
+        shell.uses += 1
+        if shell.uses >= self.recycle_after or len(self._idle) >= self.size:
+            self.recycled += 1
+            return
+        self._idle.append(shell)
+
+    async def fill(self):
+        """Build shells until the pool reaches its target size."""
+        if not self.active or self._filling:
+            return
+        self._filling = True
+        try:
+            while len(self._idle) < self.size:
+                try:
+                    self._idle.append(self.build())
+                except Exception as e:
+                    self.build_failures += 1
+                    logger.error(f"Failed to pre-build pipeline shell: {e}")
+                    return
+                # Let the call currently being set up make progress between builds
+                await asyncio.sleep(0)
+            logger.info(f"Agent pool filled ({len(self._idle)} idle shells)")
+        finally:
+            self._filling = False
+
+    def fill_in_background(self) -> Optional[asyncio.Task]:
+        """Start refilling the pool off the caller's path; the task is kept so ``stop()`` can cancel it."""
+        if not self.active or (self._fill_task is not None and not self._fill_task.done()):
+            return self._fill_task
+        self._fill_task = asyncio.create_task(self.fill(), name="agent-pool-fill")
+        self._fill_task.add_done_callback(self._on_fill_done)
+        return self._fill_task
+
+    def _on_fill_done(self, task: asyncio.Task):
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            self.build_failures += 1
+            logger.error(f"Agent pool refill failed: {task.exception()!r}")
+
+    async def stop(self):
+        """Deactivate the pool and cancel a refill still in progress, before the worker exits."""
+        self.active = False
+        task, self._fill_task = self._fill_task, None
+        if task is not None and not task.done():
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        self._idle.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool size and hit/miss counters."""
+        return {
+            "active": self.active,
+            "idle": len(self._idle),
+            "size": self.size,
+            "recycle_after": self.recycle_after,
+            "hits": self.hits,
+            "misses": self.misses,
+            "recycled": self.recycled,
+            "build_failures": self.build_failures,
+        }
@@ -1,16 +1,29 @@
+import time
+import uuid
 import asyncio
 import logging
-from typing import Dict, Any, Optional
+import zlib
+from contextlib import suppress
+from typing import Dict, Any, Optional, Callable, Tuple
 from videosdk.agents import Agent, AgentCard, A2AMessage, function_tool
+from log_pipeline import SAMPLED
+from metrics import registry as metrics_registry, SPECIALIST_ROUND_TRIP_SECONDS, SPECIALIST_FIRST_AUDIO_SECONDS, CALL_FAILURES
 
 logger = logging.getLogger(__name__)
 
 class SIPCustomerServiceAgent(Agent):
     """A SIP-enabled customer service agent that handles voice calls and forwards specialist queries via A2A."""
+
+    # Longest a relayed answer may play before the next one is spoken anyway:
+    # a fixed allowance plus time per word at a slow speaking rate
+    PLAYBACK_TIMEOUT_BASE = 5.0
+    PLAYBACK_SECONDS_PER_WORD = 0.5
     
-    def __init__(self, ctx: Optional[Any] = None):
+    def __init__(self, ctx: Optional[Any] = None, on_status: Optional[Callable[[str], None]] = None):
+        # One customer agent per call; a unique id lets a shared specialist reply to the right call
+        call_id = getattr(ctx, 'call_id', None)
         super().__init__(
-            agent_id="sip_customer_service_1",
+            agent_id=f"sip_customer_service_{call_id}" if call_id else "sip_customer_service_1",
             instructions=(
                 "You are a helpful bank customer service agent handling a phone call. "
                 "Be friendly, professional, and speak naturally as if on the phone. "
@@ -24,9 +37,22 @@ class SIPCustomerServiceAgent(Agent):
             )
         )
         self.ctx = ctx
+        # Reports call lifecycle changes (e.g. "forwarded") to the session registry
+        self.on_status = on_status
         self.call_id = None
         self.caller_number = None
         self.greeting_message = "Hello! Thank you for calling our bank. How can I assist you today?"
+        self.specialist_error_message = "I'm sorry, our loan specialist couldn't answer that right now. Could you ask again in a moment?"
+        # Queries forwarded to specialists that are still awaiting an answer, keyed by request_id
+        self._pending_requests: Dict[str, Dict[str, Any]] = {}
+        # Streamed answers: out-of-order chunks waiting for their turn, per request_id
+        self._chunk_buffers: Dict[str, Dict[str, Any]] = {}
+        # Specialist answers waiting to be spoken, in arrival order: (text, request_id, last part of the answer).
+        # The A2A handlers only enqueue, since the specialist's send_message waits for them to return
+        self._speech_queue: "asyncio.Queue[Tuple[Optional[str], Optional[str], bool]]" = asyncio.Queue()
+        self._speaker_task: Optional[asyncio.Task] = None
+        # Request whose answer is being spoken, so the start of playback can be attributed to it
+        self._speaking_request_id: Optional[str] = None
         
         # Extract call information from context (following SIP plugin pattern)
         if ctx and hasattr(ctx, 'caller_number'):
@@ -41,8 +67,11 @@ class SIPCustomerServiceAgent(Agent):
         """Forward a query to a specialist agent in the specified domain"""
         logger.info(f"Forwarding query to domain '{domain}': '{query}' for call {self.call_id}")
         
-        specialists = self.a2a.registry.find_agents_by_domain(domain)
-        id_of_target_agent = specialists[0] if specialists else None
+        # Pin each call to one specialist so its conversation history stays in one place
+        specialists = sorted(self.a2a.registry.find_agents_by_domain(domain))
+        id_of_target_agent = None
+        if specialists:
+            id_of_target_agent = specialists[zlib.crc32(str(self.call_id).encode()) % len(specialists)]
         
         if not id_of_target_agent:
             logger.error(f"No specialist found for domain {domain}")
@@ -50,18 +79,27 @@ class SIPCustomerServiceAgent(Agent):
 
         logger.info(f"Found specialist: {id_of_target_agent}")
         
+        request_id = uuid.uuid4().hex
+        self._pending_requests[request_id] = {"query": query, "sent_at": time.perf_counter(), "answered": False, "first_audio": False}
         await self.a2a.send_message(
             to_agent=id_of_target_agent,
             message_type="specialist_query",
             content={
                 "query": query,
-                "call_id": self.call_id  # Include call_id in the message
+                "call_id": self.call_id,  # Include call_id in the message
+                "request_id": request_id  # Lets the answer be matched to this query
             }
         )
+        if self.on_status:
+            try:
+                self.on_status("forwarded")
+            except Exception as e:
+                logger.error(f"Failed to report forwarded status for call {self.call_id}: {e}")
         
         return {
             "status": "forwarded",
             "specialist": id_of_target_agent,
+            "request_id": request_id,
             "message": "Let me get that information for you from our loan specialist..."
         }
 
@@ -86,34 +124,137 @@ class SIPCustomerServiceAgent(Agent):
             "call_id": self.call_id
         }
 
+    def _mark_answer_received(self, request_id: Optional[str]) -> None:
+        """Log time from forwarding a query to receiving the first part of its answer"""
+        request = self._pending_requests.get(request_id) if request_id else None
+        if request and not request["answered"]:
+            request["answered"] = True
+            elapsed = time.perf_counter() - request["sent_at"]
+            SPECIALIST_ROUND_TRIP_SECONDS.observe(elapsed)
+            logger.info(f"Specialist request {request_id} for call {self.call_id}: time_to_answer_ms={elapsed * 1000:.1f}")
+
+    def _on_agent_state_changed(self, data: Dict[str, Any]) -> None:
+        """Log time from forwarding a query until the caller starts hearing its answer"""
+        if data.get("state") != "speaking":
+            return
+        request_id = self._speaking_request_id
+        request = self._pending_requests.get(request_id) if request_id else None
+        if request and not request["first_audio"]:
+            request["first_audio"] = True
+            elapsed = time.perf_counter() - request["sent_at"]
+            SPECIALIST_FIRST_AUDIO_SECONDS.observe(elapsed)
+            metrics_registry.flush()
+            logger.info(f"Specialist request {request_id} for call {self.call_id}: time_to_first_audio_ms={elapsed * 1000:.1f}")
+
+    def _enqueue_speech(self, text: Optional[str], request_id: Optional[str] = None, final: bool = True) -> None:
+        """Queue text for the speaker task; a final item also retires its request once spoken."""
+        if self._speaker_task is None or self._speaker_task.done():
+            self._speaker_task = asyncio.create_task(self._speak_queued(), name=f"speaker-{self.call_id}")
+        self._speech_queue.put_nowait((text, request_id, final))
+
+    async def wait_until_spoken(self) -> None:
+        """Return once every queued answer has been spoken (or given up on)."""
+        await self._speech_queue.join()
+
+    async def _speak_queued(self) -> None:
+        """Speak queued answers one at a time, each after the previous one has played"""
+        while True:
+            text, request_id, final = await self._speech_queue.get()
+            try:
+                if text:
+                    await self._relay_to_caller(text, request_id)
+                if final and request_id:
+                    self._pending_requests.pop(request_id, None)
+            except Exception as e:
+                logger.error(f"Error speaking specialist response for call {self.call_id}: {e}", exc_info=True)
+            finally:
+                self._speech_queue.task_done()
+
+    async def _relay_to_caller(self, response: str, request_id: Optional[str] = None) -> None:
+        """Speak a specialist answer (or part of one) to the caller, returning once it has played"""
+        self._speaking_request_id = request_id
+        try:
+            # Use session.say directly - this is the most reliable method for SIP calls
+            # It will properly route through the TTS system to generate audio
+            logger.debug("Relaying specialist response to caller via session.say...")
+            handle = await self.session.say(response)
+            # say() returns once the utterance is queued, and the next say() would cut it off
+            timeout = self.PLAYBACK_TIMEOUT_BASE + len(response.split()) * self.PLAYBACK_SECONDS_PER_WORD
+            await asyncio.wait_for(asyncio.ensure_future(handle), timeout=timeout)
+            logger.debug("Successfully relayed specialist response via session.say")
+        except asyncio.TimeoutError:
+            logger.warning(f"Specialist response for call {self.call_id} still playing after {timeout:.0f}s, moving on")
+        except Exception as e:
+            logger.error(f"Error relaying specialist response: {e}", exc_info=True)
+            # Try alternative methods as fallback
+            try:
+                logger.info("Trying fallback method: pipeline.send_message")
+                await self.session.pipeline.send_message(response)
+                logger.info("Successfully relayed via pipeline.send_message")
+            except Exception as e2:
+                logger.error(f"Fallback also failed: {e2}", exc_info=True)
+        finally:
+            self._speaking_request_id = None
+
     async def handle_specialist_response(self, message: A2AMessage) -> None:
         """Handle responses from the specialist agent"""
         response = message.content.get("response")
         call_id = message.content.get("call_id")
+        request_id = message.content.get("request_id")
+        
+        if request_id:
+            request = self._pending_requests.get(request_id)
+            if request is None:
+                logger.warning(f"Ignoring specialist response for unknown request {request_id} (call {call_id})")
+                return
+            logger.info(f"Specialist answered request {request_id}: '{request['query'][:50]}'")
+        
+        if message.content.get("error"):
+            CALL_FAILURES.inc(stage="specialist")
+            logger.error(f"Specialist failed request {request_id} for call {call_id}: {message.content['error']}")
+            response = self.specialist_error_message
         
         if response:
-            logger.info(f"Got specialist response for call {call_id}: {response[:50]}...")
+            logger.debug("Got specialist response for call %s: %.50s...", call_id, response, extra=SAMPLED)
             
             # Check if this response is for our call
             if call_id != self.call_id:
                 logger.warning(f"Received response for different call: {call_id} vs {self.call_id}")
                 # Still process it since we're the customer agent
             
-            try:
-                # Use session.say directly - this is the most reliable method for SIP calls
-                # It will properly route through the TTS system to generate audio
-                logger.info(f"Relaying specialist response to caller via session.say...")
-                await self.session.say(response)
-                logger.info(f"Successfully relayed specialist response via session.say")
-            except Exception as e:
-                logger.error(f"Error relaying specialist response: {e}", exc_info=True)
-                # Try alternative methods as fallback
-                try:
-                    logger.info("Trying fallback method: pipeline.send_message")
-                    await self.session.pipeline.send_message(response)
-                    logger.info("Successfully relayed via pipeline.send_message")
-                except Exception as e2:
-                    logger.error(f"Fallback also failed: {e2}", exc_info=True)
+            self._mark_answer_received(request_id)
+        
+        # Spoken by the speaker task; the request is kept until then so its first audio can be timed
+        self._enqueue_speech(response, request_id)
+
+    async def handle_specialist_response_chunk(self, message: A2AMessage) -> None:
+        """Handle one sentence of a streamed specialist answer, speaking chunks in seq order"""
+        request_id = message.content.get("request_id")
+        if request_id not in self._pending_requests:
+            logger.warning(f"Ignoring specialist chunk for unknown request {request_id}")
+            return
+
+        buffer = self._chunk_buffers.setdefault(request_id, {"next_seq": 0, "chunks": {}})
+        buffer["chunks"][message.content.get("seq", 0)] = message.content
+
+        # Speak every chunk that is now in order; later ones wait for the gap to fill
+        while buffer["next_seq"] in buffer["chunks"]:
+            chunk = buffer["chunks"].pop(buffer["next_seq"])
+            buffer["next_seq"] += 1
+
+            if chunk.get("text"):
+                self._mark_answer_received(request_id)
+                self._enqueue_speech(chunk["text"], request_id, final=False)
+
+            if chunk.get("final"):
+                error_message = None
+                if chunk.get("error"):
+                    CALL_FAILURES.inc(stage="specialist")
+                    logger.error(f"Specialist failed request {request_id} for call {self.call_id}: {chunk['error']}")
+                    error_message = self.specialist_error_message
+                self._enqueue_speech(error_message, request_id)
+                self._chunk_buffers.pop(request_id, None)
+                return
 
     async def greet_user(self) -> None:
         """Greet the user when they join the call (called from on_enter when session is ready)"""
@@ -135,7 +276,7 @@ class SIPCustomerServiceAgent(Agent):
             # Register for A2A communication
             logger.info(f"📋 Registering for A2A communication...")
             await self.register_a2a(AgentCard(
-                id="sip_customer_service_1",
+                id=self.id,
                 name="SIP Customer Service Agent",
                 domain="customer_service",
                 capabilities=["query_handling", "specialist_coordination", "call_management"],
@@ -145,7 +286,11 @@ class SIPCustomerServiceAgent(Agent):
             
             # Set up message handler for specialist responses
             self.a2a.on_message("specialist_response", self.handle_specialist_response)
+            self.a2a.on_message("specialist_response_chunk", self.handle_specialist_response_chunk)
             logger.info("✅ Registered A2A message handlers")
+
+            # The agent starts speaking when the first audio of an utterance is played
+            self.session.on("agent_state_changed", self._on_agent_state_changed)
             
             # Greet the user (session is now properly available)
             await self.greet_user()
@@ -156,4 +301,8 @@ class SIPCustomerServiceAgent(Agent):
     async def on_exit(self) -> None:
         """Called when the agent session ends"""
         logger.info(f"SIP Customer agent ending session for call_id: {self.call_id}")
-        await self.unregister_a2a() 
\ No newline at end of file
+        if self._speaker_task and not self._speaker_task.done():
+            self._speaker_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._speaker_task
+        await self.unregister_a2a()
\ No newline at end of file
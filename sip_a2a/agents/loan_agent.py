@@ -1,71 +1,215 @@
+import os
+import re
+import time
+import uuid
+import asyncio
 import logging
-from videosdk.agents import Agent, AgentCard, A2AMessage
+from typing import Any, Awaitable, Callable, Dict, Optional
+from videosdk.agents import Agent, AgentCard, A2AMessage, ChatContext, ChatRole
+from log_pipeline import bind_call, SAMPLED
 
 logger = logging.getLogger(__name__)
 
+LOAN_SPECIALIST_INSTRUCTIONS = (
+    "You are a specialized loan expert at a bank. "
+    "Provide detailed, helpful information about loans including interest rates, terms, and requirements. "
+    "Give complete answers with specific details when possible. "
+    "You can discuss personal loans, car loans, home loans, and business loans. "
+    "Provide helpful guidance and next steps for loan applications. "
+    "Be friendly and professional in your responses."
+    "And make sure all of this will cover within 5-7 lines and short and understandable response"
+)
+
+# End of a sentence: terminal punctuation followed by whitespace
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+
 class SIPLoanSpecialistAgent(Agent):
     """Loan specialist agent that handles loan-related queries via A2A"""
     
-    def __init__(self):
+    def __init__(self, agent_id: str = "sip_loan_specialist_1", answer_cache: Optional[Any] = None):
         """Initialize the loan specialist agent"""
         super().__init__(
-            agent_id="sip_loan_specialist_1",
-            instructions=(
-                "You are a specialized loan expert at a bank. "
-                "Provide detailed, helpful information about loans including interest rates, terms, and requirements. "
-                "Give complete answers with specific details when possible. "
-                "You can discuss personal loans, car loans, home loans, and business loans. "
-                "Provide helpful guidance and next steps for loan applications. "
-                "Be friendly and professional in your responses."
-                "And make sure all of this will cover within 5-7 lines and short and understandable response"
-            )
+            agent_id=agent_id,
+            instructions=LOAN_SPECIALIST_INSTRUCTIONS
         )
-        # Initialize tracking attributes for A2A communication
-        self._current_call_id = None
-        self._current_requesting_agent = None
+        # Optional AnswerCache shared by the specialists of this process
+        self.answer_cache = answer_cache
+        # Conversation history per call, so one specialist can serve several calls
+        self._histories: Dict[str, ChatContext] = {}
+        self._call_locks: Dict[str, asyncio.Lock] = {}
+        # Outstanding queries keyed by request_id, each remembering who to answer
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+        self._concurrency = asyncio.Semaphore(int(os.getenv("SPECIALIST_MAX_CONCURRENCY", 8)))
+        self.request_timeout = float(os.getenv("SPECIALIST_REQUEST_TIMEOUT", 30))
+        # Forward answers sentence by sentence as specialist_response_chunk messages
+        self.streaming = os.getenv("SPECIALIST_STREAMING", "false").lower() == "true"
+        # Readiness signal, set once A2A registration and handlers are in place
+        self._ready_event = asyncio.Event()
+        self._ready_error: Optional[BaseException] = None
         logger.info("SIPLoanSpecialistAgent initialized")
 
+    async def wait_until_ready(self, timeout: float) -> None:
+        """Wait until on_enter has registered for A2A, raising if it timed out or failed"""
+        await asyncio.wait_for(self._ready_event.wait(), timeout=timeout)
+        if self._ready_error:
+            raise self._ready_error
+
+    def _history_for(self, call_id: str) -> ChatContext:
+        """Return the isolated conversation history for a call"""
+        history = self._histories.get(call_id)
+        if history is None:
+            history = ChatContext.empty()
+            history.add_message(role=ChatRole.SYSTEM, content=LOAN_SPECIALIST_INSTRUCTIONS)
+            self._histories[call_id] = history
+        return history
+
+    def forget_call(self, call_id: str) -> None:
+        """Drop the conversation history of a call that has ended"""
+        self._call_locks.pop(call_id, None)
+        if self._histories.pop(call_id, None) is not None:
+            logger.info(f"LoanAgent dropped history for call {call_id}")
+
+    async def answer_query(
+        self,
+        call_id: str,
+        query: str,
+        on_sentence: Optional[Callable[[str], Awaitable[None]]] = None,
+    ) -> str:
+        """
+        Answer a query with the LLM, using and extending only this call's history.
+
+        If on_sentence is given, it is awaited with each complete sentence as soon
+        as the LLM has generated it, and once more with any trailing text.
+        """
+        # Queries of one call are answered in order; different calls run concurrently
+        lock = self._call_locks.setdefault(call_id, asyncio.Lock())
+        async with lock:
+            history = self._history_for(call_id)
+            # Only answers given without earlier conversation are context-free enough to cache, or to
+            # serve from the cache: a follow-up ("what documents do I need for that?") depends on it.
+            # A failed turn leaves no messages behind, so its retry still counts as the first turn.
+            first_turn = not any(getattr(item, "role", None) == ChatRole.USER for item in history.items)
+
+            cached, vector = None, None
+            if self.answer_cache is not None and first_turn:
+                cached, vector = await self.answer_cache.get(query, LOAN_SPECIALIST_INSTRUCTIONS)
+
+            question = history.add_message(role=ChatRole.USER, content=query)
+            try:
+                if cached is not None:
+                    logger.info(f"LoanAgent answered call {call_id} from cache: '{cached[:50]}...' ({self.answer_cache.stats()})")
+                    if on_sentence:
+                        for sentence in SENTENCE_BOUNDARY.split(cached):
+                            if sentence.strip():
+                                await on_sentence(sentence.strip())
+                    history.add_message(role=ChatRole.ASSISTANT, content=cached)
+                    return cached
+
+                started_at = time.perf_counter()
+                response = ""
+                pending = ""
+                async for chunk in self.session.pipeline.llm.chat(history):
+                    if not chunk.content:
+                        continue
+                    response += chunk.content
+                    if on_sentence:
+                        pending += chunk.content
+                        *sentences, pending = SENTENCE_BOUNDARY.split(pending)
+                        for sentence in sentences:
+                            if sentence.strip():
+                                await on_sentence(sentence.strip())
+
+                if on_sentence and pending.strip():
+                    await on_sentence(pending.strip())
+            except BaseException:
+                # Timed out, cancelled or failed: an unanswered question must not shape the call's later answers
+                if question in history.items:
+                    history.items.remove(question)
+                raise
+
+            history.add_message(role=ChatRole.ASSISTANT, content=response)
+
+            if self.answer_cache is not None and first_turn:
+                await self.answer_cache.put(
+                    query, response, LOAN_SPECIALIST_INSTRUCTIONS,
+                    llm_seconds=time.perf_counter() - started_at, vector=vector
+                )
+            return response
+
     async def handle_specialist_query(self, message: A2AMessage) -> None:
         """Handle query from customer agent"""
         query = message.content.get("query")
         call_id = message.content.get("call_id", "unknown")
+        request_id = message.content.get("request_id") or uuid.uuid4().hex
         from_agent = message.from_agent
         
         if query:
-            logger.info(f"LoanAgent received query for call {call_id}: '{query}' from {from_agent}")
-            # Process the query with our LLM
-            await self.session.pipeline.send_text_message(query)
-            logger.info(f"Sent query to LoanAgent's LLM for processing")
-            
-            # Store the call_id and requesting_agent for use in model_response handler
-            self._current_call_id = call_id
-            self._current_requesting_agent = from_agent
-
-    async def handle_model_response(self, message: A2AMessage) -> None:
-        """Handle response from LLM and forward back to customer agent"""
-        response = message.content.get("response")
-        requesting_agent = getattr(self, '_current_requesting_agent', None)
-        call_id = getattr(self, '_current_call_id', None)
-        
-        if response and requesting_agent:
+            logger.info(f"LoanAgent received query {request_id} for call {call_id}: '{query}' from {from_agent}")
+            # Process in the background so further queries are not held up behind this one
+            self._in_flight[request_id] = {
+                "call_id": call_id,
+                "from_agent": from_agent,
+                "started_at": time.monotonic(),
+                "task": asyncio.create_task(self._process_query(request_id, query)),
+            }
+
+    async def _process_query(self, request_id: str, query: str) -> None:
+        """Answer one in-flight query and route the result back to its requester"""
+        request = self._in_flight[request_id]
+        call_id = request["call_id"]
+        from_agent = request["from_agent"]
+        # Runs in its own task, so the context only applies to this query's logs
+        bind_call(call_id)
+        content: Dict[str, Any] = {"call_id": call_id, "request_id": request_id}
+        seq = 0
+
+        async def send_chunk(text: str) -> None:
+            nonlocal seq
+            # send_message runs the customer agent's handler inline; it only queues the text for
+            # playback, so neither the slot nor the request timeout waits on the caller's audio
+            await self.a2a.send_message(
+                to_agent=from_agent,
+                message_type="specialist_response_chunk",
+                content={**content, "seq": seq, "text": text, "final": False}
+            )
+            seq += 1
+
+        async def answer_in_slot() -> str:
+            async with self._concurrency:
+                # Process the query with our LLM
+                return await self.answer_query(call_id, query, on_sentence=send_chunk if self.streaming else None)
+
+        try:
+            # The timeout covers waiting for a free slot as well as answering
+            response = await asyncio.wait_for(answer_in_slot(), timeout=self.request_timeout)
             # Log the first 50 chars of the response to avoid log spam
-            logger.info(f"LoanAgent got LLM response: '{response[:50]}...'")
-            
-            # Send the response back to the requesting agent
+            logger.debug("LoanAgent got LLM response for %s: '%.50s...'", request_id, response, extra=SAMPLED)
+            if not self.streaming:
+                content["response"] = response
+        except asyncio.TimeoutError:
+            logger.error(f"LoanAgent query {request_id} for call {call_id} timed out after {self.request_timeout}s")
+            content["error"] = "timeout"
+        except Exception as e:
+            logger.error(f"LoanAgent query {request_id} for call {call_id} failed: {e}", exc_info=True)
+            content["error"] = str(e)
+        finally:
+            self._in_flight.pop(request_id, None)
+
+        # Send the response back to the agent that asked, not whoever asked last
+        if self.streaming:
+            # Closing chunk tells the customer agent the answer is complete
             await self.a2a.send_message(
-                to_agent=requesting_agent,
+                to_agent=from_agent,
+                message_type="specialist_response_chunk",
+                content={**content, "seq": seq, "text": "", "final": True}
+            )
+        else:
+            await self.a2a.send_message(
+                to_agent=from_agent,
                 message_type="specialist_response",
-                content={
-                    "response": response,  # Send the full response
-                    "call_id": call_id     # Include the call_id in the response
-                }
+                content=content
             )
-            
-            logger.info(f"Sent response back to agent {requesting_agent}")
-            
-            # Clear the current request tracking
-            self._current_call_id = None
-            self._current_requesting_agent = None
+        logger.info(f"Sent response for {request_id} back to agent {from_agent}")
 
     async def greet_user(self) -> None:
         """Greet user - specialist agent doesn't need to greet as it's background"""
@@ -76,7 +220,7 @@ class SIPLoanSpecialistAgent(Agent):
         logger.info(f"🎯 SIPLoanSpecialistAgent entering session")
         try:
             await self.register_a2a(AgentCard(
-                id="sip_loan_specialist_1",
+                id=self.id,
                 name="Loan Specialist Agent",
                 domain="loan",
                 capabilities=["loan_consultation", "loan_information", "interest_rates"],
@@ -85,12 +229,16 @@ class SIPLoanSpecialistAgent(Agent):
             logger.info("✅ Loan specialist agent registered for A2A communication")
             
             self.a2a.on_message("specialist_query", self.handle_specialist_query)
-            self.a2a.on_message("model_response", self.handle_model_response)
             logger.info("✅ Registered A2A message handlers for loan specialist")
         except Exception as e:
             logger.error(f"❌ Error in LoanSpecialistAgent on_enter: {e}", exc_info=True)
+            self._ready_error = e
+        finally:
+            self._ready_event.set()
 
     async def on_exit(self) -> None:
         """Called when the agent session ends"""
         logger.info(f"SIP Loan specialist agent ending session")
+        for request in list(self._in_flight.values()):
+            request["task"].cancel()
         await self.unregister_a2a() 
\ No newline at end of file
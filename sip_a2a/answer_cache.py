@@ -0,0 +1,434 @@
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # The similarity tier is optional
+    np = None
+
+logger = logging.getLogger(__name__)
+
+Embedder = Callable[[str], Awaitable[Sequence[float]]]
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace so trivial rephrasings share a key."""
+    query = re.sub(r"[^\w\s%$]", " ", query.lower())
+    return " ".join(query.split())
+
+
+def fingerprint(*parts: str) -> str:
+    """Stable fingerprint of the prompt/instructions an answer was generated with."""
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()[:16]
+
+
+def openai_embedder(model: str = "text-embedding-3-small") -> Optional[Embedder]:
+    """Build an embedder backed by the OpenAI embeddings API, if the SDK is installed."""
+    try:
+        from openai import AsyncOpenAI
+    except ImportError:
+        logger.warning("openai package not installed, answer cache similarity tier disabled")
+        return None
+
+    client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+    async def embed(text: str) -> Sequence[float]:
+        response = await client.embeddings.create(model=model, input=text)
+        return response.data[0].embedding
+
+    return embed
+
+
+class VectorIndex:
+    """
+    Unit-length query embeddings in one NumPy matrix, for cosine similarity lookups.
+
+    Rows are appended in place (the matrix doubles its capacity when full) and
+    removed rows are reused, so adding an entry never rebuilds the matrix.
+    """
+
+    def __init__(self, capacity: int = 64):
+        self._initial_capacity = capacity
+        self._matrix: Optional["np.ndarray"] = None
+        self._keys: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    def add(self, key: str, vector: "np.ndarray"):
+        row = self._rows.get(key)
+        if row is None:
+            if self._free:
+                row = self._free.pop()
+            else:
+                row = len(self._keys)
+                self._keys.append(None)
+                if self._matrix is None:
+                    self._matrix = np.zeros((self._initial_capacity, len(vector)), dtype=np.float32)
+                elif row >= len(self._matrix):
+                    grown = np.zeros((len(self._matrix) * 2, self._matrix.shape[1]), dtype=np.float32)
+                    grown[:row] = self._matrix
+                    self._matrix = grown
+            self._rows[key] = row
+            self._keys[row] = key
+        self._matrix[row] = vector
+
+    def remove(self, key: str):
+        row = self._rows.pop(key, None)
+        if row is not None:
+            self._matrix[row] = 0.0
+            self._keys[row] = None
+            self._free.append(row)
+
+    def clear(self):
+        self._matrix = None
+        self._keys = []
+        self._rows.clear()
+        self._free = []
+
+    def similar(self, vector: "np.ndarray", threshold: float) -> List[str]:
+        """Keys whose vectors have at least ``threshold`` cosine similarity, most similar first."""
+        if not self._rows:
+            return []
+        scores = self._matrix[:len(self._keys)] @ vector
+        keys = []
+        for row in np.argsort(-scores):
+            if scores[row] < threshold:
+                break
+            if self._keys[row] is not None:
+                keys.append(self._keys[row])
+        return keys
+
+
+class AnswerCache:
+    """
+    Cache of specialist answers keyed by normalized query text.
+
+    Entries are bounded by an LRU size limit and expire after a TTL. The whole
+    cache is invalidated when the prompt fingerprint changes. An optional second
+    tier matches near-duplicate phrasings by cosine similarity over a NumPy
+    matrix of query embeddings.
+
+    This cache lives in one process: every server worker and WorkerJob has its
+    own. SQLiteAnswerCache shares one cache between the processes on a host.
+    """
+
+    def __init__(
+        self,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        embed: Optional[Embedder] = None,
+        similarity_threshold: Optional[float] = None,
+    ):
+        """
+        Args:
+            max_size: Maximum number of cached answers (env ANSWER_CACHE_SIZE, 0 disables the cache)
+            ttl: Seconds an answer stays valid (env ANSWER_CACHE_TTL)
+            embed: Async text -> vector function enabling the similarity tier
+            similarity_threshold: Minimum cosine similarity for a near-duplicate hit
+                (env ANSWER_CACHE_SIMILARITY)
+        """
+        self.max_size = max_size if max_size is not None else int(os.getenv("ANSWER_CACHE_SIZE", 512))
+        self.ttl = ttl if ttl is not None else float(os.getenv("ANSWER_CACHE_TTL", 3600))
+        self.similarity_threshold = (
+            similarity_threshold if similarity_threshold is not None
+            else float(os.getenv("ANSWER_CACHE_SIMILARITY", 0.92))
+        )
+        if embed is not None and np is None:
+            logger.warning("numpy not installed, answer cache similarity tier disabled")
+            embed = None
+        self._embed = embed
+
+        # key -> (answer, stored_at)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._index = VectorIndex() if embed is not None else None
+        self._fingerprint: Optional[str] = None
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.saved_seconds = 0.0
+        self._miss_latency_total = 0.0
+        self._miss_latency_count = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def _check_fingerprint(self, prompt: str):
+        prompt_fingerprint = fingerprint(prompt)
+        if self._fingerprint != prompt_fingerprint:
+            if self._fingerprint is not None:
+                logger.info("Specialist prompt changed, invalidating answer cache")
+                self.invalidations += 1
+            self._fingerprint = prompt_fingerprint
+            self.clear()
+
+    def clear(self):
+        """Drop every cached answer."""
+        self._entries.clear()
+        if self._index is not None:
+            self._index.clear()
+
+    def _remove(self, key: str):
+        self._entries.pop(key, None)
+        if self._index is not None:
+            self._index.remove(key)
+
+    def _fresh(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        answer, stored_at = entry
+        if time.monotonic() - stored_at > self.ttl:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return answer
+
+    def _store(self, key: str, answer: str, vector: Optional["np.ndarray"]):
+        self._entries[key] = (answer, time.monotonic())
+        self._entries.move_to_end(key)
+        if vector is not None:
+            self._index.add(key, vector)
+        while len(self._entries) > self.max_size:
+            oldest, _ = next(iter(self._entries.items()))
+            self._remove(oldest)
+
+    def _size(self) -> int:
+        return len(self._entries)
+
+    def _record_hit(self):
+        if self._miss_latency_count:
+            self.saved_seconds += self._miss_latency_total / self._miss_latency_count
+
+    async def _embedding(self, text: str) -> Optional["np.ndarray"]:
+        try:
+            vector = np.asarray(await self._embed(text), dtype=np.float32)
+        except Exception as e:
+            logger.error(f"Answer cache embedding failed: {e}")
+            return None
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def _nearest(self, vector: "np.ndarray") -> Optional[str]:
+        """Answer of the most similar query that is still cached and fresh."""
+        for key in self._index.similar(vector, self.similarity_threshold):
+            # Expired or evicted entries are dropped by _fresh, and the next best is tried
+            answer = self._fresh(key)
+            if answer is not None:
+                return answer
+            self._index.remove(key)
+        return None
+
+    async def get(self, query: str, prompt: str) -> Tuple[Optional[str], Optional["np.ndarray"]]:
+        """
+        Look up an answer for a query generated with the given prompt/instructions.
+
+        Returns:
+            The cached answer (or None) and the query embedding, which can be
+            passed back to put() so a miss is not embedded twice
+        """
+        if not self.enabled:
+            return None, None
+        self._check_fingerprint(prompt)
+
+        key = normalize_query(query)
+        answer = self._fresh(key)
+        if answer is not None:
+            self.hits += 1
+            self._record_hit()
+            return answer, None
+
+        vector = None
+        if self._index is not None and self._size():
+            vector = await self._embedding(key)
+            answer = self._nearest(vector) if vector is not None else None
+            if answer is not None:
+                self.similar_hits += 1
+                self._record_hit()
+                return answer, vector
+
+        self.misses += 1
+        return None, vector
+
+    async def put(
+        self,
+        query: str,
+        answer: str,
+        prompt: str,
+        llm_seconds: Optional[float] = None,
+        vector: Optional["np.ndarray"] = None,
+    ):
+        """Store an answer; llm_seconds is the generation time it will save on later hits."""
+        if not self.enabled or not answer:
+            return
+        self._check_fingerprint(prompt)
+
+        if llm_seconds is not None:
+            self._miss_latency_total += llm_seconds
+            self._miss_latency_count += 1
+
+        key = normalize_query(query)
+        if self._index is not None and vector is None:
+            vector = await self._embedding(key)
+        self._store(key, answer, vector)
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the estimated LLM time saved."""
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "size": self._size(),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "saved_seconds": round(self.saved_seconds, 3),
+        }
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteAnswerCache(AnswerCache):
+    """
+    Answer cache in a local SQLite database in WAL mode, shared by every server
+    worker and agent process on the host.
+
+    Answers are stored with the fingerprint of the prompt they were generated
+    with, so processes running different prompts never see each other's
+    answers. Each process keeps its own similarity index and appends the
+    embeddings other processes stored since it last looked. Hit/miss counters
+    are per process.
+    """
+
+    def __init__(self, path: str, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self._local = threading.local()
+        # Highest answer id whose embedding is in this process's index
+        self._indexed_id = 0
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS answers ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL UNIQUE, fingerprint TEXT NOT NULL, "
+                "answer TEXT NOT NULL, stored_at REAL NOT NULL, used_at REAL NOT NULL, vector BLOB)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS answers_used_at ON answers (used_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process, since each process imports afresh)
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def clear(self):
+        """Drop every answer generated with a prompt other than the current one."""
+        self._connect().execute("DELETE FROM answers WHERE fingerprint != ?", (self._fingerprint or "",))
+        if self._index is not None:
+            self._index.clear()
+            self._indexed_id = 0
+
+    def _remove(self, key: str):
+        self._connect().execute("DELETE FROM answers WHERE key = ?", (key,))
+        if self._index is not None:
+            self._index.remove(key)
+
+    def _fresh(self, key: str) -> Optional[str]:
+        db = self._connect()
+        row = db.execute(
+            "SELECT answer, stored_at FROM answers WHERE key = ? AND fingerprint = ?",
+            (key, self._fingerprint),
+        ).fetchone()
+        if row is None:
+            return None
+        answer, stored_at = row
+        now = time.time()
+        if now - stored_at > self.ttl:
+            self._remove(key)
+            return None
+        db.execute("UPDATE answers SET used_at = ? WHERE key = ?", (now, key))
+        return answer
+
+    def _store(self, key: str, answer: str, vector: Optional["np.ndarray"]):
+        now = time.time()
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO answers (key, fingerprint, answer, stored_at, used_at, vector) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, self._fingerprint, answer, now, now, vector.astype(np.float32).tobytes() if vector is not None else None),
+            )
+            # Evict the least recently used answers beyond the size limit
+            db.execute(
+                "DELETE FROM answers WHERE id IN (SELECT id FROM answers ORDER BY used_at LIMIT MAX(0, (SELECT COUNT(*) FROM answers) - ?))",
+                (self.max_size,),
+            )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def _size(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM answers WHERE fingerprint = ?", (self._fingerprint,)).fetchone()[0]
+
+    def _sync_index(self):
+        """Append the embeddings stored (by any process) since the last sync."""
+        rows = self._connect().execute(
+            "SELECT id, key, vector FROM answers WHERE id > ? AND fingerprint = ? AND vector IS NOT NULL ORDER BY id",
+            (self._indexed_id, self._fingerprint),
+        ).fetchall()
+        for answer_id, key, vector in rows:
+            self._index.add(key, np.frombuffer(vector, dtype=np.float32))
+            self._indexed_id = answer_id
+
+    def _nearest(self, vector: "np.ndarray") -> Optional[str]:
+        self._sync_index()
+        return super()._nearest(vector)
+
+    def close(self) -> None:
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+def create_answer_cache(url: Optional[str] = None, **kwargs) -> AnswerCache:
+    """
+    Create the answer cache configured by ANSWER_CACHE_URL.
+
+    Args:
+        url: "memory://" (default, one cache per process), "sqlite:///relative.db"
+            or "sqlite:////absolute/path.db" (one cache shared by the host's processes)
+        kwargs: Passed to the AnswerCache constructor
+
+    Returns:
+        AnswerCache instance
+    """
+    url = url or os.getenv("ANSWER_CACHE_URL", "memory://")
+    if url.startswith("memory://"):
+        return AnswerCache(**kwargs)
+    if url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):] or "sip_a2a_answers.db"
+        logger.info(f"Using SQLite answer cache at {path}")
+        return SQLiteAnswerCache(path, **kwargs)
+    raise ValueError(f"Unsupported ANSWER_CACHE_URL: {url}")
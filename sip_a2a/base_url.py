@@ -0,0 +1,144 @@
+import os
+import time
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Receives the public base URL once it is known
+UrlCallback = Callable[[str], None]
+
+
+class BaseUrlProvider(ABC):
+    """
+    Supplies the public base URL Twilio uses to reach the webhooks.
+
+    ``start`` must return quickly: providers that need time to obtain a URL
+    (a tunnel) do so in the background and call ``on_url`` when it is ready,
+    so the server can start serving (and answer readiness probes) right away.
+    """
+
+    def __init__(self):
+        self.url: Optional[str] = None
+        self.error: Optional[str] = None
+        self.ready_at: Optional[float] = None
+        self._started_at: Optional[float] = None
+
+    @abstractmethod
+    async def start(self, on_url: UrlCallback) -> None:
+        """Begin obtaining the URL; ``on_url`` is called once it is available."""
+
+    async def stop(self) -> None:
+        pass
+
+    def _publish(self, url: str, on_url: UrlCallback):
+        self.url = url.rstrip("/")
+        self.error = None
+        self.ready_at = time.monotonic()
+        on_url(self.url)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "provider": type(self).__name__,
+            "base_url": self.url,
+            "error": self.error,
+            "seconds_to_url": round(self.ready_at - self._started_at, 3) if self.ready_at and self._started_at else None,
+        }
+
+
+class StaticBaseUrlProvider(BaseUrlProvider):
+    """A fixed URL from configuration (PUBLIC_BASE_URL), e.g. a production load balancer."""
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.static_url = url
+
+    async def start(self, on_url: UrlCallback) -> None:
+        self._started_at = time.monotonic()
+        self._publish(self.static_url, on_url)
+
+
+class NgrokBaseUrlProvider(BaseUrlProvider):
+    """
+    An ngrok tunnel to the local port, opened in the background.
+
+    pyngrok's calls block (they spawn the ngrok process and wait for the
+    tunnel), so they run in a thread; failed attempts are retried with backoff.
+    """
+
+    def __init__(
+        self,
+        port: int,
+        get_client: Callable[[], Any],
+        auth_token: Optional[str] = None,
+        retry_delay: float = 2.0,
+        max_retry_delay: float = 60.0,
+    ):
+        """
+        Args:
+            port: Local port to expose
+            get_client: Returns the pyngrok ``ngrok`` module (imported on first use)
+            auth_token: ngrok auth token (env NGROK_AUTHTOKEN)
+            retry_delay: Seconds before the first retry; doubles up to max_retry_delay
+            max_retry_delay: Longest wait between attempts
+        """
+        super().__init__()
+        self.port = port
+        self.get_client = get_client
+        self.auth_token = auth_token if auth_token is not None else os.getenv("NGROK_AUTHTOKEN")
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.attempts = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def _connect(self) -> str:
+        ngrok = self.get_client()
+        ngrok.kill()
+        if self.auth_token:
+            ngrok.set_auth_token(self.auth_token)
+        return ngrok.connect(self.port, "http").public_url
+
+    async def _run(self, on_url: UrlCallback):
+        loop = asyncio.get_running_loop()
+        delay = self.retry_delay
+        while True:
+            self.attempts += 1
+            try:
+                url = await loop.run_in_executor(None, self._connect)
+                self._publish(url, on_url)
+                logger.info(f"Ngrok tunnel created: {self.url} (after {self.status()['seconds_to_url']}s)")
+                return
+            except Exception as e:
+                self.error = str(e)
+                logger.error(f"Failed to start ngrok tunnel (attempt {self.attempts}), retrying in {delay:.1f}s: {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+    async def start(self, on_url: UrlCallback) -> None:
+        self._started_at = time.monotonic()
+        self._task = asyncio.create_task(self._run(on_url), name="ngrok-tunnel")
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, lambda: self.get_client().kill())
+            logger.info("Ngrok tunnel closed")
+        except Exception as e:
+            logger.error(f"Error closing ngrok tunnel: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {**super().status(), "attempts": self.attempts}
+
+
+def create_base_url_provider(port: int, get_ngrok: Callable[[], Any]) -> BaseUrlProvider:
+    """
+    Create the provider configured by PUBLIC_BASE_URL: that fixed URL when set,
+    otherwise an ngrok tunnel to ``port``.
+    """
+    public_base_url = os.getenv("PUBLIC_BASE_URL")
+    if public_base_url:
+        return StaticBaseUrlProvider(public_base_url)
+    return NgrokBaseUrlProvider(port, get_ngrok)
@@ -0,0 +1,141 @@
+import os
+import time
+from array import array
+from typing import Any, Dict, List, Optional
+
+# Outcomes stored in the history as a one-byte code; Twilio DialCallStatus values plus our own
+OUTCOMES = ("completed", "answered", "busy", "no-answer", "failed", "canceled", "launch_failed", "other")
+_OUTCOME_CODES = {outcome: code for code, outcome in enumerate(OUTCOMES)}
+DIRECTIONS = ("inbound", "outbound")
+
+
+class CallRecord:
+    """
+    One call handled by this server process: identifiers, the agent job handle
+    while it runs, lifecycle timestamps (epoch seconds) and outcome.
+    """
+
+    __slots__ = (
+        "call_id", "room_id", "caller_number", "direction", "job",
+        "created_at", "answered_at", "ended_at", "setup_seconds",
+        "outcome", "last_status", "was_queued",
+    )
+
+    def __init__(self, call_id: str, room_id: str, caller_number: Optional[str] = None, job: Any = None, was_queued: bool = False):
+        self.call_id = call_id
+        self.room_id = room_id
+        self.caller_number = caller_number
+        self.direction = "inbound" if caller_number else "outbound"
+        self.job = job
+        self.created_at = time.time()
+        self.answered_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self.setup_seconds: Optional[float] = None
+        self.outcome: Optional[str] = None
+        self.last_status: Optional[str] = None
+        self.was_queued = was_queued
+
+    def answered(self, setup_seconds: float) -> None:
+        """Twilio has the TwiML (inbound) or the call was created (outbound)."""
+        self.answered_at = time.time()
+        self.setup_seconds = setup_seconds
+
+    def finish(self, outcome: str, last_status: Optional[str] = None) -> "CallRecord":
+        """Mark the call ended and drop the job handle."""
+        self.ended_at = time.time()
+        self.outcome = outcome
+        self.last_status = last_status
+        self.job = None
+        return self
+
+    @property
+    def handle_seconds(self) -> float:
+        """Time from answer (or creation) until the call ended."""
+        end = self.ended_at or time.time()
+        return end - (self.answered_at or self.created_at)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if name != "job"}
+
+
+def _percentile(sorted_values: List[float], q: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    return round(sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))], 4)
+
+
+class CallHistory:
+    """
+    Fixed-size ring buffer of completed calls.
+
+    Only the numbers the rolling statistics need are kept, in preallocated
+    arrays (one slot per call), so memory stays constant however many calls
+    the server handles; the oldest calls are overwritten first.
+    """
+
+    def __init__(self, size: Optional[int] = None):
+        """
+        Args:
+            size: Completed calls kept (env CALL_HISTORY_SIZE)
+        """
+        self.size = size if size is not None else int(os.getenv("CALL_HISTORY_SIZE", 10000))
+        self._ended_at = array("d", bytes(8 * self.size))
+        self._handle_seconds = array("d", bytes(8 * self.size))
+        # Negative means the call never reached setup (e.g. the agent failed to launch)
+        self._setup_seconds = array("d", bytes(8 * self.size))
+        self._outcome = array("B", bytes(self.size))
+        self._direction = array("B", bytes(self.size))
+        self._next = 0
+        self.total = 0
+
+    def __len__(self) -> int:
+        return min(self.total, self.size)
+
+    def append(self, record: CallRecord) -> None:
+        i = self._next
+        self._ended_at[i] = record.ended_at or time.time()
+        self._handle_seconds[i] = record.handle_seconds
+        self._setup_seconds[i] = record.setup_seconds if record.setup_seconds is not None else -1.0
+        self._outcome[i] = _OUTCOME_CODES.get(record.outcome or "other", _OUTCOME_CODES["other"])
+        self._direction[i] = DIRECTIONS.index(record.direction)
+        self._next = (i + 1) % self.size
+        self.total += 1
+
+    def stats(self, window: float = 300.0) -> Dict[str, Any]:
+        """
+        Rolling aggregates over the calls that ended in the last ``window`` seconds.
+
+        Returns:
+            Calls per minute, mean handle time, setup latency percentiles and
+            counts by outcome and direction
+        """
+        cutoff = time.time() - window
+        handle: List[float] = []
+        setup: List[float] = []
+        outcomes = [0] * len(OUTCOMES)
+        directions = [0] * len(DIRECTIONS)
+        for i in range(len(self)):
+            if self._ended_at[i] < cutoff:
+                continue
+            handle.append(self._handle_seconds[i])
+            if self._setup_seconds[i] >= 0:
+                setup.append(self._setup_seconds[i])
+            outcomes[self._outcome[i]] += 1
+            directions[self._direction[i]] += 1
+        setup.sort()
+
+        return {
+            "window_seconds": window,
+            "calls": len(handle),
+            "calls_per_minute": round(len(handle) * 60 / window, 2),
+            "mean_handle_seconds": round(sum(handle) / len(handle), 2) if handle else None,
+            "setup_seconds": {
+                "p50": _percentile(setup, 0.50),
+                "p90": _percentile(setup, 0.90),
+                "p99": _percentile(setup, 0.99),
+            },
+            "outcomes": {outcome: count for outcome, count in zip(OUTCOMES, outcomes) if count},
+            "directions": {direction: count for direction, count in zip(DIRECTIONS, directions) if count},
+            "history_size": self.size,
+            "completed_total": self.total,
+        }
@@ -0,0 +1,412 @@
+import os
+import re
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Contact states
+PENDING = "pending"
+DIALING = "dialing"
+IN_PROGRESS = "in-progress"
+RETRY_WAIT = "retry-wait"
+DONE = "done"
+FAILED = "failed"
+INVALID = "invalid"
+
+# Campaign states
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+
+E164 = re.compile(r"^\+[1-9]\d{1,14}$")
+
+CAMPAIGN_DIALS = metrics_registry.counter(
+    "sip_campaign_dials_total",
+    "Outbound campaign dial attempts (placed, retried, requeued, failed)",
+    ["result"],
+)
+
+# Places one outbound call: returns the /call/make details (sid and room_id, or status "failed" with "retryable")
+DialFunction = Callable[[str], Awaitable[Dict[str, Any]]]
+
+
+class CampaignContact:
+    """One number in a campaign and where it is in the dialing process."""
+
+    __slots__ = ("number", "state", "attempts", "call_id", "room_id", "outcome", "error", "dialed_at")
+
+    def __init__(self, number: str, state: str = PENDING):
+        self.number = number
+        self.state = state
+        self.attempts = 0
+        self.call_id: Optional[str] = None
+        self.room_id: Optional[str] = None
+        self.outcome: Optional[str] = None
+        self.error: Optional[str] = None
+        self.dialed_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__ if name != "dialed_at"}
+
+
+class CallsPerSecondLimiter:
+    """
+    Spaces call creations at most ``1 / cps`` seconds apart, matching the
+    account's Twilio CPS. Shared by every campaign on the server.
+    """
+
+    def __init__(self, cps: float):
+        self.cps = cps
+        self._next_at = 0.0
+
+    async def acquire(self):
+        now = time.monotonic()
+        wait = self._next_at - now
+        self._next_at = max(now, self._next_at) + 1 / self.cps
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class Campaign:
+    """A batch of numbers dialed under a concurrency cap, with per-contact retries and progress."""
+
+    def __init__(
+        self,
+        campaign_id: str,
+        numbers: Iterable[str],
+        name: Optional[str] = None,
+        max_concurrency: int = 10,
+        max_attempts: int = 3,
+        retry_outcomes: Iterable[str] = (),
+    ):
+        self.campaign_id = campaign_id
+        self.name = name or campaign_id
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_outcomes = frozenset(retry_outcomes)
+        self.state = RUNNING
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+        self.contacts: List[CampaignContact] = []
+        self._queue: Deque[CampaignContact] = deque()
+        seen = set()
+        for number in numbers:
+            number = number.strip()
+            if number in seen:
+                continue
+            seen.add(number)
+            contact = CampaignContact(number, PENDING if E164.match(number) else INVALID)
+            self.contacts.append(contact)
+            if contact.state == PENDING:
+                self._queue.append(contact)
+
+        # (due_at, seq, contact) for contacts waiting to be retried
+        self._retries: List[Tuple[float, int, CampaignContact]] = []
+        self._seq = itertools.count()
+        # call_id -> contact, for calls placed and not yet ended
+        self.active: Dict[str, CampaignContact] = {}
+        self.dialing = 0
+        self.retried = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def in_flight(self) -> int:
+        return self.dialing + len(self.active)
+
+    @property
+    def has_work(self) -> bool:
+        return bool(self._queue or self._retries or self.in_flight)
+
+    def next_due(self) -> Tuple[Optional[CampaignContact], Optional[float]]:
+        """The next contact to dial, or None and how long until a retry is due."""
+        if self._retries and self._retries[0][0] <= time.monotonic():
+            return heapq.heappop(self._retries)[2], None
+        if self._queue:
+            return self._queue.popleft(), None
+        if self._retries:
+            return None, self._retries[0][0] - time.monotonic()
+        return None, None
+
+    async def wait_for_wakeup(self, timeout: float):
+        """Wait until woken (a call ended, a retry is due, cancelled) or ``timeout`` passes."""
+        # asyncio.wait rather than wait_for: on Python 3.11, wait_for drops a cancel that
+        # arrives just as the event is set, and the dialing loop would never stop
+        waiter = asyncio.ensure_future(self._wakeup.wait())
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        finally:
+            waiter.cancel()
+
+    def schedule_retry(self, contact: CampaignContact, delay: float):
+        contact.state = RETRY_WAIT
+        self.retried += 1
+        heapq.heappush(self._retries, (time.monotonic() + delay, next(self._seq), contact))
+
+    def progress(self, include_contacts: bool = False) -> Dict[str, Any]:
+        states: Dict[str, int] = {}
+        outcomes: Dict[str, int] = {}
+        attempts = 0
+        for contact in self.contacts:
+            states[contact.state] = states.get(contact.state, 0) + 1
+            attempts += contact.attempts
+            if contact.outcome:
+                outcomes[contact.outcome] = outcomes.get(contact.outcome, 0) + 1
+        total = len(self.contacts)
+        finished = states.get(DONE, 0) + states.get(FAILED, 0) + states.get(INVALID, 0)
+        elapsed = (self.finished_at or time.time()) - self.created_at
+        progress = {
+            "campaign_id": self.campaign_id,
+            "name": self.name,
+            "state": self.state,
+            "total": total,
+            "finished": finished,
+            "percent": round(100 * finished / total, 1) if total else 100.0,
+            "states": states,
+            "outcomes": outcomes,
+            "attempts": attempts,
+            "retried": self.retried,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "elapsed_seconds": round(elapsed, 1),
+            "dials_per_minute": round(60 * attempts / elapsed, 1) if elapsed > 0 else None,
+        }
+        if include_contacts:
+            progress["contacts"] = [contact.to_dict() for contact in self.contacts]
+        return progress
+
+
+class CampaignDialer:
+    """
+    Runs outbound campaigns: each campaign dials its numbers as fast as the
+    shared calls-per-second limit allows, while keeping at most
+    ``max_concurrency`` of its calls in flight and never dialing beyond the
+    server's free call slots (inbound callers waiting for a slot come first).
+
+    Dial attempts that fail transiently (rate limiting, Twilio 5xx, network
+    or room-creation errors) are retried with exponential backoff, as are
+    calls ending with one of the campaign's ``retry_outcomes`` (e.g. busy).
+    A call counts as in flight until ``call_ended`` reports its final status,
+    or until ``call_timeout`` passes without one. A dial refused because the
+    server had no free slot after all goes back to the front of the queue
+    without using up an attempt.
+
+    Finished and cancelled campaigns stay queryable for ``retention``
+    seconds, and at most ``max_finished`` of them are kept.
+    """
+
+    def __init__(
+        self,
+        dial: DialFunction,
+        free_slots: Callable[[], int],
+        cps: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_delay: Optional[float] = None,
+        call_timeout: Optional[float] = None,
+        poll_interval: float = 1.0,
+        retention: Optional[float] = None,
+        max_finished: Optional[int] = None,
+    ):
+        """
+        Args:
+            dial: Coroutine function placing one outbound call (see DialFunction)
+            free_slots: Calls the server can take right now (0 while draining or not ready)
+            cps: Call creations per second across all campaigns on this server (env CAMPAIGN_CPS)
+            max_concurrency: Default cap on a campaign's calls in flight (env CAMPAIGN_MAX_CONCURRENCY)
+            max_attempts: Default dial attempts per number (env CAMPAIGN_MAX_ATTEMPTS)
+            retry_delay: Seconds before the first retry; doubles per attempt (env CAMPAIGN_RETRY_DELAY)
+            call_timeout: Seconds after which a call with no final status stops counting as in flight
+                (env CAMPAIGN_CALL_TIMEOUT)
+            poll_interval: Seconds between checks for free capacity while a campaign is blocked
+            retention: Seconds a finished or cancelled campaign is kept for progress queries
+                (env CAMPAIGN_RETENTION)
+            max_finished: Finished campaigns kept at most, oldest dropped first (env CAMPAIGN_MAX_FINISHED)
+        """
+        self._dial = dial
+        self._free_slots = free_slots
+        self.cps = cps if cps is not None else float(os.getenv("CAMPAIGN_CPS", 1))
+        self.max_concurrency = max_concurrency if max_concurrency is not None else int(os.getenv("CAMPAIGN_MAX_CONCURRENCY", 10))
+        self.max_attempts = max_attempts if max_attempts is not None else int(os.getenv("CAMPAIGN_MAX_ATTEMPTS", 3))
+        self.retry_delay = retry_delay if retry_delay is not None else float(os.getenv("CAMPAIGN_RETRY_DELAY", 5))
+        self.call_timeout = call_timeout if call_timeout is not None else float(os.getenv("CAMPAIGN_CALL_TIMEOUT", 3600))
+        self.poll_interval = poll_interval
+        self.retention = retention if retention is not None else float(os.getenv("CAMPAIGN_RETENTION", 86400))
+        self.max_finished = max_finished if max_finished is not None else int(os.getenv("CAMPAIGN_MAX_FINISHED", 100))
+
+        self.limiter = CallsPerSecondLimiter(self.cps)
+        self.campaigns: Dict[str, Campaign] = {}
+        # call_id -> campaign, for calls placed and not yet ended
+        self._calls: Dict[str, Campaign] = {}
+        self._ids = itertools.count(1)
+        self._dial_tasks = set()
+        self._stopping = False
+
+        metrics_registry.gauge("sip_campaign_calls_in_flight", "Campaign calls being dialed or in progress").set_function(
+            lambda: sum(campaign.in_flight for campaign in self.campaigns.values())
+        )
+
+    @property
+    def dialing(self) -> int:
+        """Call creations in progress; each reserves its admission slot when dialing starts."""
+        return sum(campaign.dialing for campaign in self.campaigns.values())
+
+    def create(
+        self,
+        numbers: Iterable[str],
+        name: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_outcomes: Iterable[str] = (),
+    ) -> Campaign:
+        """Create a campaign and start dialing it in the background."""
+        self._evict_finished()
+        campaign = Campaign(
+            f"cmp-{int(time.time())}-{next(self._ids)}",
+            numbers,
+            name=name,
+            max_concurrency=max_concurrency or self.max_concurrency,
+            max_attempts=max_attempts or self.max_attempts,
+            retry_outcomes=retry_outcomes,
+        )
+        self.campaigns[campaign.campaign_id] = campaign
+        campaign._task = asyncio.create_task(self._run(campaign), name=f"campaign-{campaign.campaign_id}")
+        logger.info(
+            f"Campaign {campaign.campaign_id} created with {len(campaign.contacts)} numbers "
+            f"(max_concurrency={campaign.max_concurrency}, cps={self.cps})"
+        )
+        return campaign
+
+    def get(self, campaign_id: str) -> Optional[Campaign]:
+        return self.campaigns.get(campaign_id)
+
+    def cancel(self, campaign_id: str) -> Optional[Campaign]:
+        """Stop dialing new numbers; calls already placed run to completion."""
+        campaign = self.campaigns.get(campaign_id)
+        if campaign is not None and campaign.state == RUNNING:
+            campaign.state = CANCELLED
+            campaign._wakeup.set()
+            logger.info(f"Campaign {campaign_id} cancelled")
+        return campaign
+
+    def call_ended(self, call_id: str, outcome: str):
+        """Twilio reported a campaign call's final status; frees its concurrency slot."""
+        campaign = self._calls.pop(call_id, None)
+        if campaign is None:
+            return
+        contact = campaign.active.pop(call_id, None)
+        if contact is None:
+            return
+        contact.outcome = outcome
+        if outcome in campaign.retry_outcomes and contact.attempts < campaign.max_attempts and campaign.state == RUNNING:
+            campaign.schedule_retry(contact, self.retry_delay * 2 ** (contact.attempts - 1))
+            CAMPAIGN_DIALS.inc(result="retried")
+        else:
+            contact.state = DONE
+        campaign._wakeup.set()
+
+    async def stop(self):
+        """Cancel all campaigns and wait for their dialing to stop."""
+        # Checked after every wake-up, in case a cancel below lands as a campaign is woken
+        self._stopping = True
+        tasks = [campaign._task for campaign in self.campaigns.values() if campaign._task and not campaign._task.done()]
+        tasks.extend(self._dial_tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _evict_finished(self):
+        """Forget finished campaigns past the retention window, and the oldest beyond ``max_finished``."""
+        # A cancelled campaign stays while its placed calls are still in progress
+        finished = sorted(
+            (campaign for campaign in self.campaigns.values() if campaign.finished_at is not None and not campaign.in_flight),
+            key=lambda campaign: campaign.finished_at,
+        )
+        excess = len(finished) - max(0, self.max_finished)
+        now = time.time()
+        for index, campaign in enumerate(finished):
+            if index < excess or now - campaign.finished_at > self.retention:
+                del self.campaigns[campaign.campaign_id]
+
+    def _expire_calls(self, campaign: Campaign):
+        now = time.monotonic()
+        stale = [call_id for call_id, contact in campaign.active.items() if now - contact.dialed_at > self.call_timeout]
+        for call_id in stale:
+            logger.warning(f"Campaign {campaign.campaign_id}: no final status for call {call_id} after {self.call_timeout:.0f}s")
+            self.call_ended(call_id, "unknown")
+
+    def _can_dial(self, campaign: Campaign) -> bool:
+        # Dials that have already reserved their slot count twice, a margin that lasts only while they are dialing
+        return campaign.in_flight < campaign.max_concurrency and self.dialing < self._free_slots()
+
+    async def _run(self, campaign: Campaign):
+        try:
+            while campaign.state == RUNNING and campaign.has_work and not self._stopping:
+                self._expire_calls(campaign)
+                timeout = self.poll_interval
+                if self._can_dial(campaign):
+                    contact, retry_in = campaign.next_due()
+                    if contact is not None:
+                        campaign.dialing += 1
+                        contact.state = DIALING
+                        await self.limiter.acquire()
+                        task = asyncio.create_task(self._dial_contact(campaign, contact))
+                        self._dial_tasks.add(task)
+                        task.add_done_callback(self._dial_tasks.discard)
+                        continue
+                    if retry_in is not None:
+                        timeout = min(timeout, max(0.0, retry_in))
+                campaign._wakeup.clear()
+                await campaign.wait_for_wakeup(timeout)
+        finally:
+            if campaign.state == RUNNING:
+                campaign.state = COMPLETED
+            campaign.finished_at = time.time()
+            logger.info(f"Campaign {campaign.campaign_id} {campaign.state}: {campaign.progress()['outcomes']}")
+            self._evict_finished()
+
+    async def _dial_contact(self, campaign: Campaign, contact: CampaignContact):
+        contact.attempts += 1
+        try:
+            result = await self._dial(contact.number)
+        except Exception as e:
+            result = {"status": "failed", "error": str(e), "retryable": True}
+        finally:
+            campaign.dialing -= 1
+
+        if result.get("status") != "failed" and result.get("sid"):
+            contact.state = IN_PROGRESS
+            contact.call_id = result["sid"]
+            contact.room_id = result.get("room_id")
+            contact.error = None
+            contact.dialed_at = time.monotonic()
+            campaign.active[contact.call_id] = contact
+            self._calls[contact.call_id] = campaign
+            CAMPAIGN_DIALS.inc(result="placed")
+        elif result.get("reason") == "capacity":
+            # Another call took the free slot first: the number was never dialed, so dial it again next
+            contact.attempts -= 1
+            contact.state = PENDING
+            campaign._queue.appendleft(contact)
+            CAMPAIGN_DIALS.inc(result="requeued")
+        else:
+            contact.error = result.get("error") or result.get("message") or "call not created"
+            if result.get("retryable") and contact.attempts < campaign.max_attempts and campaign.state == RUNNING:
+                delay = self.retry_delay * 2 ** (contact.attempts - 1)
+                logger.info(f"Campaign {campaign.campaign_id}: retrying {contact.number} in {delay:.0f}s ({contact.error})")
+                campaign.schedule_retry(contact, delay)
+                CAMPAIGN_DIALS.inc(result="retried")
+            else:
+                logger.warning(f"Campaign {campaign.campaign_id}: giving up on {contact.number} after {contact.attempts} attempt(s): {contact.error}")
+                contact.state = FAILED
+                CAMPAIGN_DIALS.inc(result="failed")
+        campaign._wakeup.set()
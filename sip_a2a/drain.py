@@ -0,0 +1,137 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Collection, Dict, List, Optional
+
+from teardown import TeardownStep
+
+logger = logging.getLogger(__name__)
+
+
+class DrainController:
+    """
+    Takes a server out of rotation without dropping calls.
+
+    Once draining begins, new calls are turned away (the webhooks check
+    ``draining``) while active calls are given until ``deadline`` seconds to end
+    on their own. Calls still running at the deadline are torn down in
+    parallel, each step bounded by ``step_timeout``.
+    """
+
+    def __init__(
+        self,
+        deadline: Optional[float] = None,
+        step_timeout: Optional[float] = None,
+        redirect_url: Optional[str] = None,
+        poll_interval: float = 1.0,
+    ):
+        """
+        Args:
+            deadline: Seconds active calls may keep running once draining starts (env DRAIN_DEADLINE_SECONDS)
+            step_timeout: Seconds allowed for each teardown step of a remaining call (env DRAIN_STEP_TIMEOUT)
+            redirect_url: Incoming webhook of another server to send new callers to (env DRAIN_REDIRECT_URL);
+                without it new callers get busy TwiML
+            poll_interval: Seconds between checks for active calls
+        """
+        self.deadline = deadline if deadline is not None else float(os.getenv("DRAIN_DEADLINE_SECONDS", 300))
+        self.step_timeout = step_timeout if step_timeout is not None else float(os.getenv("DRAIN_STEP_TIMEOUT", 10))
+        self.redirect_url = redirect_url if redirect_url is not None else os.getenv("DRAIN_REDIRECT_URL")
+        self.poll_interval = poll_interval
+
+        self.reason: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.torn_down: Dict[str, Dict[str, str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def draining(self) -> bool:
+        return self.started_at is not None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def begin(self, reason: str, deadline: Optional[float] = None) -> bool:
+        """Stop admitting calls. Returns False if draining had already begun."""
+        if self.draining:
+            return False
+        self.reason = reason
+        self.started_at = time.monotonic()
+        deadline = self.deadline if deadline is None else deadline
+        logger.warning(f"Draining started ({reason}); new calls are turned away, deadline {deadline:.0f}s")
+        return True
+
+    def start(
+        self,
+        reason: str,
+        active_calls: Callable[[], Collection[str]],
+        teardown_steps: Callable[[str], List[TeardownStep]],
+    ) -> asyncio.Task:
+        """Begin draining and run it in the background; returns the (shared) drain task."""
+        self.begin(reason)
+        if self._task is None:
+            self._task = asyncio.create_task(self.drain(active_calls, teardown_steps))
+        return self._task
+
+    async def drain(
+        self,
+        active_calls: Callable[[], Collection[str]],
+        teardown_steps: Callable[[str], List[TeardownStep]],
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Wait for active calls to end, then tear down the rest in parallel.
+
+        Args:
+            active_calls: Returns the call ids still running on this server
+            teardown_steps: Returns the ordered teardown steps for one call
+            deadline: Overrides the configured deadline (0 tears down immediately)
+
+        Returns:
+            Per-call result of every teardown step ("ok", "timeout" or an error message)
+        """
+        deadline = self.deadline if deadline is None else deadline
+        if not self.begin("shutdown", deadline) and deadline != self.deadline:
+            logger.warning(f"Drain deadline changed to {deadline:.0f}s")
+        deadline_at = self.started_at + deadline
+
+        while active_calls() and time.monotonic() < deadline_at:
+            await asyncio.sleep(min(self.poll_interval, max(0.0, deadline_at - time.monotonic())))
+
+        remaining = list(active_calls())
+        if remaining:
+            logger.warning(f"Drain deadline reached with {len(remaining)} active call(s), tearing them down")
+            results = await asyncio.gather(*(self._teardown(call_id, teardown_steps(call_id)) for call_id in remaining))
+            self.torn_down.update(zip(remaining, results))
+
+        self.finished_at = time.monotonic()
+        logger.warning(f"Drain finished in {self.finished_at - self.started_at:.1f}s ({len(remaining)} call(s) torn down)")
+        return self.torn_down
+
+    async def _teardown(self, call_id: str, steps: List[TeardownStep]) -> Dict[str, str]:
+        results: Dict[str, str] = {}
+        for name, step in steps:
+            try:
+                await asyncio.wait_for(step(), timeout=self.step_timeout)
+                results[name] = "ok"
+            except asyncio.TimeoutError:
+                logger.error(f"Teardown step {name} for call {call_id} timed out after {self.step_timeout}s")
+                results[name] = "timeout"
+            except Exception as e:
+                logger.error(f"Teardown step {name} for call {call_id} failed: {e}")
+                results[name] = f"error: {e}"
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "draining": self.draining,
+            "finished": self.finished,
+            "reason": self.reason,
+            "elapsed_seconds": round((self.finished_at or now) - self.started_at, 1) if self.started_at else None,
+            "deadline_seconds": self.deadline,
+            "redirect_url": self.redirect_url,
+            "torn_down": self.torn_down,
+        }
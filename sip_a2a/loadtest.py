@@ -0,0 +1,832 @@
+"""
+Offline load test for the SIP A2A server.
+
+Runs main.app in-process against local stand-ins, then fires /webhook/incoming
+and /call/make requests on a configurable arrival pattern. The server's own code
+runs unchanged: room creation and Twilio calls go over HTTP to a local stub API,
+and each call's agent job runs _agent_entrypoint in-process on the fake models
+(AGENT_MODEL=fake, see fake_models.py) in a VideoSDK room stand-in where the
+caller hangs up after --call-duration. No network access or real credentials
+are needed.
+
+Usage:
+    python loadtest.py --calls 200 --concurrency 50 --pattern poisson --rate 20
+    python loadtest.py --calls 500 --pattern burst --outbound-ratio 0.5 --json
+    python loadtest.py --calls 500 --log-level DEBUG --log-mode queue   # event loop lag with logging on
+    python loadtest.py --scenario rooms --calls 1000 --concurrency 20    # room creation, pooled vs per-request client
+    python loadtest.py --scenario answer --calls 5000 --concurrency 50  # /sip/answer req/s, precompiled vs per-request TwiML
+    python loadtest.py --scenario specialists --levels 1,10,50          # RSS and setup time, dedicated vs shared specialists
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+import resource
+import threading
+import tracemalloc
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# Stand-in configuration must be in place before main is imported
+for _name in (
+    "VIDEOSDK_API_KEY", "VIDEOSDK_SECRET_KEY", "VIDEOSDK_TOKEN", "VIDEOSDK_SIP_USERNAME", "VIDEOSDK_SIP_PASSWORD",
+    "GOOGLE_API_KEY", "OPENAI_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN",
+):
+    os.environ.setdefault(_name, f"loadtest-{_name.lower()}")
+os.environ.setdefault("TWILIO_PHONE_NUMBER", "+15550000000")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="sip_a2a_loadtest_"))
+# Agent jobs run on the fake models, which live at the repository root (appended,
+# so its example scripts such as openai.py do not shadow the installed packages)
+os.environ["AGENT_MODEL"] = "fake"
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _REPO_ROOT not in sys.path:
+    sys.path.append(_REPO_ROOT)
+
+import httpx
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    """p50/p95/p99/max of latencies in seconds, reported in milliseconds."""
+    def ms(value):
+        return round(value * 1000, 2) if value is not None else None
+    return {
+        "count": len(values),
+        "p50_ms": ms(percentile(values, 50)),
+        "p95_ms": ms(percentile(values, 95)),
+        "p99_ms": ms(percentile(values, 99)),
+        "max_ms": ms(max(values) if values else None),
+    }
+
+
+class StubApiServer:
+    """
+    Local HTTP/1.1 server (with keep-alive) standing in for the VideoSDK room API
+    and the Twilio calls API, so benchmarks go through real sockets and
+    connection handling.
+    """
+
+    def __init__(self, room_latency: float, twilio_latency: float = 0.0, on_hangup: Optional[Callable[[str], None]] = None):
+        """
+        Args:
+            room_latency: Seconds POST /rooms takes
+            twilio_latency: Seconds creating or updating a Twilio call takes
+            on_hangup: Called with the call SID when a call is updated to completed
+        """
+        self.room_latency = room_latency
+        self.twilio_latency = twilio_latency
+        self.on_hangup = on_hangup
+        self.rooms_created = 0
+        self.calls_created = 0
+        self.calls_hung_up = 0
+        self.connections = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    async def start(self) -> str:
+        """Start listening on a free local port; returns the base URL."""
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        self._server.close()
+        # Clients may hold keep-alive connections open, which wait_closed() would wait for
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+
+    def start_in_thread(self) -> str:
+        """Serve from a separate thread and event loop, so the stub keeps answering while the caller's loop is busy."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="stub-api", daemon=True)
+        self._thread.start()
+        return asyncio.run_coroutine_threadsafe(self.start(), self._loop).result()
+
+    def stop_thread(self):
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        self._writers.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode().strip()
+                    if not line:
+                        break
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, response_body = await self._route(method, urlsplit(path).path, body)
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\nContent-Length: {len(response_body)}\r\n\r\n".encode()
+                    + response_body
+                )
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes):
+        if method == "POST" and path.rstrip("/").endswith("/rooms"):
+            await asyncio.sleep(self.room_latency)
+            self.rooms_created += 1
+            return "200 OK", json.dumps({"roomId": f"room-{self.rooms_created:06d}"}).encode()
+        if method == "POST" and path.endswith("/Calls.json"):
+            # Twilio: create a call
+            await asyncio.sleep(self.twilio_latency)
+            self.calls_created += 1
+            sid = f"CAout{self.calls_created:030d}"
+            return "201 Created", json.dumps({"sid": sid, "status": "queued"}).encode()
+        if method == "POST" and "/Calls/" in path:
+            # Twilio: update a call, e.g. Status=completed to hang up
+            await asyncio.sleep(self.twilio_latency)
+            sid = path.rsplit("/", 1)[-1].removesuffix(".json")
+            status = parse_qs(body.decode()).get("Status", ["in-progress"])[0]
+            if status == "completed":
+                self.calls_hung_up += 1
+                if self.on_hangup:
+                    self.on_hangup(sid)
+            return "200 OK", json.dumps({"sid": sid, "status": status}).encode()
+        return "404 Not Found", b'{"error": "not found"}'
+
+
+class OfflineRoom:
+    """
+    The VideoSDK room as an agent job sees it: the caller joins after
+    ``join_delay`` and hangs up ``call_duration`` seconds later (or when
+    Twilio is asked to end the call).
+    """
+
+    def __init__(self, join_delay: float, call_duration: float, on_join: Optional[Callable[[], None]] = None):
+        self.join_delay = join_delay
+        self.call_duration = call_duration
+        self.on_join = on_join
+        self.meeting = SimpleNamespace(on=self._on)
+        self._handlers: Dict[str, Callable] = {}
+        self._hang_up_timer: Optional[asyncio.TimerHandle] = None
+
+    def _on(self, event: str, handler: Callable):
+        self._handlers[event] = handler
+
+    async def wait_for_participant(self) -> str:
+        await asyncio.sleep(self.join_delay)
+        if self.on_join:
+            self.on_join()
+        self._hang_up_timer = asyncio.get_running_loop().call_later(self.call_duration, self.hang_up)
+        return "caller"
+
+    def hang_up(self):
+        """The caller leaves the room."""
+        handler = self._handlers.get("participant-left")
+        if handler:
+            handler("caller")
+
+    def leave(self):
+        if self._hang_up_timer:
+            self._hang_up_timer.cancel()
+
+    async def cleanup(self):
+        pass
+
+
+class InProcessJob:
+    """WorkerJob stand-in: runs the call's agent job as a task on the load test's event loop."""
+
+    def __init__(self, stand_ins: "StandIns", entrypoint, jobctx):
+        self.stand_ins = stand_ins
+        self.entrypoint = entrypoint
+        self.jobctx = jobctx
+
+    def start(self):
+        self.stand_ins.run_job(self.entrypoint, self.jobctx())
+
+
+class StandIns:
+    """Local replacements for Twilio, VideoSDK, ngrok and the agent job's room, with configurable latency."""
+
+    def __init__(self, room_latency: float, twilio_latency: float, call_duration: float, join_delay: float = 0.0):
+        self.api = StubApiServer(room_latency, twilio_latency, on_hangup=self._on_hangup)
+        self.call_duration = call_duration
+        self.join_delay = join_delay
+        self.jobs_launched = 0
+        self.jobs_active = 0
+        self.app_client: Optional[httpx.AsyncClient] = None
+        self._rooms: Dict[str, OfflineRoom] = {}
+        self._tasks = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def worker_job(self, entrypoint, jobctx) -> InProcessJob:
+        """Replaces main.WorkerJob."""
+        return InProcessJob(self, entrypoint, jobctx)
+
+    def run_job(self, entrypoint, ctx):
+        """Run an agent job in an OfflineRoom; once the caller hangs up, Twilio's dial-complete callback follows."""
+        from worker_pool import run_in_job_scope
+
+        self.jobs_launched += 1
+        room = OfflineRoom(self.join_delay, self.call_duration)
+
+        async def connect():
+            ctx.room = room
+
+        async def shutdown():
+            pass
+
+        ctx.connect = connect
+        ctx.shutdown = shutdown
+        self._rooms[ctx.call_id] = room
+
+        async def run_call():
+            self.jobs_active += 1
+            try:
+                await run_in_job_scope(entrypoint, ctx)
+            finally:
+                self.jobs_active -= 1
+                self._rooms.pop(ctx.call_id, None)
+            await self.app_client.post(
+                "/webhook/dial-complete",
+                data={"CallSid": ctx.call_id, "DialCallStatus": "completed"},
+            )
+
+        task = asyncio.create_task(run_call())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _on_hangup(self, call_sid: str):
+        # Called on the stub API's thread
+        self._loop.call_soon_threadsafe(self._hang_up, call_sid)
+
+    def _hang_up(self, call_sid: str):
+        room = self._rooms.get(call_sid)
+        if room:
+            room.hang_up()
+
+    async def drain(self):
+        """Wait for every simulated call to finish."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    def ngrok(self):
+        tunnel = SimpleNamespace(public_url="http://loadtest.local")
+        return SimpleNamespace(kill=lambda: None, set_auth_token=lambda token: None, connect=lambda *args, **kwargs: tunnel)
+
+
+@asynccontextmanager
+async def serve(main, stand_ins: StandIns):
+    """
+    Run main.app with its external services replaced by the stand-ins.
+
+    Yields an HTTP client for the app once it reports ready, and waits for
+    every call to end before the app shuts down. The module attributes patched
+    here are restored on exit, so the app can be served again.
+    """
+    from twilio.base.client_base import ClientBase
+    from drain import DrainController
+
+    stand_ins._loop = asyncio.get_running_loop()
+    api_url = urlsplit(stand_ins.api.start_in_thread())
+
+    def to_stub(client, uri: str) -> str:
+        return urlsplit(uri)._replace(scheme=api_url.scheme, netloc=api_url.netloc).geturl()
+
+    videosdk = main.twilio_manager.videosdk
+    patches = [
+        (main, "ngrok", stand_ins.ngrok()),
+        (main, "WorkerJob", stand_ins.worker_job),
+        # A drain left over from an earlier run would turn every call away
+        (main, "drain", DrainController()),
+        (videosdk, "base_url", api_url.geturl()),
+        (ClientBase, "get_hostname", to_stub),
+    ]
+    originals = [(target, name, getattr(target, name)) for target, name, _ in patches]
+    for target, name, value in patches:
+        setattr(target, name, value)
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://loadtest", timeout=None)
+    stand_ins.app_client = client
+    try:
+        async with main.app.router.lifespan_context(main.app):
+            # The tunnel stand-in publishes the base URL in the background
+            while (await client.get("/ready")).status_code != 200:
+                await asyncio.sleep(0.01)
+            try:
+                yield client
+            finally:
+                await stand_ins.drain()
+    finally:
+        await client.aclose()
+        for target, name, value in originals:
+            setattr(target, name, value)
+        stand_ins.api.stop_thread()
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes up from short sleeps."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started_at - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+def arrival_delays(pattern: str, calls: int, rate: float) -> List[float]:
+    """Offsets (seconds from start) at which each call arrives."""
+    if pattern == "burst":
+        return [0.0] * calls
+    if pattern == "constant":
+        return [i / rate for i in range(calls)]
+    if pattern == "poisson":
+        offsets, now = [], 0.0
+        for _ in range(calls):
+            now += random.expovariate(rate)
+            offsets.append(now)
+        return offsets
+    raise ValueError(f"Unknown arrival pattern: {pattern}")
+
+
+class LoadTest:
+    def __init__(self, args: argparse.Namespace):
+        self.args = args
+        self.latencies: Dict[str, List[float]] = {"incoming": [], "outbound": [], "sip_answer": [], "admission": []}
+        self.outcomes: Dict[str, int] = {}
+        self.peak_traced_bytes = 0
+        self.peak_active_calls = 0
+
+    def _count(self, outcome: str):
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def _sample_memory(self, stand_ins: StandIns):
+        # Traced memory at the moment the most calls were active
+        if stand_ins.jobs_active >= self.peak_active_calls:
+            self.peak_active_calls = stand_ins.jobs_active
+            self.peak_traced_bytes, _ = tracemalloc.get_traced_memory()
+
+    async def _timed_post(self, client: httpx.AsyncClient, kind: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started_at = time.perf_counter()
+        try:
+            response = await client.post(url, **kwargs)
+        except Exception as e:
+            self._count(f"{kind}_exception")
+            print(f"{kind} request failed: {e!r}", file=sys.stderr)
+            return None
+        self.latencies[kind].append(time.perf_counter() - started_at)
+        return response
+
+    async def _incoming_call(self, client: httpx.AsyncClient, index: int, poll_interval: float):
+        call_sid = f"CAin{index:030d}"
+        form = {"CallSid": call_sid, "From": f"+1555{index:07d}", "To": os.environ["TWILIO_PHONE_NUMBER"]}
+        arrived_at = time.perf_counter()
+        while True:
+            response = await self._timed_post(client, "incoming", "/webhook/incoming", data=form)
+            if response is None:
+                return
+            if response.status_code >= 400:
+                self._count("incoming_error")
+                return
+            body = response.text
+            if "<Redirect" in body:
+                # Held in the overflow queue; Twilio comes back after the hold audio
+                await asyncio.sleep(poll_interval)
+                continue
+            if "<Sip" in body:
+                self._count("incoming_connected")
+                self.latencies["admission"].append(time.perf_counter() - arrived_at)
+            else:
+                self._count("incoming_rejected")
+            return
+
+    async def _outbound_call(self, client: httpx.AsyncClient, index: int):
+        response = await self._timed_post(client, "outbound", "/call/make", params={"to_number": f"+1666{index:07d}"})
+        if response is None:
+            return
+        payload = response.json() if response.status_code < 400 else {}
+        details = payload.get("details") or {}
+        if payload.get("status") != "success" or details.get("status") == "failed":
+            self._count("outbound_rejected" if "capacity" in payload.get("message", "") else "outbound_error")
+            return
+        self._count("outbound_connected")
+        # Twilio fetches the answer TwiML once the callee picks up
+        answer = await self._timed_post(client, "sip_answer", f"/sip/answer/{details['room_id']}")
+        if answer is not None and answer.status_code >= 400:
+            self._count("sip_answer_error")
+
+    async def run(self) -> Dict[str, Any]:
+        args = self.args
+        if args.poll_interval is not None:
+            os.environ["CALL_QUEUE_POLL_SECONDS"] = str(args.poll_interval)
+        # Model setup and greeting latency of the fake models
+        os.environ["FAKE_MODEL_FIRST_TOKEN_MS"] = str(args.model_latency * 1000)
+        import main  # noqa: E402  (imported after the stand-in environment is set)
+
+        stand_ins = StandIns(args.room_latency, args.twilio_latency, args.call_duration)
+        offsets = arrival_delays(args.pattern, args.calls, args.rate)
+        slots = asyncio.Semaphore(args.concurrency)
+        poll_interval = main.admission.poll_interval
+        lag = LoopLagMonitor()
+
+        async def fire(client: httpx.AsyncClient, index: int, offset: float, started_at: float):
+            await asyncio.sleep(max(0.0, started_at + offset - time.perf_counter()))
+            async with slots:
+                if random.random() < args.outbound_ratio:
+                    await self._outbound_call(client, index)
+                else:
+                    await self._incoming_call(client, index, poll_interval)
+                self._sample_memory(stand_ins)
+
+        async with serve(main, stand_ins) as client:
+            tracemalloc.start()
+            baseline_traced, _ = tracemalloc.get_traced_memory()
+            lag.start()
+            started_at = time.perf_counter()
+            await asyncio.gather(*(fire(client, i, offset, started_at) for i, offset in enumerate(offsets)))
+            elapsed = time.perf_counter() - started_at
+            await lag.stop()
+            await stand_ins.drain()
+            tracemalloc.stop()
+            metrics_text = main.metrics_registry.render()
+
+        requests_sent = sum(len(self.latencies[kind]) for kind in ("incoming", "outbound", "sip_answer"))
+        errors = sum(count for outcome, count in self.outcomes.items() if outcome.endswith(("_error", "_exception")))
+        per_call_bytes = (
+            (self.peak_traced_bytes - baseline_traced) / self.peak_active_calls if self.peak_active_calls else None
+        )
+        return {
+            "config": vars(args),
+            "elapsed_s": round(elapsed, 3),
+            "requests": requests_sent,
+            "throughput_rps": round(requests_sent / elapsed, 1) if elapsed else None,
+            "outcomes": self.outcomes,
+            "error_rate": round(errors / args.calls, 4) if args.calls else 0.0,
+            "latency": {kind: summarize(values) for kind, values in self.latencies.items()},
+            "event_loop_lag": summarize(lag.samples),
+            "memory": {
+                "peak_active_calls": self.peak_active_calls,
+                "per_call_bytes": round(per_call_bytes) if per_call_bytes is not None else None,
+                "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            },
+            "stand_ins": {
+                "rooms_created": stand_ins.api.rooms_created,
+                "twilio_calls_created": stand_ins.api.calls_created,
+                "agent_jobs_launched": stand_ins.jobs_launched,
+            },
+            "metrics_bytes": len(metrics_text),
+        }
+
+
+async def run_room_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Room creation latency against the local stub API: the shared, pooled client
+    (VideoSDKMeeting) versus a new client per request (the previous behaviour).
+    The stub speaks plain HTTP, so TLS handshakes saved by pooling are not counted.
+    """
+    import main  # noqa: E402  (imported after the stand-in environment is set)
+
+    stub = StubApiServer(args.room_latency)
+    base_url = await stub.start()
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def per_request_client() -> str:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(f"{base_url}/rooms", headers={"Authorization": "token"}, json={})
+            response.raise_for_status()
+            return response.json()["roomId"]
+
+    videosdk = main.VideoSDKMeeting("token")
+    videosdk.base_url = base_url
+    await videosdk.start()
+
+    results = {}
+    for name, create_room in (("per_request_client", per_request_client), ("pooled_client", videosdk.create_room)):
+        latencies: List[float] = []
+        connections_before = stub.connections
+
+        async def timed():
+            async with slots:
+                started_at = time.perf_counter()
+                await create_room()
+                latencies.append(time.perf_counter() - started_at)
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(timed() for _ in range(args.calls)))
+        elapsed = time.perf_counter() - started_at
+        results[name] = {
+            **summarize(latencies),
+            "rooms_per_s": round(len(latencies) / elapsed, 1),
+            "connections": stub.connections - connections_before,
+        }
+
+    await videosdk.aclose()
+    await stub.stop()
+    return {"config": vars(args), "room_creation": results}
+
+
+def print_room_report(report: Dict[str, Any]):
+    config = report["config"]
+    print(f"\nRoom creation: {config['calls']} rooms, concurrency {config['concurrency']}, stub latency {config['room_latency']}s")
+    print("\n  client                  p50 ms   p99 ms   max ms   rooms/s   connections")
+    for name, stats in report["room_creation"].items():
+        print(f"  {name:<20} {stats['p50_ms']:>9} {stats['p99_ms']:>8} {stats['max_ms']:>8} {stats['rooms_per_s']:>9} {stats['connections']:>13}")
+
+
+async def run_answer_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Requests per second of /sip/answer/{room_id} alone, answered from the
+    precompiled TwiML templates versus building the TwiML per request (the
+    previous behaviour), plus the rendering throughput of each without HTTP.
+    """
+    import main  # noqa: E402  (imported after the stand-in environment is set)
+    from twilio.twiml.voice_response import VoiceResponse, Dial
+
+    manager = main.twilio_manager
+    precompiled = manager.get_sip_response_for_room
+
+    def per_request_builder(room_id: str) -> tuple:
+        sip_endpoint = manager.videosdk.get_sip_endpoint(room_id)
+        sip_creds = manager.videosdk.get_sip_credentials()
+        response = VoiceResponse()
+        dial = Dial(answer_on_bridge=True, action=f"{manager.base_url}/webhook/dial-complete", method="POST")
+        dial.sip(sip_endpoint, username=sip_creds["username"], password=sip_creds["password"])
+        response.append(dial)
+        return str(response), 200, {"Content-Type": "application/xml"}
+
+    stand_ins = StandIns(room_latency=0.0, twilio_latency=0.0, call_duration=0.0)
+    slots = asyncio.Semaphore(args.concurrency)
+    results = {}
+    async with serve(main, stand_ins) as client:
+        # Both must produce the same document, or the comparison is meaningless
+        if per_request_builder("room-check")[0].encode() != precompiled("room-check")[0]:
+            raise RuntimeError("Precompiled SIP TwiML differs from the per-request TwiML")
+        try:
+            for name, render in (("per_request_builder", per_request_builder), ("precompiled", precompiled)):
+                manager.get_sip_response_for_room = render
+                latencies: List[float] = []
+                errors = 0
+
+                async def answer(index: int):
+                    nonlocal errors
+                    async with slots:
+                        started_at = time.perf_counter()
+                        response = await client.post(f"/sip/answer/room-{index:06d}")
+                        latencies.append(time.perf_counter() - started_at)
+                        errors += response.status_code != 200
+
+                started_at = time.perf_counter()
+                await asyncio.gather(*(answer(i) for i in range(args.calls)))
+                elapsed = time.perf_counter() - started_at
+
+                render_started_at = time.perf_counter()
+                for i in range(args.calls):
+                    render(f"room-{i:06d}")
+                render_elapsed = time.perf_counter() - render_started_at
+
+                results[name] = {
+                    **summarize(latencies),
+                    "requests_per_s": round(len(latencies) / elapsed, 1),
+                    "errors": errors,
+                    "renders_per_s": round(args.calls / render_elapsed),
+                }
+        finally:
+            del manager.get_sip_response_for_room
+    return {"config": vars(args), "sip_answer": results}
+
+
+def print_answer_report(report: Dict[str, Any]):
+    config = report["config"]
+    print(f"\n/sip/answer: {config['calls']} requests, concurrency {config['concurrency']}")
+    print("\n  twiml                   p50 ms   p99 ms   max ms   req/s   errors   renders/s")
+    for name, stats in report["sip_answer"].items():
+        print(
+            f"  {name:<20} {stats['p50_ms']:>9} {stats['p99_ms']:>8} {stats['max_ms']:>8} "
+            f"{stats['requests_per_s']:>7} {stats['errors']:>8} {stats['renders_per_s']:>11}"
+        )
+
+
+def _rss_bytes() -> Optional[int]:
+    """Current resident memory of this process (Linux); ru_maxrss only ever grows."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+def _live_sessions() -> int:
+    import gc
+    from videosdk.agents import AgentSession
+
+    gc.collect()
+    return sum(isinstance(obj, AgentSession) for obj in gc.get_objects())
+
+
+async def run_specialist_level(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Set up ``--level`` concurrent calls through _agent_entrypoint in this process
+    (in the SPECIALIST_MODE it was started with) and measure, once every caller
+    has joined, the setup time of each call and the RSS the calls hold.
+    """
+    os.environ["FAKE_MODEL_FIRST_TOKEN_MS"] = str(args.model_latency * 1000)
+    import main  # noqa: E402  (imported after the stand-in environment is set)
+    from worker_pool import run_in_job_scope
+
+    setup_times: List[float] = []
+
+    async def call(index: int, room: OfflineRoom):
+        ctx = main._make_context(f"room-bench-{index}", "bench", call_id=f"CAbench{index:020d}")
+
+        async def connect():
+            ctx.room = room
+
+        async def shutdown():
+            pass
+
+        ctx.connect = connect
+        ctx.shutdown = shutdown
+        await run_in_job_scope(main._agent_entrypoint, ctx)
+
+    # One call first, so imports, caches and (in shared mode) the specialist host are in place
+    await call(0, OfflineRoom(join_delay=0.0, call_duration=0.0))
+    rss_before, sessions_before = _rss_bytes(), _live_sessions()
+
+    all_joined = asyncio.Event()
+    rooms: List[OfflineRoom] = []
+    started_at = time.perf_counter()
+
+    def joined():
+        setup_times.append(time.perf_counter() - started_at)
+        if len(setup_times) == args.level:
+            all_joined.set()
+
+    for _ in range(args.level):
+        rooms.append(OfflineRoom(join_delay=0.0, call_duration=3600.0, on_join=joined))
+    calls = [asyncio.create_task(call(index, room)) for index, room in enumerate(rooms, start=1)]
+    await all_joined.wait()
+    rss_peak, sessions_peak = _rss_bytes(), _live_sessions()
+    for room in rooms:
+        room.hang_up()
+    await asyncio.gather(*calls)
+
+    return {
+        "mode": main.SPECIALIST_MODE,
+        "calls": args.level,
+        "setup": summarize(setup_times),
+        "rss_before_bytes": rss_before,
+        "rss_peak_bytes": rss_peak,
+        "rss_per_call_bytes": round((rss_peak - rss_before) / args.level) if rss_peak and rss_before else None,
+        "agent_sessions": sessions_peak - sessions_before,
+    }
+
+
+def run_specialist_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Dedicated versus shared loan specialists at each concurrency level. Every
+    run gets a fresh interpreter, since the mode is read when main is imported
+    and RSS does not shrink back between runs.
+    """
+    results: List[Dict[str, Any]] = []
+    for mode in ("dedicated", "shared"):
+        for level in (int(level) for level in args.levels.split(",")):
+            proc = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--scenario", "specialists", "--level", str(level),
+                 "--model-latency", str(args.model_latency), "--json"],
+                env=dict(os.environ, SPECIALIST_MODE=mode), capture_output=True, text=True,
+            )
+            if proc.returncode != 0:
+                raise RuntimeError(f"{mode} run at {level} calls failed: {proc.stderr.strip().splitlines()[-1:]}")
+            results.append(json.loads(proc.stdout))
+    return {"config": vars(args), "specialists": results}
+
+
+def print_specialist_report(report: Dict[str, Any]):
+    print(f"\nSpecialist modes, fake model latency {report['config']['model_latency']}s")
+    print("\n  mode         calls   setup p50 ms   setup max ms   RSS MB   RSS/call KB   agent sessions")
+    for run in report["specialists"]:
+        rss_mb = run["rss_peak_bytes"] / 1024 / 1024 if run["rss_peak_bytes"] else None
+        per_call_kb = run["rss_per_call_bytes"] / 1024 if run["rss_per_call_bytes"] is not None else None
+        print(
+            f"  {run['mode']:<10} {run['calls']:>7} {run['setup']['p50_ms']:>14} {run['setup']['max_ms']:>14} "
+            f"{rss_mb:>8.1f} {per_call_kb:>13.1f} {run['agent_sessions']:>16}"
+        )
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\nCalls: {report['config']['calls']} ({report['config']['pattern']}), elapsed {report['elapsed_s']}s")
+    print(f"Throughput: {report['throughput_rps']} req/s over {report['requests']} requests")
+    print(f"Outcomes: {report['outcomes']}  error rate: {report['error_rate']:.2%}")
+    print("\nLatency (ms)        count      p50      p95      p99      max")
+    for kind, stats in list(report["latency"].items()) + [("event_loop_lag", report["event_loop_lag"])]:
+        if not stats["count"]:
+            continue
+        print(f"  {kind:<16} {stats['count']:>7} {stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['max_ms']:>8}")
+    memory = report["memory"]
+    print(f"\nMemory: {memory['per_call_bytes']} bytes/call at {memory['peak_active_calls']} active calls, max RSS {memory['max_rss_bytes']} bytes")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline load test for the SIP A2A server")
+    parser.add_argument("--scenario", choices=("calls", "rooms", "answer", "specialists"), default="calls",
+                        help="calls: full call setup through the webhooks; rooms: VideoSDK room creation only; "
+                             "answer: /sip/answer requests only; "
+                             "specialists: RSS and setup time of concurrent calls, dedicated vs shared specialists")
+    parser.add_argument("--calls", type=int, default=100,
+                        help="Number of calls to place (rooms to create for --scenario rooms, requests for --scenario answer)")
+    parser.add_argument("--concurrency", type=int, default=50, help="Maximum calls being set up at once")
+    parser.add_argument("--pattern", choices=("burst", "constant", "poisson"), default="poisson", help="Arrival pattern")
+    parser.add_argument("--rate", type=float, default=20.0, help="Arrivals per second for constant/poisson patterns")
+    parser.add_argument("--outbound-ratio", type=float, default=0.0, help="Fraction of calls placed through /call/make")
+    parser.add_argument("--room-latency", type=float, default=0.15, help="VideoSDK room API latency (s)")
+    parser.add_argument("--twilio-latency", type=float, default=0.2, help="Twilio calls.create latency (s)")
+    parser.add_argument("--model-latency", type=float, default=0.3, help="Fake model delay before the first token or audio frame (s)")
+    parser.add_argument("--call-duration", type=float, default=5.0, help="Simulated call length after the greeting (s)")
+    parser.add_argument("--poll-interval", type=float, default=None, help="Hold-loop poll interval override (s)")
+    parser.add_argument("--levels", default="1,10,50", help="Concurrent calls to compare for --scenario specialists")
+    parser.add_argument("--level", type=int, default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible arrival patterns")
+    parser.add_argument("--log-level", default=None, help="Server LOG_LEVEL (default WARNING, so logging does not skew results)")
+    parser.add_argument("--log-mode", choices=("sync", "queue"), default=None, help="Server LOG_MODE")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    return parser.parse_args(argv)
+
+
+def main_cli(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
+    # Logging is configured when main is imported, inside LoadTest.run
+    if args.log_level:
+        os.environ["LOG_LEVEL"] = args.log_level
+    if args.log_mode:
+        os.environ["LOG_MODE"] = args.log_mode
+    if args.seed is not None:
+        random.seed(args.seed)
+    if args.scenario == "rooms":
+        report = asyncio.run(run_room_benchmark(args))
+        printer = print_room_report
+    elif args.scenario == "answer":
+        report = asyncio.run(run_answer_benchmark(args))
+        printer = print_answer_report
+    elif args.scenario == "specialists" and args.level is not None:
+        # One mode and level, run by run_specialist_benchmark in a child process
+        report = asyncio.run(run_specialist_level(args))
+        printer = print
+    elif args.scenario == "specialists":
+        report = run_specialist_benchmark(args)
+        printer = print_specialist_report
+    else:
+        report = asyncio.run(LoadTest(args).run())
+        printer = print_report
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+    else:
+        printer(report)
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,202 @@
+"""
+Logging setup for the SIP server and its agent processes.
+
+LOG_MODE=sync (default) keeps the plain stream handler. LOG_MODE=queue moves
+formatting and I/O to a listener thread: the event loop only puts the
+unformatted record on a bounded queue (dropping it if the queue is full) and
+never blocks on the stream. Either mode supports:
+
+    LOG_FORMAT=json        One JSON object per line, with call_id/room_id context
+    LOG_RATE_LIMIT=N       At most N INFO/DEBUG records per second per logger (0 = unlimited)
+    LOG_SAMPLE_RATE=F      Fraction of high-volume records (logged with extra=SAMPLED) kept
+
+Use %-style arguments on hot paths (logger.debug("payload %s", data)) so that
+records below the level are never formatted.
+"""
+import os
+import sys
+import json
+import atexit
+import time
+import queue
+import random
+import logging
+import contextvars
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+# Mark high-volume records (payloads, TwiML, per-message traces) for sampling
+SAMPLED = {"sampled": True}
+
+_call_context: contextvars.ContextVar = contextvars.ContextVar("sip_a2a_call_context", default={})
+
+_listener: Optional[QueueListener] = None
+
+
+def bind_call(call_id: Optional[str] = None, room_id: Optional[str] = None) -> contextvars.Token:
+    """Attach call_id/room_id to every record logged from the current task (and tasks it creates)."""
+    context = dict(_call_context.get())
+    if call_id:
+        context["call_id"] = call_id
+    if room_id:
+        context["room_id"] = room_id
+    return _call_context.set(context)
+
+
+class ContextFilter(logging.Filter):
+    """Copies the bound call context onto the record (on the emitting thread, before queueing)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _call_context.get()
+        record.call_id = context.get("call_id")
+        record.room_id = context.get("room_id")
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket per logger for records below WARNING; warnings and errors always pass.
+    How many records were dropped is reported on the logger's next passing record.
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self._buckets: Dict[str, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.rate <= 0 or record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        bucket = self._buckets.get(record.name)
+        if bucket is None:
+            # [tokens, last refill, dropped since last passing record]
+            bucket = self._buckets[record.name] = [self.rate, now, 0]
+        bucket[0] = min(self.rate, bucket[0] + (now - bucket[1]) * self.rate)
+        bucket[1] = now
+        if bucket[0] < 1:
+            bucket[2] += 1
+            return False
+        bucket[0] -= 1
+        record.suppressed = bucket[2]
+        bucket[2] = 0
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps a fraction of records logged with extra=SAMPLED; others always pass."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, "sampled", False) or self.rate >= 1:
+            return True
+        return random.random() < self.rate
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for field in ("call_id", "room_id", "suppressed"):
+            value = getattr(record, field, None)
+            if value:
+                entry[field] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class TextFormatter(logging.Formatter):
+    """The repo's text format, with the call context appended when bound."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suffix = ""
+        call_id = getattr(record, "call_id", None)
+        if call_id:
+            suffix += f" [call_id={call_id} room_id={getattr(record, 'room_id', None)}]"
+        if getattr(record, "suppressed", 0):
+            suffix += f" ({record.suppressed} earlier messages rate limited)"
+        # Keep the suffix on the message line, ahead of any traceback
+        first_line, newline, rest = text.partition("\n")
+        return first_line + suffix + newline + rest
+
+
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    Queues records without formatting them; the listener thread formats.
+
+    Arguments are formatted later, so hot-path callers must not mutate objects
+    after passing them as log arguments.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info and not record.exc_text:
+            # Tracebacks reference live frames; render them now
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def configure_logging(level: Optional[str] = None) -> None:
+    """
+    Configure the root logger from LOG_LEVEL, LOG_MODE, LOG_FORMAT, LOG_RATE_LIMIT,
+    LOG_SAMPLE_RATE and LOG_QUEUE_SIZE.
+    """
+    global _listener
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    mode = os.getenv("LOG_MODE", "sync").lower()
+    fmt = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+    stream_handler = logging.StreamHandler(sys.stderr)
+    stream_handler.setFormatter(JsonFormatter() if os.getenv("LOG_FORMAT", "text").lower() == "json" else TextFormatter(fmt))
+
+    filters = [
+        ContextFilter(),
+        SamplingFilter(float(os.getenv("LOG_SAMPLE_RATE", 1.0))),
+        RateLimitFilter(float(os.getenv("LOG_RATE_LIMIT", 0))),
+    ]
+
+    if mode == "queue":
+        handler: logging.Handler = _NonBlockingQueueHandler(queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", 10000))))
+        stop_listener()
+        _listener = QueueListener(handler.queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_listener)
+    else:
+        handler = stream_handler
+    for log_filter in filters:
+        handler.addFilter(log_filter)
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def stop_listener() -> None:
+    """Flush and stop the queue listener thread (LOG_MODE=queue)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
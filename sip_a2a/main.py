@@ -2,15 +2,23 @@ import asyncio
 import os
 import logging
 import functools
+import random
+import signal
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager, suppress
-from typing import Optional, Dict, Any, Type, Callable
+from typing import TYPE_CHECKING, Optional, Dict, Any, Type, Callable, Union
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request, Response
-import uvicorn
-from pyngrok import ngrok
-from twilio.rest import Client
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from twilio.twiml.voice_response import VoiceResponse, Dial
-import httpx
+
+if TYPE_CHECKING:
+    # The REST clients are imported where they are used: pooled agent workers import
+    # this module for _agent_entrypoint and never place calls or create rooms
+    import httpx
+    from twilio.rest import Client
 
 # VideoSDK imports
 from videosdk.agents import JobContext, RoomOptions, WorkerJob, AgentSession, Pipeline, Agent
@@ -19,23 +27,40 @@ from videosdk.agents import JobContext, RoomOptions, WorkerJob, AgentSession, Pi
 from agents.customer_agent import SIPCustomerServiceAgent
 from agents.loan_agent import SIPLoanSpecialistAgent
 from session_manager import create_pipeline, create_session
+from room_pool import RoomPool
+from agent_pool import AgentPool
+from specialist_host import SpecialistHost
+from answer_cache import create_answer_cache, openai_embedder
+from admission import AdmissionController, QUEUED, REJECTED
+from session_registry import create_session_registry
+from worker_pool import WorkerPool, PooledJob
+from twiml_templates import RoomTwiMLTemplate, ROOM_PLACEHOLDER
+from drain import DrainController
+from campaign import CampaignDialer
+from webhook_cache import IdempotencyCache
+from call_history import CallRecord, CallHistory
+from log_pipeline import configure_logging, bind_call, SAMPLED
+from base_url import BaseUrlProvider, create_base_url_provider
+from teardown import LeakChecker, run_teardown
+from metrics import (
+    registry as metrics_registry,
+    WEBHOOK_PHASE_SECONDS, CALL_PHASE_SECONDS, CLEANUP_SECONDS,
+    ACTIVE_CALLS, CALLS_TOTAL, CALL_FAILURES,
+)
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
+# Configure logging (LOG_MODE=queue moves formatting and I/O off the event loop; see log_pipeline.py)
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging(LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 # Also set verbose logging for VideoSDK agents
 logging.getLogger("videosdk").setLevel(LOG_LEVEL)
 logging.getLogger("agents").setLevel(LOG_LEVEL)
 
-logger.info(f"Logging configured at level: {LOG_LEVEL}")
+logger.info(f"Logging configured at level: {LOG_LEVEL} (mode: {os.getenv('LOG_MODE', 'sync')})")
 
 # Check required environment variables
 def check_environment():
@@ -71,15 +96,37 @@ def check_environment():
 if not check_environment():
     exit(1)
 
-# Global state for managing active sessions
-active_sessions: Dict[str, Dict[str, Any]] = {}
+# Call sessions (SESSION_REGISTRY_URL). The in-memory default serves one server process; several
+# server workers need a shared registry, through which a call's end reported to one worker reaches
+# the worker that owns the call (its admission slot, campaign and history entry)
+session_registry = create_session_registry()
+# Calls launched by this process, with their WorkerJob / PooledJob handles (which cannot be shared)
+local_calls: Dict[str, CallRecord] = {}
+# Completed calls, for /stats
+call_history = CallHistory()
 
 # Configuration
 HUMAN_SUPPORT_NUMBER = os.getenv("HUMAN_SUPPORT_NUMBER", "+918200367305")
+SPECIALIST_READY_TIMEOUT = float(os.getenv("SPECIALIST_READY_TIMEOUT", 10))
+# "dedicated" starts a specialist per call, "shared" serves all calls in a worker from a SpecialistHost
+SPECIALIST_MODE = os.getenv("SPECIALIST_MODE", "dedicated").lower()
+
+# Cache of loan answers, shared by every specialist in the process; with
+# ANSWER_CACHE_URL=sqlite:///... it is shared by every worker and agent process on the host
+answer_cache = create_answer_cache(
+    embed=openai_embedder() if os.getenv("ANSWER_CACHE_EMBEDDINGS", "false").lower() == "true" else None
+)
+
+# Per-process host of shared specialists (used when SPECIALIST_MODE=shared)
+specialist_host = SpecialistHost(ready_timeout=SPECIALIST_READY_TIMEOUT, answer_cache=answer_cache)
+
+# Total time a call's teardown may take before hung steps are abandoned
+CALL_TEARDOWN_BUDGET = float(os.getenv("CALL_TEARDOWN_BUDGET", 10))
+leak_checker = LeakChecker()
 
 def on_pubsub_message(message):
     """Handle pubsub messages."""
-    logger.info(f"Pubsub message received: {message}")
+    logger.debug("Pubsub message received: %s", message, extra=SAMPLED)
 
 
 async def _agent_entrypoint(ctx: JobContext):
@@ -89,14 +136,31 @@ async def _agent_entrypoint(ctx: JobContext):
     for the duration of a single SIP call, ensuring they can communicate via A2A.
     This follows the pattern from the working examples/a2a/main.py.
     """
+    started_at = time.perf_counter()
     room_id = ctx.room_options.room_id
     call_id = getattr(ctx, 'call_id', 'N/A')
+    bind_call(call_id, room_id)
     logger.info(f"[{room_id}] Starting agent entrypoint for call {call_id}")
 
     specialist_session: Optional[AgentSession] = None
     customer_session: Optional[AgentSession] = None
     specialist_task: Optional[asyncio.Task] = None
 
+    # Pre-built pipelines for this call, if the worker has one ready
+    shell = agent_pool.checkout()
+    leak_probe = leak_checker.start(call_id)
+
+    CALLS_TOTAL.inc()
+    ACTIVE_CALLS.inc()
+    phase_started_at = started_at
+
+    def end_phase(phase: str) -> None:
+        """Record how long the call spent in a setup phase."""
+        nonlocal phase_started_at
+        now = time.perf_counter()
+        CALL_PHASE_SECONDS.observe(now - phase_started_at, phase=phase)
+        phase_started_at = now
+
     # Create an event to track when the participant leaves
     participant_left_event = asyncio.Event()
 
@@ -106,30 +170,47 @@ async def _agent_entrypoint(ctx: JobContext):
         participant_left_event.set()
 
     try:
-        # 1. Create Specialist Agent
-        logger.info(f"[{room_id}] Creating Loan Specialist Agent...")
-        specialist_agent = SIPLoanSpecialistAgent()
-        specialist_pipeline = create_specialist_pipeline()
-        specialist_session = create_session(specialist_agent, specialist_pipeline)
-        logger.info(f"[{room_id}] Specialist agent created.")
+        # 1. Create Specialist Agent (dedicated mode only)
+        if SPECIALIST_MODE != "shared":
+            logger.info(f"[{room_id}] Creating Loan Specialist Agent...")
+            specialist_agent = SIPLoanSpecialistAgent(answer_cache=answer_cache)
+            specialist_pipeline = shell.specialist_pipeline if shell else create_specialist_pipeline()
+            specialist_session = create_session(specialist_agent, specialist_pipeline)
+            logger.info(f"[{room_id}] Specialist agent created.")
 
         # 2. Create Customer Agent
         logger.info(f"[{room_id}] Creating Customer Service Agent...")
-        customer_agent = SIPCustomerServiceAgent(ctx=ctx)
-        customer_pipeline = create_customer_pipeline()
+        customer_agent = SIPCustomerServiceAgent(ctx=ctx, on_status=lambda status: session_registry.update(call_id, status=status))
+        customer_pipeline = shell.customer_pipeline if shell else create_customer_pipeline()
         customer_session = create_session(customer_agent, customer_pipeline)
-        logger.info(f"[{room_id}] Customer agent created.")
+        logger.info(f"[{room_id}] Customer agent created (pipeline pool {'hit' if shell else 'miss'}).")
+        end_phase("agents_created")
 
-        # 3. Start Specialist Agent in the background
-        logger.info(f"[{room_id}] Starting specialist agent session in background...")
-        specialist_task = asyncio.create_task(specialist_session.start())
-        # Give a moment for it to start and register for A2A
-        await asyncio.sleep(1)
-        logger.info(f"[{room_id}] Specialist agent session started.")
+        # 3. Start Specialist Agent in the background, or attach to the shared specialists
+        try:
+            if SPECIALIST_MODE == "shared":
+                logger.info(f"[{room_id}] Using shared specialist host...")
+                await specialist_host.start()
+            else:
+                logger.info(f"[{room_id}] Starting specialist agent session in background...")
+                specialist_task = asyncio.create_task(specialist_session.start())
+                # Wait until it has registered for A2A before the customer agent can forward to it
+                await specialist_agent.wait_until_ready(timeout=SPECIALIST_READY_TIMEOUT)
+            specialist_ready_ms = (time.perf_counter() - phase_started_at) * 1000
+            end_phase("specialist_ready")
+            logger.info(f"[{room_id}] Specialist agent session started. specialist_ready_ms={specialist_ready_ms:.1f}")
+        except asyncio.TimeoutError:
+            CALL_FAILURES.inc(stage="specialist_ready")
+            logger.warning(f"[{room_id}] Specialist agent not ready after {SPECIALIST_READY_TIMEOUT}s, continuing without it")
+        except Exception as e:
+            CALL_FAILURES.inc(stage="specialist_ready")
+            logger.error(f"[{room_id}] Specialist agent failed to become ready: {e}")
 
         # 4. Connect to the room and start the Customer Agent
         logger.info(f"[{room_id}] Connecting to VideoSDK room...")
         await ctx.connect()
+        end_phase("connected")
+        session_registry.update(call_id, status="connected")
 
         # Register for participant_left events
         if hasattr(ctx.room, 'meeting') and hasattr(ctx.room.meeting, 'on'):
@@ -138,15 +219,26 @@ async def _agent_entrypoint(ctx: JobContext):
 
         logger.info(f"[{room_id}] Starting customer agent session...")
         await customer_session.start()
+        end_phase("customer_session_started")
         logger.info(f"[{room_id}] Customer agent session started.")
 
         # 5. Wait for the call to proceed
         logger.info(f"[{room_id}] Agents are running. Waiting for participant...")
         participant_id = await ctx.room.wait_for_participant()
+        end_phase("participant_joined")
         logger.info(f"[{room_id}] Participant {participant_id} joined.")
 
         await customer_agent.greet_user()
-        logger.info(f"[{room_id}] User greeted.")
+        end_phase("greeted")
+        metrics_registry.flush(force=True)
+        session_registry.update(call_id, status="greeted")
+        logger.info(
+            f"[{room_id}] User greeted. Time to greeting: {time.perf_counter() - started_at:.3f}s "
+            f"(pipeline pool {'hit' if shell else 'miss'})"
+        )
+
+        # Pre-build pipelines for the next call handled by this worker, off the greeting path
+        agent_pool.fill_in_background()
 
         # Keep the process alive until the call ends (participant leaves or timeout)
         logger.info(f"[{room_id}] Waiting for call to end...")
@@ -160,46 +252,53 @@ async def _agent_entrypoint(ctx: JobContext):
     except (asyncio.CancelledError, KeyboardInterrupt):
         logger.info(f"[{room_id}] Entrypoint cancelled.")
     except Exception as e:
+        CALL_FAILURES.inc(stage="agent_job")
         logger.error(f"[{room_id}] EXCEPTION in agent job: {e}", exc_info=True)
     finally:
         logger.info(f"[{room_id}] Cleaning up resources for call {call_id}...")
+        cleanup_started_at = time.perf_counter()
 
-        # Gracefully shut down the specialist task
-        if specialist_task and not specialist_task.done():
-            specialist_task.cancel()
-            with suppress(asyncio.CancelledError):
-                await specialist_task
-                logger.info(f"[{room_id}] Specialist task cancelled.")
-
-        # Close sessions
-        if specialist_session:
-            await specialist_session.close()
-            logger.info(f"[{room_id}] Specialist session closed.")
-        if customer_session:
-            await customer_session.close()
-            logger.info(f"[{room_id}] Customer session closed.")
-
-        # Shutdown the connection context
-        await ctx.shutdown()
-        logger.info(f"[{room_id}] Context shut down.")
+        async def cancel_specialist_task():
+            if specialist_task and not specialist_task.done():
+                specialist_task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await specialist_task
 
-        # Properly clean up room (fix for warning about un-awaited coroutine)
-        if hasattr(ctx, 'room') and ctx.room:
-            try:
+        async def cleanup_room():
+            # Properly clean up room (fix for warning about un-awaited coroutine)
+            if hasattr(ctx, 'room') and ctx.room:
                 # First leave the meeting if possible
                 if hasattr(ctx.room, 'leave'):
                     ctx.room.leave()
                 # Then properly await the cleanup coroutine
                 if hasattr(ctx.room, 'cleanup'):
                     await ctx.room.cleanup()
-                logger.info(f"[{room_id}] Room cleanup complete.")
-            except Exception as e:
-                logger.error(f"[{room_id}] Error during room cleanup: {e}")
 
-        # Clean up from active sessions registry
-        if call_id in active_sessions:
-            active_sessions.pop(call_id, None)
-            logger.info(f"[{room_id}] Removed from active sessions.")
+        # Sessions and room are torn down in parallel; hung steps are abandoned at the budget
+        teardown_groups = {"room": [("shutdown", ctx.shutdown), ("cleanup", cleanup_room)]}
+        if specialist_task or specialist_session:
+            teardown_groups["specialist"] = [("cancel_task", cancel_specialist_task)]
+            if specialist_session:
+                teardown_groups["specialist"].append(("close_session", specialist_session.close))
+        if customer_session:
+            teardown_groups["customer"] = [("close_session", customer_session.close)]
+        teardown_results = await run_teardown(teardown_groups, budget=CALL_TEARDOWN_BUDGET, label=room_id)
+        logger.info(f"[{room_id}] Teardown finished: {teardown_results}")
+
+        agent_pool.checkin(shell)
+        specialist_host.release_call(call_id)
+
+        # The server removes the record when Twilio reports the call over (_end_call), possibly on
+        # another server worker; removing it here would hide that report from the call's owner
+        try:
+            session_registry.update(call_id, agent_finished=True)
+        except Exception as e:
+            logger.error(f"[{room_id}] Error updating call in session registry: {e}")
+
+        CLEANUP_SECONDS.observe(time.perf_counter() - cleanup_started_at)
+        ACTIVE_CALLS.dec()
+        await leak_checker.finish(leak_probe, label=room_id)
+        metrics_registry.flush(force=True)
 
 def _make_context(room_id: str, room_name: str, call_id: Optional[str] = None, caller_number: Optional[str] = None) -> JobContext:
     """Create context for agent job (following SIP plugin pattern)."""
@@ -210,19 +309,31 @@ def _make_context(room_id: str, room_name: str, call_id: Optional[str] = None, c
         ctx.caller_number = caller_number
     return ctx
 
+async def _warm_agent_worker():
+    """Fill the pipeline pool of a pooled worker before it takes its first call."""
+    await agent_pool.start()
+
+async def _shut_down_agent_worker():
+    """Release what a pooled worker keeps across calls before it exits."""
+    await agent_pool.stop()
+    await specialist_host.close()
+
+# Pre-forked, pre-imported workers for agent jobs (WORKER_POOL_SIZE, disabled by default)
+worker_pool = WorkerPool(_agent_entrypoint, warmup=_warm_agent_worker, shutdown=_shut_down_agent_worker)
+
 def launch_agent_job(
     room_id: str,
     agent_config: Optional[Dict[str, Any]] = None,
     call_id: Optional[str] = None,
     caller_number: Optional[str] = None,
-) -> WorkerJob:
-    """Creates and starts a WorkerJob for a single call, running both agents."""
+) -> Union[WorkerJob, PooledJob]:
+    """Runs the agents for a single call on an idle pooled worker, or in a fresh WorkerJob."""
     logger.info(f"Launching agent job for room {room_id}, call {call_id}")
 
     if agent_config is None:
         agent_config = {}
 
-    logger.info(f"Creating context factory partial for room {room_id}")
+    logger.debug("Creating context factory partial for room %s", room_id)
     context_factory_partial = functools.partial(
         _make_context,
         room_id=room_id,
@@ -231,10 +342,15 @@ def launch_agent_job(
         caller_number=caller_number
     )
 
-    logger.info(f"Creating WorkerJob with entrypoint: _agent_entrypoint")
+    pooled_job = worker_pool.try_dispatch(call_id, context_factory_partial)
+    if pooled_job:
+        logger.info(f"Dispatched call {call_id} to the worker pool")
+        return pooled_job
+
+    logger.debug("Creating WorkerJob with entrypoint: _agent_entrypoint")
     job = WorkerJob(entrypoint=_agent_entrypoint, jobctx=context_factory_partial)
 
-    logger.info(f"Starting WorkerJob...")
+    logger.debug("Starting WorkerJob...")
     job.start()
 
     logger.info(f"WorkerJob started successfully for room {room_id}")
@@ -243,31 +359,101 @@ def launch_agent_job(
 class VideoSDKMeeting:
     """Service for managing VideoSDK rooms."""
 
+    # Status codes that are worth retrying with backoff
+    RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
     def __init__(self, auth_token: str):
         self.auth_token = auth_token
         self.base_url = "https://api.videosdk.live/v2"
+        self.timeout = float(os.getenv("VIDEOSDK_HTTP_TIMEOUT", 5.0))
+        self.max_retries = int(os.getenv("VIDEOSDK_HTTP_RETRIES", 3))
+        self.max_connections = int(os.getenv("VIDEOSDK_HTTP_MAX_CONNECTIONS", 20))
+        self.http2 = os.getenv("VIDEOSDK_HTTP2", "true").lower() == "true"
+        self.client: Optional["httpx.AsyncClient"] = None
+
+    async def start(self):
+        """Open the shared, pooled HTTP client (called from the app lifespan)."""
+        if self.client is not None:
+            return
+        import httpx
+
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401  (httpx needs the h2 package for HTTP/2)
+            except ImportError:
+                logger.warning("VIDEOSDK_HTTP2 is enabled but the 'h2' package is not installed, using HTTP/1.1")
+                http2 = False
+
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": self.auth_token or ""},
+            http2=http2,
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+                keepalive_expiry=60.0,
+            ),
+        )
+        logger.info(f"VideoSDK HTTP client started (http2={http2}, max_connections={self.max_connections})")
+
+    async def aclose(self):
+        """Close the shared HTTP client."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+            logger.info("VideoSDK HTTP client closed")
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> "httpx.Response":
+        """
+        POST to the VideoSDK API, retrying 429/5xx responses and connection failures with jittered backoff.
+
+        Errors after the request may have been sent (read timeouts, dropped connections) are not
+        retried: the first request may already have created the room, and a retry would orphan it.
+        """
+        import httpx
+        if self.client is None:
+            await self.start()
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.post(path, json=payload)
+                if response.status_code not in self.RETRYABLE_STATUS_CODES or attempt == self.max_retries:
+                    return response
+                logger.warning(f"VideoSDK API returned {response.status_code} for {path}, retrying (attempt {attempt + 1})")
+                retry_after = response.headers.get("Retry-After")
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                logger.warning(f"VideoSDK API request to {path} failed: {e!r}, retrying (attempt {attempt + 1})")
+                retry_after = None
+
+            # Full jitter exponential backoff, honouring Retry-After when given in seconds
+            delay = random.uniform(0, min(2.0, 0.1 * (2 ** attempt)))
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
 
     async def create_room(self) -> str:
         """Create a new VideoSDK room."""
-        url = f"{self.base_url}/rooms"
-        headers = {"Authorization": self.auth_token}
+        import httpx
         payload = {}
 
         region = os.getenv("VIDEOSDK_REGION")
         if region:
             payload["geoFence"] = region
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                room_id = response.json().get("roomId")
-                if not room_id:
-                    raise ValueError("roomId not found in response")
-                return room_id
-            except httpx.HTTPStatusError as e:
-                logger.error(f"HTTP error creating room: {e.response.status_code} - {e.response.text}")
-                raise Exception("Failed to create VideoSDK room")
+        try:
+            response = await self._post("/rooms", payload)
+            response.raise_for_status()
+            room_id = response.json().get("roomId")
+            if not room_id:
+                raise ValueError("roomId not found in response")
+            return room_id
+        except httpx.HTTPStatusError as e:
+            logger.error(f"HTTP error creating room: {e.response.status_code} - {e.response.text}")
+            raise Exception("Failed to create VideoSDK room")
 
     def get_sip_endpoint(self, room_id: str) -> str:
         """Get SIP endpoint for a room."""
@@ -281,41 +467,161 @@ class VideoSDKMeeting:
             raise ValueError("VIDEOSDK_SIP_USERNAME and VIDEOSDK_SIP_PASSWORD must be set")
         return {"username": username, "password": password}
 
+def _is_transient(error: Exception) -> bool:
+    """Whether a failed call creation may succeed if retried: Twilio rate limiting or 5xx, or a network/room error."""
+    from twilio.base.exceptions import TwilioRestException
+    if isinstance(error, TwilioRestException):
+        return error.status == 429 or error.status >= 500
+    return True
+
 class TwilioManager:
     """Direct Twilio integration without the plugin."""
 
     def __init__(self):
-        self.client = Client(
-            os.getenv("TWILIO_ACCOUNT_SID"),
-            os.getenv("TWILIO_AUTH_TOKEN")
-        )
+        self._client: Optional["Client"] = None
         self.from_number = os.getenv("TWILIO_PHONE_NUMBER")
         # VideoSDKMeeting expects a JWT; generate it from VIDEOSDK_API_KEY and VIDEOSDK_SECRET_KEY
         self.videosdk = VideoSDKMeeting(os.getenv("VIDEOSDK_TOKEN"))
+        self.room_pool = RoomPool(self.videosdk.create_room)
         self.base_url = None
+        # Hold/busy TwiML is identical for every caller, so it is built once per base URL
+        self._twiml_cache: Dict[Any, str] = {}
+        # SIP <Dial> TwiML precompiled per base URL; requests only substitute the room id
+        self._sip_templates: Dict[str, RoomTwiMLTemplate] = {}
+
+        # Async Twilio transport, set up in start(); the sync client must never run on the event loop
+        self.async_client: Optional["Client"] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.max_workers = int(os.getenv("TWILIO_MAX_WORKERS", 8))
+
+    @property
+    def client(self) -> "Client":
+        """Sync Twilio REST client, created on first use."""
+        if self._client is None:
+            from twilio.rest import Client
+            self._client = Client(
+                os.getenv("TWILIO_ACCOUNT_SID"),
+                os.getenv("TWILIO_AUTH_TOKEN")
+            )
+        return self._client
+
+    async def start(self):
+        """Set up a non-blocking Twilio transport (called from the app lifespan)."""
+        from twilio.rest import Client
+        try:
+            # Native asyncio transport with a pooled aiohttp session (needs aiohttp + aiohttp-retry)
+            from twilio.http.async_http_client import AsyncTwilioHttpClient
+            self.async_client = Client(
+                os.getenv("TWILIO_ACCOUNT_SID"),
+                os.getenv("TWILIO_AUTH_TOKEN"),
+                http_client=AsyncTwilioHttpClient(pool_connections=True)
+            )
+            logger.info("Twilio async HTTP client started")
+        except ImportError:
+            # Fall back to running the pooled sync client in a bounded thread pool
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="twilio")
+            logger.info(f"Twilio async client unavailable, using thread pool (max_workers={self.max_workers})")
+
+    async def aclose(self):
+        """Release the Twilio transport."""
+        if self.async_client is not None:
+            await self.async_client.http_client.close()
+            self.async_client = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        logger.info("Twilio transport closed")
+
+    async def _ensure_started(self):
+        """Start the transport if a request arrives before start() ran (e.g. outside the app lifespan)."""
+        if self.async_client is None and self._executor is None:
+            await self.start()
+
+    async def _create_call(self, **kwargs):
+        """Create a Twilio call without blocking the event loop."""
+        await self._ensure_started()
+        if self.async_client is not None:
+            return await self.async_client.calls.create_async(**kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(self.client.calls.create, **kwargs))
+
+    async def hangup(self, call_sid: str):
+        """End a call by marking it completed, which also ends its SIP leg."""
+        await self._ensure_started()
+        if self.async_client is not None:
+            await self.async_client.calls(call_sid).update_async(status="completed")
+            return
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self._executor, functools.partial(self.client.calls(call_sid).update, status="completed"))
 
     def set_base_url(self, base_url: str):
         """Set the base URL for webhooks."""
         self.base_url = base_url
+        self._twiml_cache.clear()
+        self._sip_templates = {}
         logger.info(f"Base URL set: {self.base_url}")
+        try:
+            self._compile_sip_templates()
+        except ValueError as e:
+            logger.error(f"SIP TwiML templates not compiled: {e}")
+
+    def _compile_sip_templates(self):
+        """Serialize the SIP <Dial> responses once, with credentials escaped, leaving a room id placeholder."""
+        sip_creds = self.videosdk.get_sip_credentials()
+        sip_endpoint = self.videosdk.get_sip_endpoint(ROOM_PLACEHOLDER)
+        greetings = {
+            "answer": None,
+            "incoming": "Please wait while we connect you to our customer service.",
+        }
+
+        templates = {}
+        for name, greeting in greetings.items():
+            response = VoiceResponse()
+            if greeting:
+                response.say(greeting, voice='alice')
+            # Twilio requests the action URL when the dialed leg ends, which frees the admission slot
+            dial = Dial(answer_on_bridge=True, action=f"{self.base_url}/webhook/dial-complete", method="POST")
+            dial.sip(sip_endpoint, username=sip_creds["username"], password=sip_creds["password"])
+            response.append(dial)
+            templates[name] = RoomTwiMLTemplate(str(response))
+
+        self._sip_templates = templates
+        logger.info(f"Compiled SIP TwiML templates (username={sip_creds['username']})")
+
+    def _render_sip_twiml(self, name: str, room_id: str) -> bytes:
+        """Render a precompiled SIP template for a room, compiling the templates on first use."""
+        if not self._sip_templates:
+            self._compile_sip_templates()
+        return self._sip_templates[name].render(room_id)
 
     async def make_call(self, to_number: str) -> Dict[str, Any]:
-        """Make an outgoing call."""
+        """
+        Make an outgoing call. Twilio reports its final status to /webhook/call-status,
+        so calls that are never answered still release their slot.
+
+        Returns:
+            sid, status and room_id; or status "failed" with the error and whether retrying may succeed
+        """
+        started_at = time.perf_counter()
         try:
-            logger.info(f"Creating VideoSDK room for call to {to_number}")
-            room_id = await self.videosdk.create_room()
-            logger.info(f"VideoSDK room created: {room_id}")
+            logger.info(f"Acquiring VideoSDK room for call to {to_number}")
+            room_id = await self.room_pool.acquire()
+            logger.info(f"VideoSDK room acquired: {room_id}")
+            WEBHOOK_PHASE_SECONDS.observe(time.perf_counter() - started_at, webhook="outbound", phase="room_created")
 
             webhook_url = f"{self.base_url}/sip/answer/{room_id}"
             logger.info(f"Making Twilio call to {to_number} with webhook {webhook_url}")
 
-            call = self.client.calls.create(
+            call = await self._create_call(
                 to=to_number,
                 from_=self.from_number,
-                url=webhook_url
+                url=webhook_url,
+                status_callback=f"{self.base_url}/webhook/call-status",
+                status_callback_method="POST"
             )
 
             logger.info(f"Twilio call created - SID: {call.sid}, Status: {call.status}")
+            WEBHOOK_PHASE_SECONDS.observe(time.perf_counter() - started_at, webhook="outbound", phase="call_created")
 
             return {
                 "sid": call.sid,
@@ -323,24 +629,17 @@ class TwilioManager:
                 "room_id": room_id
             }
         except Exception as e:
+            CALL_FAILURES.inc(stage="outbound_call")
             logger.error(f"Error making call: {e}", exc_info=True)
-            return {"status": "failed", "error": str(e)}
+            return {"status": "failed", "error": str(e), "retryable": _is_transient(e)}
 
     def handle_incoming_call(self, webhook_data: Dict[str, Any], room_id: str) -> tuple:
         """Handle incoming call and return TwiML response."""
         try:
-            sip_endpoint = self.videosdk.get_sip_endpoint(room_id)
-            sip_creds = self.videosdk.get_sip_credentials()
-
-            response = VoiceResponse()
-            response.say("Please wait while we connect you to our customer service.", voice='alice')
-            dial = Dial(answer_on_bridge=True)
-            dial.sip(sip_endpoint, username=sip_creds["username"], password=sip_creds["password"])
-            response.append(dial)
-
-            xml_response = str(response)
-            logger.info(f"Responding with TwiML: {xml_response}")
-            return xml_response, 200, {"Content-Type": "application/xml"}
+            twiml = self._render_sip_twiml("incoming", room_id)
+            # The TwiML carries the SIP password, so only its size is logged
+            logger.info(f"Responding with SIP TwiML for room {room_id} ({len(twiml)} bytes)")
+            return twiml, 200, {"Content-Type": "application/xml"}
 
         except Exception as e:
             logger.error(f"Error handling incoming call: {e}", exc_info=True)
@@ -349,22 +648,9 @@ class TwilioManager:
     def get_sip_response_for_room(self, room_id: str) -> tuple:
         """Generate SIP response for a room."""
         try:
-            logger.info(f"Generating SIP response for room: {room_id}")
-            sip_endpoint = self.videosdk.get_sip_endpoint(room_id)
-            sip_creds = self.videosdk.get_sip_credentials()
-
-            logger.info(f"SIP endpoint: {sip_endpoint}")
-            logger.info(f"SIP credentials: username={sip_creds['username']}")
-
-            response = VoiceResponse()
-            dial = Dial(answer_on_bridge=True)
-            dial.sip(sip_endpoint, username=sip_creds["username"], password=sip_creds["password"])
-            response.append(dial)
-
-            twiml_response = str(response)
-            logger.info(f"Generated TwiML response: {twiml_response}")
-
-            return twiml_response, 200, {"Content-Type": "application/xml"}
+            twiml = self._render_sip_twiml("answer", room_id)
+            logger.debug("Generated SIP TwiML for room %s (%d bytes)", room_id, len(twiml))
+            return twiml, 200, {"Content-Type": "application/xml"}
         except ValueError as e:
             if "VIDEOSDK_SIP" in str(e):
                 logger.error(f"SIP credentials not configured: {e}")
@@ -374,9 +660,56 @@ class TwilioManager:
             logger.error(f"Error generating SIP response for room {room_id}: {e}", exc_info=True)
             return "An error occurred", 500, {"Content-Type": "text/plain"}
 
+    def get_hold_response(self, announce: bool, poll_interval: float) -> str:
+        """
+        TwiML for a queued caller: hold audio (HOLD_MUSIC_URL) or a pause, then a redirect
+        back to the incoming webhook so the call is re-checked for admission.
+        Hold audio should be shorter than the poll interval.
+        """
+        key = ("hold", announce, self.base_url)
+        if key not in self._twiml_cache:
+            response = VoiceResponse()
+            if announce:
+                response.say("All of our agents are currently busy. Please stay on the line and we will be with you shortly.", voice='alice')
+            hold_music_url = os.getenv("HOLD_MUSIC_URL")
+            if hold_music_url:
+                response.play(hold_music_url)
+            else:
+                response.pause(length=int(poll_interval))
+            response.redirect(f"{self.base_url}/webhook/incoming", method="POST")
+            self._twiml_cache[key] = str(response)
+        return self._twiml_cache[key]
+
+    def get_drain_response(self, redirect_url: Optional[str]) -> str:
+        """TwiML for a caller reaching a draining server: redirect to another server, or busy."""
+        if not redirect_url:
+            return self.get_busy_response()
+        key = ("drain", redirect_url)
+        if key not in self._twiml_cache:
+            response = VoiceResponse()
+            response.redirect(redirect_url, method="POST")
+            self._twiml_cache[key] = str(response)
+        return self._twiml_cache[key]
+
+    def get_busy_response(self) -> str:
+        """TwiML asking the caller to call back later."""
+        key = ("busy",)
+        if key not in self._twiml_cache:
+            response = VoiceResponse()
+            response.say("We are receiving an unusually high number of calls. Please call back later.", voice='alice')
+            response.hangup()
+            self._twiml_cache[key] = str(response)
+        return self._twiml_cache[key]
+
 # Initialize Twilio manager
 twilio_manager = TwilioManager()
 
+# Concurrency cap and overflow queue for calls handled by this server
+admission = AdmissionController()
+
+# Drain mode for rolling deploys (SIGTERM or POST /admin/drain)
+drain = DrainController()
+
 # Module-level pipeline factory functions (needed for pickling)
 def create_customer_pipeline():
     """Create customer pipeline at module level for pickling."""
@@ -386,7 +719,20 @@ def create_specialist_pipeline():
     """Create specialist pipeline at module level for pickling."""
     return create_pipeline("specialist")
 
-def start_customer_agent_for_call(call_id: str, room_id: str, caller_number: str = None) -> Dict[str, Any]:
+# Room pool and answer cache counters, read whenever metrics are collected
+metrics_registry.gauge("sip_room_pool_size", "Rooms ready in the warm room pool").set_function(lambda: twilio_manager.room_pool.stats()["size"])
+metrics_registry.counter("sip_room_pool_hits_total", "Room acquisitions served from the pool").set_function(lambda: twilio_manager.room_pool.hits)
+metrics_registry.counter("sip_room_pool_misses_total", "Room acquisitions that created a room on demand").set_function(lambda: twilio_manager.room_pool.misses)
+metrics_registry.counter("sip_answer_cache_hits_total", "Specialist answers served from the answer cache").set_function(lambda: answer_cache.hits + answer_cache.similar_hits)
+metrics_registry.counter("sip_answer_cache_misses_total", "Specialist queries that went to the LLM").set_function(lambda: answer_cache.misses)
+
+# Per-process pool of pre-built pipelines used by _agent_entrypoint, active in pooled workers only
+agent_pool = AgentPool(
+    create_specialist_pipeline if SPECIALIST_MODE != "shared" else None,
+    create_customer_pipeline
+)
+
+def start_customer_agent_for_call(call_id: str, room_id: str, caller_number: str = None, was_queued: bool = False) -> Dict[str, Any]:
     """Start a customer agent for a specific call using the SIP plugin pattern."""
     logger.info(f"Starting customer agent for call {call_id} in room {room_id}")
 
@@ -398,10 +744,10 @@ def start_customer_agent_for_call(call_id: str, room_id: str, caller_number: str
             "caller_number": caller_number,
             "call_id": call_id
         }
-        logger.info(f"Agent config: {agent_config}")
+        logger.debug("Agent config: %s", agent_config)
 
         # Launch agent job using the working SIP plugin pattern
-        logger.info(f"Launching agent job with launch_agent_job...")
+        logger.debug("Launching agent job with launch_agent_job...")
         customer_job = launch_agent_job(
             room_id=room_id,
             agent_config=agent_config,
@@ -411,13 +757,13 @@ def start_customer_agent_for_call(call_id: str, room_id: str, caller_number: str
         logger.info(f"Agent job launched successfully for room {room_id}")
 
         # Store session information
-        active_sessions[call_id] = {
+        local_calls[call_id] = CallRecord(call_id, room_id, caller_number, job=customer_job, was_queued=was_queued)
+        session_registry.put(call_id, {
             "room_id": room_id,
             "caller_number": caller_number,
-            "job": customer_job,
             "status": "active"
-        }
-        logger.info(f"Stored session info for call {call_id}")
+        })
+        logger.debug("Stored session info for call %s", call_id)
 
         return {
             "status": "success",
@@ -427,32 +773,193 @@ def start_customer_agent_for_call(call_id: str, room_id: str, caller_number: str
         }
 
     except Exception as e:
+        CALL_FAILURES.inc(stage="agent_launch")
         logger.error(f"Failed to start customer agent for call {call_id}: {e}", exc_info=True)
+        call_history.append(CallRecord(call_id, room_id, caller_number, was_queued=was_queued).finish("launch_failed"))
         return {
             "status": "error",
             "call_id": call_id,
             "error": str(e)
         }
 
+async def place_outbound_call(to_number: str) -> Dict[str, Any]:
+    """Create an outgoing call in a pooled room and start its customer agent (used by /call/make and campaigns)."""
+    started_at = time.perf_counter()
+    # Hold the slot while dialing, so concurrent requests cannot exceed the cap
+    reservation = admission.reserve()
+    if reservation is None:
+        logger.warning(f"Refusing outgoing call to {to_number}: server at capacity")
+        return {"status": "failed", "error": "Server at capacity, try again later.", "retryable": True, "reason": "capacity"}
+
+    try:
+        # Make the call using direct Twilio integration
+        call_details = await twilio_manager.make_call(to_number)
+    except BaseException:
+        admission.release(reservation)
+        raise
+
+    call_id = call_details.get("sid")
+    room_id = call_details.get("room_id") # Get the REAL room_id
+
+    if call_id and room_id and call_details.get("status") != "failed":
+        admission.confirm(reservation, call_id)
+        # Start our A2A-enabled customer agent in the correct room
+        logger.info(f"Call created successfully, starting customer agent in room {room_id}...")
+        result = start_customer_agent_for_call(call_id, room_id, None)
+        if result.get("status") == "error":
+            admission.release(call_id)
+        elif call_id in local_calls:
+            local_calls[call_id].answered(time.perf_counter() - started_at)
+        call_details.update(result)
+    else:
+        admission.release(reservation)
+        logger.error(f"Call creation failed: {call_details}")
+    return call_details
+
+# Twilio CallStatus values reported once a call is over
+FINAL_CALL_STATUSES = ("completed", "busy", "no-answer", "failed", "canceled")
+
+def _end_call(call_id: str, outcome: str):
+    """
+    A call is over (dial-complete or status callback; whichever comes first): free its slot and record it.
+
+    The callback may reach a server worker other than the call's owner. With a
+    shared session registry, the owner finishes the call when it sees the
+    ended event (see _watch_calls_ended_elsewhere).
+    """
+    shared = session_registry.get(call_id)
+    session_registry.remove(call_id, outcome=outcome)
+    _finish_local_call(call_id, outcome, shared.get("status") if shared else None)
+
+def _finish_local_call(call_id: str, outcome: str, last_status: Optional[str]):
+    """Free the admission slot, history entry and campaign slot this process holds for an ended call."""
+    admission.release(call_id)
+    record = local_calls.pop(call_id, None)
+    if record is not None:
+        call_history.append(record.finish(outcome, last_status))
+    campaign_dialer.call_ended(call_id, outcome)
+
+# Outbound campaigns, dialed under CAMPAIGN_CPS and the server's free call slots
+campaign_dialer = CampaignDialer(
+    place_outbound_call,
+    lambda: 0 if drain.draining or not twilio_manager.base_url else admission.free_slots()
+)
+
+async def _session_heartbeat_loop():
+    """Keep this server's calls alive in the session registry and expire those of dead workers."""
+    interval = max(1.0, session_registry.ttl / 3)
+    while True:
+        try:
+            session_registry.heartbeat()
+            session_registry.expire_stale()
+        except Exception as e:
+            logger.error(f"Session registry heartbeat failed: {e}")
+        await asyncio.sleep(interval)
+
+# How often a server checks the shared session registry for its calls ended on another worker
+CALL_END_WATCH_INTERVAL = float(os.getenv("CALL_END_WATCH_INTERVAL", 1))
+
+async def _watch_calls_ended_elsewhere():
+    """
+    Finish this server's calls whose end-of-call callback reached another server worker.
+
+    That worker removed the call from the shared registry; the ended event
+    carries the outcome it was given, and the owner's record of the call.
+    """
+    after = session_registry.last_event_id()
+    while True:
+        events = []
+        try:
+            events = session_registry.events_since(after, limit=500)
+            for event in events:
+                after = event["id"]
+                record = event["record"]
+                call_id = event["call_id"]
+                if event["event"] != "ended" or call_id not in local_calls or record.get("owner") != session_registry.owner:
+                    continue
+                logger.info(f"Call {call_id} ended on another server worker ({record.get('outcome')})")
+                _finish_local_call(call_id, record.get("outcome") or "completed", record.get("status"))
+        except Exception as e:
+            logger.error(f"Watching the session registry for ended calls failed: {e}")
+        if len(events) < 500:
+            await asyncio.sleep(CALL_END_WATCH_INTERVAL)
+
+async def _wait_call_ended(call_id: str):
+    """Wait until Twilio reports the call's dialed leg finished."""
+    while call_id in local_calls:
+        await asyncio.sleep(0.5)
+
+def _drain_teardown_steps(call_id: str):
+    """Ordered teardown of a call still running at the drain deadline."""
+    return [
+        ("hangup", lambda: twilio_manager.hangup(call_id)),
+        ("wait_ended", lambda: _wait_call_ended(call_id)),
+    ]
+
+def _start_drain(reason: str) -> asyncio.Task:
+    return drain.start(reason, lambda: list(local_calls), _drain_teardown_steps)
+
+def _install_sigterm_drain():
+    """
+    Drain on SIGTERM while the server keeps answering webhooks (so Twilio
+    callbacks still arrive), then hand the signal to uvicorn to shut down.
+    A second SIGTERM shuts down immediately.
+    """
+    loop = asyncio.get_running_loop()
+    server_handler = signal.getsignal(signal.SIGTERM)
+    if not callable(server_handler):
+        return
+
+    async def drain_then_exit(signum):
+        try:
+            await _start_drain("SIGTERM")
+        finally:
+            server_handler(signum, None)
+
+    def on_sigterm(signum, frame):
+        if drain.draining:
+            server_handler(signum, frame)
+            return
+        loop.call_soon_threadsafe(lambda: asyncio.ensure_future(drain_then_exit(signum)))
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+# pyngrok, imported on first use since only the tunnel needs it (the load test substitutes a stand-in)
+ngrok = None
+
+# Where the public webhook URL comes from (PUBLIC_BASE_URL, or an ngrok tunnel), and when startup finished
+base_url_provider: Optional[BaseUrlProvider] = None
+services_ready = False
+
+def _get_ngrok():
+    global ngrok
+    if ngrok is None:
+        from pyngrok import ngrok as pyngrok_ngrok
+        ngrok = pyngrok_ngrok
+    return ngrok
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Lifespan manager for FastAPI app startup and shutdown."""
+    global base_url_provider, services_ready
     port = int(os.getenv("PORT", 8000))
 
-    try:
-        # Setup ngrok tunnel (following sip_agent_example.py pattern)
-        ngrok.kill()
-        ngrok_auth_token = os.getenv("NGROK_AUTHTOKEN")
-        if ngrok_auth_token:
-            ngrok.set_auth_token(ngrok_auth_token)
-        tunnel = ngrok.connect(port, "http")
-        twilio_manager.set_base_url(tunnel.public_url)
-        logger.info(f"Ngrok tunnel created: {tunnel.public_url}")
-    except Exception as e:
-        logger.error(f"Failed to start ngrok tunnel: {e}")
-        # Continue without failing - outgoing calls will still work
+    # Public URL for Twilio: a static PUBLIC_BASE_URL, or an ngrok tunnel opened in the background.
+    # Webhooks answer "not ready" until it is set; /ready reports when it is.
+    base_url_provider = create_base_url_provider(port, _get_ngrok)
+    await base_url_provider.start(twilio_manager.set_base_url)
 
     try:
+        metrics_registry.reset_directory()
+        heartbeat_task = asyncio.create_task(_session_heartbeat_loop())
+        # Only a shared registry carries other workers' events
+        watch_task = asyncio.create_task(_watch_calls_ended_elsewhere()) if session_registry.shared else None
+        await twilio_manager.videosdk.start()
+        await twilio_manager.room_pool.start()
+        await twilio_manager.start()
+        await worker_pool.start()
+        _install_sigterm_drain()
+        services_ready = True
         logger.info("Services started successfully")
     except Exception as e:
         logger.error(f"Failed to start services: {e}", exc_info=True)
@@ -460,14 +967,30 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    try:
-        # Cleanup
-        ngrok.kill()
-        logger.info("Ngrok tunnel closed")
-    except Exception as e:
-        logger.error(f"Error closing ngrok tunnel: {e}")
+    await campaign_dialer.stop()
+
+    # Hang up calls still running if the server is stopping without a completed drain
+    if not drain.finished:
+        await drain.drain(lambda: list(local_calls), _drain_teardown_steps, deadline=0)
+
+    services_ready = False
+    await base_url_provider.stop()
+
+    for task in (heartbeat_task, watch_task):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    session_registry.close()
+    answer_cache.close()
 
     try:
+        await worker_pool.stop()
+        # Shared specialists of calls run in this process (pooled workers close their own)
+        await specialist_host.close()
+        await twilio_manager.room_pool.stop()
+        await twilio_manager.aclose()
+        await twilio_manager.videosdk.aclose()
         logger.info("Cleanup complete")
     except Exception as e:
         logger.error(f"Error during cleanup: {e}")
@@ -481,23 +1004,15 @@ async def make_call(to_number: str):
     if not twilio_manager.base_url:
         return {"status": "error", "message": "Service not ready (no base URL)."}
 
+    if drain.draining:
+        return {"status": "error", "message": "Server is draining, try another instance."}
+
     logger.info(f"Making outgoing call to {to_number}")
 
     try:
-        # Make the call using direct Twilio integration
-        call_details = await twilio_manager.make_call(to_number)
-
-        call_id = call_details.get("sid")
-        room_id = call_details.get("room_id") # Get the REAL room_id
-
-        if call_id and room_id and call_details.get("status") != "failed":
-            # Start our A2A-enabled customer agent in the correct room
-            logger.info(f"Call created successfully, starting customer agent in room {room_id}...")
-            result = start_customer_agent_for_call(call_id, room_id, None)
-            call_details.update(result)
-        else:
-            logger.error(f"Call creation failed: {call_details}")
-
+        call_details = await place_outbound_call(to_number)
+        if call_details.get("reason") == "capacity":
+            return {"status": "error", "message": call_details["error"]}
         return {"status": "success", "details": call_details}
 
     except Exception as e:
@@ -507,13 +1022,76 @@ async def make_call(to_number: str):
 @app.post("/sip/answer/{room_id}")
 async def answer_webhook(room_id: str):
     """Handle SIP answer webhook."""
-    logger.info(f"Answering call for room: {room_id}")
+    logger.info("Answering call for room: %s", room_id)
     body, status_code, headers = twilio_manager.get_sip_response_for_room(room_id)
     return Response(content=body, status_code=status_code, media_type=headers.get("Content-Type"))
 
+# Retried /webhook/incoming requests (same CallSid) get the first request's TwiML and room
+incoming_calls = IdempotencyCache("incoming")
+
+def _xml(twiml: str) -> tuple:
+    return twiml, 200, "application/xml"
+
+async def _answer_incoming_call(webhook_data: Dict[str, Any], call_id: str, caller_number: str, received_at: float) -> tuple:
+    """
+    Admit, queue or turn away a new call; admitted calls get a room, an agent and SIP TwiML.
+
+    Returns:
+        (body, status code, media type), and whether a retried webhook may replay it
+    """
+    if drain.draining:
+        return _xml(twilio_manager.get_drain_response(drain.redirect_url)), False
+
+    # Another server process already answered this call (shared session registry): reuse its room
+    shared = session_registry.get(call_id)
+    if shared and shared.get("room_id"):
+        logger.info("Call %s already has room %s, not launching another agent", call_id, shared["room_id"])
+        body, status_code, headers = twilio_manager.handle_incoming_call(webhook_data, shared["room_id"])
+        return (body, status_code, headers.get("Content-Type")), True
+
+    # Admission control: run now, hold in the overflow queue, or ask to call back later.
+    # Hold and busy answers are not replayed: the hold loop polls this webhook with the same CallSid.
+    was_waiting = admission.is_waiting(call_id)
+    decision = admission.try_admit(call_id, caller_number)
+    if decision == QUEUED:
+        return _xml(twilio_manager.get_hold_response(announce=not was_waiting, poll_interval=admission.poll_interval)), False
+    if decision == REJECTED:
+        return _xml(twilio_manager.get_busy_response()), False
+
+    # Take a pre-created room from the pool (or create one on demand)
+    logger.debug("Acquiring VideoSDK room for incoming call...")
+    room_id = await twilio_manager.room_pool.acquire()
+    bind_call(room_id=room_id)
+    logger.debug("VideoSDK room acquired: %s", room_id)
+    WEBHOOK_PHASE_SECONDS.observe(time.perf_counter() - received_at, webhook="incoming", phase="room_created")
+
+    # Start our A2A-enabled customer agent for this call in the correct room
+    logger.debug("Starting customer agent for incoming call in room %s...", room_id)
+    result = start_customer_agent_for_call(call_id, room_id, caller_number, was_queued=was_waiting)
+    launched = result.get("status") != "error"
+
+    if not launched:
+        logger.error(f"Failed to start agent for incoming call: {result.get('error')}")
+        admission.release(call_id)
+        # Still proceed with basic TwiML response to avoid dropping the call
+    else:
+        logger.debug("Customer agent started for incoming call")
+
+    # Handle the call with direct Twilio integration
+    logger.debug("Generating TwiML response for room: %s", room_id)
+    body, status_code, headers = twilio_manager.handle_incoming_call(webhook_data, room_id)
+    setup_seconds = time.perf_counter() - received_at
+    WEBHOOK_PHASE_SECONDS.observe(setup_seconds, webhook="incoming", phase="twiml_returned")
+    if call_id in local_calls:
+        local_calls[call_id].answered(setup_seconds)
+
+    # A retry after a failed launch gets a fresh attempt rather than a replay of the agentless room
+    return (body, status_code, headers.get("Content-Type")), launched and status_code == 200
+
 @app.post("/webhook/incoming")
 async def incoming_webhook(request: Request):
     """Handle incoming call webhook with A2A setup."""
+    received_at = time.perf_counter()
     if not twilio_manager.base_url:
         # Respond with a temporary error, but don't drop the call
         response = VoiceResponse()
@@ -521,6 +1099,7 @@ async def incoming_webhook(request: Request):
         response.hangup()
         return Response(content=str(response), media_type="application/xml")
 
+    call_id = None
     try:
         content_type = request.headers.get("Content-Type", "")
         if "x-www-form-urlencoded" in content_type:
@@ -528,7 +1107,7 @@ async def incoming_webhook(request: Request):
         else:
             webhook_data = await request.json()
 
-        logger.info(f"Received incoming webhook: {webhook_data}")
+        logger.debug("Received incoming webhook: %s", webhook_data, extra=SAMPLED)
 
         # Extract call information
         caller_number = webhook_data.get("From", "Unknown")
@@ -538,54 +1117,272 @@ async def incoming_webhook(request: Request):
             logger.error("No CallSid found in webhook data")
             return Response(content="Error: Missing CallSid", status_code=400)
 
-        logger.info(f"Incoming call from {caller_number} with CallSid: {call_id}")
-
-        # Create a REAL room for this call
-        logger.info(f"Creating VideoSDK room for incoming call...")
-        room_id = await twilio_manager.videosdk.create_room()
-        logger.info(f"VideoSDK room created: {room_id}")
+        bind_call(call_id)
+        logger.info("Incoming call from %s with CallSid: %s", caller_number, call_id)
 
-        # Start our A2A-enabled customer agent for this call in the correct room
-        logger.info(f"Starting customer agent for incoming call in room {room_id}...")
-        result = start_customer_agent_for_call(call_id, room_id, caller_number)
-
-        if result.get("status") == "error":
-            logger.error(f"Failed to start agent for incoming call: {result.get('error')}")
-            # Still proceed with basic TwiML response to avoid dropping the call
-        else:
-            logger.info(f"Customer agent started for incoming call")
-
-        # Handle the call with direct Twilio integration
-        logger.info(f"Generating TwiML response for room: {room_id}")
-        body, status_code, headers = twilio_manager.handle_incoming_call(webhook_data, room_id)
-
-        return Response(content=body, status_code=status_code, media_type=headers.get("Content-Type"))
+        # Twilio retries slow webhooks: duplicates wait for (or replay) the first request instead of
+        # creating another room and agent
+        body, status_code, media_type = await incoming_calls.run(
+            call_id, lambda: _answer_incoming_call(webhook_data, call_id, caller_number, received_at)
+        )
+        return Response(content=body, status_code=status_code, media_type=media_type)
 
     except Exception as e:
+        CALL_FAILURES.inc(stage="incoming_webhook")
         logger.error(f"Error in incoming webhook: {e}", exc_info=True)
+        if call_id:
+            admission.release(call_id)
         # Return basic error response to avoid dropping the call
         return Response(content="Error processing request", status_code=500)
 
+@app.post("/webhook/dial-complete")
+async def dial_complete_webhook(request: Request):
+    """Twilio <Dial> action callback: the call's SIP leg ended, so free its admission slot."""
+    form = dict(await request.form())
+    call_id = form.get("CallSid")
+    bind_call(call_id)
+    logger.info("Dial completed for call %s (status: %s)", call_id, form.get("DialCallStatus"))
+    if call_id:
+        _end_call(call_id, form.get("DialCallStatus") or "completed")
+    response = VoiceResponse()
+    response.hangup()
+    return Response(content=str(response), media_type="application/xml")
+
+@app.post("/webhook/call-status")
+async def call_status_webhook(request: Request):
+    """Twilio status callback for outbound calls: the call ended, answered or not, so free its slot."""
+    form = dict(await request.form())
+    call_id = form.get("CallSid")
+    call_status = form.get("CallStatus")
+    bind_call(call_id)
+    logger.info("Outbound call %s ended (status: %s)", call_id, call_status)
+    if call_id and call_status in FINAL_CALL_STATUSES:
+        _end_call(call_id, call_status)
+    return Response(status_code=204)
+
+def _check_admin(request: Request) -> Optional[Response]:
+    """Require ADMIN_TOKEN as a bearer token on admin endpoints, when it is configured."""
+    admin_token = os.getenv("ADMIN_TOKEN")
+    if admin_token and request.headers.get("Authorization") != f"Bearer {admin_token}":
+        return Response(content="Unauthorized", status_code=401)
+    return None
+
+@app.post("/admin/drain")
+async def start_drain(request: Request):
+    """Stop accepting calls and let active calls finish before the drain deadline."""
+    denied = _check_admin(request)
+    if denied:
+        return denied
+    _start_drain("admin")
+    return drain.stats()
+
+@app.get("/admin/drain")
+async def get_drain(request: Request):
+    """Drain progress."""
+    denied = _check_admin(request)
+    if denied:
+        return denied
+    return {**drain.stats(), "active_calls": len(local_calls)}
+
+@app.post("/campaigns")
+async def create_campaign(request: Request):
+    """
+    Start an outbound campaign. JSON body: numbers (E.164), and optionally name,
+    max_concurrency, max_attempts and retry_outcomes (call statuses to redial, e.g. ["busy"]).
+    """
+    denied = _check_admin(request)
+    if denied:
+        return denied
+    if not twilio_manager.base_url or drain.draining:
+        return JSONResponse({"status": "error", "message": "Server not ready or draining, try another instance."}, status_code=503)
+
+    body = await request.json()
+    numbers = body.get("numbers")
+    if not isinstance(numbers, list) or not numbers:
+        return JSONResponse({"status": "error", "message": "numbers must be a non-empty list"}, status_code=400)
+
+    campaign = campaign_dialer.create(
+        [str(number) for number in numbers],
+        name=body.get("name"),
+        max_concurrency=body.get("max_concurrency"),
+        max_attempts=body.get("max_attempts"),
+        retry_outcomes=body.get("retry_outcomes") or (),
+    )
+    return {"status": "success", "campaign": campaign.progress()}
+
+@app.get("/campaigns")
+async def list_campaigns(request: Request):
+    """Progress of every campaign on this server."""
+    denied = _check_admin(request)
+    if denied:
+        return denied
+    return {
+        "cps": campaign_dialer.cps,
+        "campaigns": [campaign.progress() for campaign in campaign_dialer.campaigns.values()],
+    }
+
+@app.get("/campaigns/{campaign_id}")
+async def get_campaign(request: Request, campaign_id: str, contacts: bool = False):
+    """Progress of one campaign; ?contacts=true adds each number's state, attempts and outcome."""
+    denied = _check_admin(request)
+    if denied:
+        return denied
+    campaign = campaign_dialer.get(campaign_id)
+    if campaign is None:
+        return JSONResponse({"status": "error", "message": "Campaign not found"}, status_code=404)
+    return campaign.progress(include_contacts=contacts)
+
+@app.post("/campaigns/{campaign_id}/cancel")
+async def cancel_campaign(request: Request, campaign_id: str):
+    """Stop dialing a campaign's remaining numbers; calls in progress continue."""
+    denied = _check_admin(request)
+    if denied:
+        return denied
+    campaign = campaign_dialer.cancel(campaign_id)
+    if campaign is None:
+        return JSONResponse({"status": "error", "message": "Campaign not found"}, status_code=404)
+    return campaign.progress()
+
+# Page size limits for /sessions, and how often /sessions/events checks for new events
+SESSIONS_PAGE_SIZE = 100
+SESSIONS_MAX_PAGE_SIZE = 1000
+SESSION_EVENTS_POLL_INTERVAL = float(os.getenv("SESSION_EVENTS_POLL_INTERVAL", 0.5))
+
 @app.get("/sessions")
-async def get_sessions():
-    """Get information about active sessions."""
+async def get_sessions(
+    status: Optional[str] = None,
+    caller: Optional[str] = None,
+    min_age: Optional[float] = None,
+    max_age: Optional[float] = None,
+    offset: int = 0,
+    limit: int = SESSIONS_PAGE_SIZE,
+):
+    """
+    Get a page of active sessions, oldest first.
+
+    Filters: status, caller (substring of the caller number), min_age/max_age
+    (seconds since the call was created). Follow /sessions/events for changes
+    instead of polling this endpoint.
+    """
+    now = time.time()
+    limit = max(1, min(limit, SESSIONS_MAX_PAGE_SIZE))
+    offset = max(0, offset)
+    total, page = session_registry.find(
+        status=status,
+        caller=caller,
+        created_after=now - max_age if max_age is not None else None,
+        created_before=now - min_age if min_age is not None else None,
+        offset=offset,
+        limit=limit,
+    )
     a2a_sessions = {
-        "active_calls": len(active_sessions),
+        "active_calls": total,
         "call_details": {
             call_id: {
                 "room_id": details["room_id"],
                 "caller_number": details["caller_number"],
-                "status": details["status"]
+                "status": details["status"],
+                "owner": details.get("owner"),
+                "age_seconds": round(now - details.get("created_at", now), 1)
             }
-            for call_id, details in active_sessions.items()
+            for call_id, details in page
         }
     }
 
     return {
         "a2a_sessions": a2a_sessions,
+        "pagination": {
+            "offset": offset,
+            "limit": limit,
+            "total": total,
+            "next_offset": offset + limit if offset + limit < total else None
+        },
+        "last_event_id": session_registry.last_event_id(),
         "specialist_agent_running": False # No longer tracking specialist agent globally
     }
 
+@app.get("/sessions/events")
+async def session_events(request: Request, after: Optional[int] = None):
+    """
+    Server-sent events for call lifecycle changes (created, connected, greeted,
+    forwarded, ended, expired).
+
+    Streams events after ``after`` (or the Last-Event-ID header on reconnect);
+    without either, only new events are sent. Load /sessions first and pass its
+    last_event_id to avoid missing changes in between. If events were dropped
+    from the log before they could be sent, a "resync" event tells the client
+    to reload /sessions.
+
+    With the default in-memory registry only this server's own changes are
+    seen: created and ended (and expired). Status changes made by the agent
+    jobs (connected, greeted, forwarded) happen in their own processes, so
+    they are only streamed with a shared registry
+    (SESSION_REGISTRY_URL=sqlite:///...).
+    """
+    last_event_id = request.headers.get("Last-Event-ID")
+    if last_event_id is not None and last_event_id.isdigit():
+        after = int(last_event_id)
+    if after is None:
+        after = session_registry.last_event_id()
+
+    async def stream():
+        last_id = after
+        last_sent_at = time.monotonic()
+        while not await request.is_disconnected():
+            events = session_registry.events_since(last_id, limit=500)
+            if events and events[0]["id"] > last_id + 1:
+                yield f"event: resync\ndata: {json.dumps({'missed_after': last_id})}\n\n"
+            for event in events:
+                last_id = event["id"]
+                yield f"id: {last_id}\nevent: {event['event']}\ndata: {json.dumps(event)}\n\n"
+            if events:
+                last_sent_at = time.monotonic()
+                continue
+            if time.monotonic() - last_sent_at > 15:
+                # Keep-alive comment so proxies don't close an idle stream
+                yield ": keep-alive\n\n"
+                last_sent_at = time.monotonic()
+            await asyncio.sleep(SESSION_EVENTS_POLL_INTERVAL)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@app.get("/ready")
+async def readiness():
+    """Readiness probe: 200 once services are started and the public base URL is known; 503 before that and while draining."""
+    ready = services_ready and bool(twilio_manager.base_url) and not drain.draining
+    body = {
+        "ready": ready,
+        "services_ready": services_ready,
+        "draining": drain.draining,
+        **(base_url_provider.status() if base_url_provider else {"base_url": twilio_manager.base_url}),
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/stats")
+async def get_stats(window: float = 300.0):
+    """Rolling aggregates over the calls completed in the last ``window`` seconds (bounded by CALL_HISTORY_SIZE)."""
+    window = max(1.0, min(window, 86400.0))
+    return {
+        **call_history.stats(window),
+        "active_calls": len(local_calls),
+        "duplicate_webhooks": incoming_calls.stats(),
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus metrics for this server and its agent worker processes."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/workers")
+async def get_workers():
+    """Pooled agent workers: spawn-to-ready latency, load and RSS."""
+    return worker_pool.stats()
+
+@app.get("/rooms/pool")
+async def get_room_pool():
+    """Get warm room pool size and hit/miss metrics."""
+    return twilio_manager.room_pool.stats()
+
 # @app.get("/test/voice", tags=["Testing"])
 # async def test_voice_endpoint():
 #     """Test endpoint to verify voice synthesis is working."""
@@ -634,15 +1431,24 @@ async def root():
             "make_call": "/call/make",
             "incoming_webhook": "/webhook/incoming",
             "sessions": "/sessions",
+            "session_events": "/sessions/events",
+            "stats": "/stats",
+            "ready": "/ready",
+            "room_pool": "/rooms/pool",
+            "workers": "/workers",
+            "drain": "/admin/drain",
+            "campaigns": "/campaigns",
+            "metrics": "/metrics",
             "test_voice": "/test/voice"
         },
         "status": {
             "specialist_agent_running": False, # No longer tracking specialist agent globally
-            "active_calls": len(active_sessions)
+            "active_calls": session_registry.count()
         }
     }
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
     logger.info(f"Starting SIP A2A Example server on port {port}")
+    import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=port)
@@ -0,0 +1,321 @@
+import os
+import json
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds, from sub-millisecond handler work to multi-second model round trips
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+# Label values are joined with a unit separator to form JSON-friendly snapshot keys
+_KEY_SEPARATOR = "\x1f"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def _split_key(self, key: str) -> LabelValues:
+        return tuple(key.split(_KEY_SEPARATOR)) if self.labelnames else ()
+
+    def _format_labels(self, key: LabelValues, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(zip(self.labelnames, key))
+        if extra:
+            pairs.append(extra)
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally read from a callback at collection time."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._function: Optional[Callable[[], float]] = None
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set_function(self, function: Callable[[], float]):
+        """Read the (label-less) value from a callback whenever metrics are collected."""
+        self._function = function
+
+    def snapshot(self) -> Dict[str, float]:
+        if self._function is not None:
+            try:
+                value = float(self._function())
+            except Exception as e:
+                logger.error(f"Metric {self.name} callback failed: {e}")
+            else:
+                with self._lock:
+                    self._values[()] = value
+        with self._lock:
+            return {_KEY_SEPARATOR.join(k): v for k, v in self._values.items()}
+
+    @staticmethod
+    def merge(into: Dict[str, float], other: Dict[str, float]):
+        for key, value in other.items():
+            into[key] = into.get(key, 0.0) + value
+
+    def render(self, values: Dict[str, float]) -> List[str]:
+        return [f"{self.name}{self._format_labels(self._split_key(k))} {v}" for k, v in sorted(values.items())]
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observe the duration of a with-block."""
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started_at, **labels)
+
+    def snapshot(self) -> Dict[str, List[float]]:
+        with self._lock:
+            return {_KEY_SEPARATOR.join(k): list(v) for k, v in self._values.items()}
+
+    @staticmethod
+    def merge(into: Dict[str, List[float]], other: Dict[str, List[float]]):
+        for key, state in other.items():
+            current = into.get(key)
+            if current is None or len(current) != len(state):
+                into[key] = list(state)
+            else:
+                into[key] = [a + b for a, b in zip(current, state)]
+
+    def render(self, values: Dict[str, List[float]]) -> List[str]:
+        lines = []
+        for k, state in sorted(values.items()):
+            key = self._split_key(k)
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{self._format_labels(key, ('le', le))} {cumulative}")
+            lines.append(f"{self.name}_sum{self._format_labels(key)} {state[-1]}")
+            lines.append(f"{self.name}_count{self._format_labels(key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collects metrics and renders them in the Prometheus text format.
+
+    Calls run in WorkerJob processes, so each process periodically dumps a JSON
+    snapshot of its own metrics into METRICS_DIR, and the server merges those
+    snapshots into its own values when /metrics is scraped. Snapshots of
+    workers that have exited are folded into a base total and removed, and
+    their gauges are dropped.
+    """
+
+    def __init__(self, directory: Optional[str] = None, flush_interval: float = 1.0):
+        self.directory = directory if directory is not None else os.getenv("METRICS_DIR", "/tmp/sip_a2a_metrics")
+        self.flush_interval = flush_interval
+        self._metrics: Dict[str, _Metric] = {}
+        self._last_flush = 0.0
+        # Totals from worker processes that have exited
+        self._retired: Dict[str, Dict[str, object]] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def reset_directory(self):
+        """
+        Remove snapshots left behind by a previous server run (called by the server at startup).
+
+        Only snapshots of processes that have exited are removed: other server
+        workers and their agent processes may already be writing theirs.
+        """
+        if not self.directory or not os.path.isdir(self.directory):
+            return
+        for filename in os.listdir(self.directory):
+            pid = _snapshot_pid(filename)
+            if pid is not None and not _pid_alive(pid):
+                _remove_quietly(os.path.join(self.directory, filename))
+
+    def flush(self, force: bool = False):
+        """Write this process's snapshot for the server to merge (throttled unless forced)."""
+        if not self.directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"metrics-{os.getpid()}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error(f"Failed to write metrics snapshot: {e}")
+
+    def _merge_into(self, totals: Dict[str, Dict[str, object]], snapshot: Dict[str, Dict[str, object]], include_gauges: bool = True):
+        for name, values in snapshot.items():
+            metric = self._metrics.get(name)
+            if metric is None or (metric.kind == "gauge" and not include_gauges):
+                continue
+            metric.merge(totals.setdefault(name, {}), values)
+
+    def _collect_workers(self) -> Dict[str, Dict[str, object]]:
+        live: Dict[str, Dict[str, object]] = {}
+        if not self.directory or not os.path.isdir(self.directory):
+            return live
+        for filename in os.listdir(self.directory):
+            pid = _snapshot_pid(filename)
+            if pid is None or pid == os.getpid():
+                continue
+            path = os.path.join(self.directory, filename)
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if _pid_alive(pid):
+                self._merge_into(live, snapshot)
+            else:
+                self._merge_into(self._retired, snapshot, include_gauges=False)
+                _remove_quietly(path)
+        return live
+
+    def render(self) -> str:
+        """Render this process's metrics merged with every worker's, in Prometheus text format."""
+        totals: Dict[str, Dict[str, object]] = {}
+        # Collecting first folds workers that exited since the last scrape into the retired totals
+        live = self._collect_workers()
+        self._merge_into(totals, self.snapshot())
+        self._merge_into(totals, self._retired)
+        self._merge_into(totals, live)
+
+        lines = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render(totals.get(name, {})))
+        return "\n".join(lines) + "\n"
+
+
+def _snapshot_pid(filename: str) -> Optional[int]:
+    """PID of the process that wrote a metrics-<pid>.json snapshot, or None for other files."""
+    if not (filename.startswith("metrics-") and filename.endswith(".json")):
+        return None
+    try:
+        return int(filename[len("metrics-"):-len(".json")])
+    except ValueError:
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+# Shared registry and the metrics recorded on the call hot path
+registry = MetricsRegistry()
+
+WEBHOOK_PHASE_SECONDS = registry.histogram(
+    "sip_webhook_phase_seconds",
+    "Time from webhook received to each setup phase (room_created, twiml_returned)",
+    ["webhook", "phase"],
+)
+CALL_PHASE_SECONDS = registry.histogram(
+    "sip_call_phase_seconds",
+    "Duration of each agent job phase (agents_created, specialist_ready, connected, customer_session_started, participant_joined, greeted)",
+    ["phase"],
+)
+SPECIALIST_ROUND_TRIP_SECONDS = registry.histogram(
+    "sip_a2a_specialist_round_trip_seconds",
+    "Time from forward_to_specialist until the specialist answer (or its first chunk) arrives",
+)
+SPECIALIST_FIRST_AUDIO_SECONDS = registry.histogram(
+    "sip_a2a_specialist_first_audio_seconds",
+    "Time from forward_to_specialist until the caller starts hearing the answer",
+)
+CLEANUP_SECONDS = registry.histogram(
+    "sip_call_cleanup_seconds",
+    "Time spent tearing down a call's sessions and room",
+)
+ACTIVE_CALLS = registry.gauge("sip_active_calls", "Calls whose agent job is currently running")
+CALLS_TOTAL = registry.counter("sip_calls_total", "Agent jobs started")
+CALL_FAILURES = registry.counter("sip_call_failures_total", "Failures by stage", ["stage"])
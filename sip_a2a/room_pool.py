@@ -0,0 +1,160 @@
+import asyncio
+import os
+import time
+import logging
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RoomPool:
+    """
+    Keeps a small number of VideoSDK rooms created ahead of time so call setup
+    does not wait on the room REST API.
+
+    Rooms older than ``max_age`` seconds are discarded instead of being handed
+    out, and the pool refills itself in the background as rooms are consumed.
+    When the pool is empty, ``acquire`` falls back to creating a room on demand.
+    """
+
+    def __init__(
+        self,
+        create_room: Callable[[], Awaitable[str]],
+        target_size: Optional[int] = None,
+        max_age: Optional[float] = None,
+        refill_concurrency: int = 2,
+    ):
+        """
+        Args:
+            create_room: Coroutine function that creates a room and returns its id
+            target_size: Number of rooms to keep ready (env ROOM_POOL_SIZE, 0 disables the pool)
+            max_age: Seconds a pooled room stays usable (env ROOM_POOL_MAX_AGE)
+            refill_concurrency: Maximum number of rooms created in parallel while refilling
+        """
+        self._create_room = create_room
+        self.target_size = target_size if target_size is not None else int(os.getenv("ROOM_POOL_SIZE", 5))
+        self.max_age = max_age if max_age is not None else float(os.getenv("ROOM_POOL_MAX_AGE", 1800))
+        self.refill_concurrency = max(1, refill_concurrency)
+
+        self._rooms: Deque[Tuple[str, float]] = deque()
+        self._pending = 0
+        self._refill_needed = asyncio.Event()
+        self._refill_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.create_failures = 0
+
+    async def start(self):
+        """Start the background refill loop."""
+        if self.target_size <= 0 or self._refill_task is not None:
+            return
+        self._stopping = False
+        # A fresh event per start: an event waited on under an earlier event loop cannot be reused
+        self._refill_needed = asyncio.Event()
+        self._refill_needed.set()
+        self._refill_task = asyncio.create_task(self._refill_loop())
+        logger.info(f"Room pool started (target_size={self.target_size}, max_age={self.max_age}s)")
+
+    async def stop(self):
+        """Stop refilling and drop any pooled rooms."""
+        # Checked after every wake-up, in case the cancel below lands as the refill event fires
+        self._stopping = True
+        if self._refill_task:
+            self._refill_task.cancel()
+            try:
+                await self._refill_task
+            except asyncio.CancelledError:
+                pass
+            self._refill_task = None
+        self._rooms.clear()
+        logger.info("Room pool stopped")
+
+    async def acquire(self) -> str:
+        """Return a pre-created room, or create one on demand if the pool is empty."""
+        room_id = self._pop_fresh_room()
+        self._refill_needed.set()
+
+        if room_id:
+            self.hits += 1
+            logger.info(f"Room pool hit: {room_id} ({len(self._rooms)} rooms left)")
+            return room_id
+
+        self.misses += 1
+        logger.info("Room pool miss, creating room on demand")
+        return await self._create_room()
+
+    def stats(self) -> Dict[str, float]:
+        """Return pool hit/miss counters and current size."""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._rooms),
+            "target_size": self.target_size,
+            "pending": self._pending,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "expired": self.expired,
+            "create_failures": self.create_failures,
+        }
+
+    def _pop_fresh_room(self) -> Optional[str]:
+        now = time.monotonic()
+        while self._rooms:
+            room_id, created_at = self._rooms.popleft()
+            if now - created_at < self.max_age:
+                return room_id
+            self.expired += 1
+            logger.info(f"Discarding expired pooled room {room_id}")
+        return None
+
+    def _drop_expired(self):
+        now = time.monotonic()
+        while self._rooms and now - self._rooms[0][1] >= self.max_age:
+            room_id, _ = self._rooms.popleft()
+            self.expired += 1
+            logger.info(f"Discarding expired pooled room {room_id}")
+
+    async def _create_pooled_room(self):
+        try:
+            room_id = await self._create_room()
+            self._rooms.append((room_id, time.monotonic()))
+        except Exception as e:
+            self.create_failures += 1
+            logger.error(f"Failed to pre-create room for pool: {e}")
+            # Back off before the next refill attempt
+            await asyncio.sleep(1)
+        finally:
+            self._pending -= 1
+
+    async def _wait_for_refill(self, timeout: float):
+        # asyncio.wait rather than wait_for: on Python 3.11, wait_for drops a cancel that
+        # arrives just as the event is set, and the loop would never stop
+        waiter = asyncio.ensure_future(self._refill_needed.wait())
+        try:
+            await asyncio.wait({waiter}, timeout=timeout)
+        finally:
+            waiter.cancel()
+
+    async def _refill_loop(self):
+        while not self._stopping:
+            # Wake up on consumption, or periodically to expire old rooms
+            await self._wait_for_refill(max(1.0, self.max_age / 4))
+            if self._stopping:
+                return
+            self._refill_needed.clear()
+            self._drop_expired()
+
+            missing = self.target_size - len(self._rooms) - self._pending
+            if missing <= 0:
+                continue
+
+            batch = min(missing, self.refill_concurrency)
+            self._pending += batch
+            await asyncio.gather(*(self._create_pooled_room() for _ in range(batch)))
+
+            if len(self._rooms) + self._pending < self.target_size:
+                self._refill_needed.set()
@@ -1,8 +1,6 @@
 import os
 import logging
 from videosdk.agents import AgentSession, Pipeline
-from videosdk.plugins.openai import OpenAILLM
-from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +16,12 @@ def create_pipeline(agent_type: str):
     """
     logger.info(f"Creating pipeline for agent_type: {agent_type}")
 
+    if os.getenv("AGENT_MODEL", "").lower() == "fake" and agent_type in ("customer", "specialist"):
+        # Deterministic offline models for benchmarking (needs the repo root on PYTHONPATH)
+        from fake_models import FakeRealtime, FakeLLM
+        logger.info(f"Creating Pipeline with a fake model for {agent_type} agent")
+        return Pipeline(llm=FakeRealtime() if agent_type == "customer" else FakeLLM())
+
     if agent_type == "customer":
         # Customer agent uses pipeline for voice calls
         logger.info("Creating Pipeline for customer agent")
@@ -27,6 +31,8 @@ def create_pipeline(agent_type: str):
             raise ValueError("GOOGLE_API_KEY environment variable is required for customer agent")
 
         logger.info("Initializing GeminiRealtime model...")
+        # Plugins are imported on first use (pooled workers preload them), keeping server startup light
+        from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
         model = GeminiRealtime(
             api_key=google_api_key,
             model="gemini-3.1-flash-live-preview",
@@ -50,6 +56,7 @@ def create_pipeline(agent_type: str):
             raise ValueError("OPENAI_API_KEY environment variable is required for specialist agent")
 
         logger.info("Initializing OpenAI LLM...")
+        from videosdk.plugins.openai import OpenAILLM
         llm = OpenAILLM(api_key=openai_api_key)
         logger.info("OpenAI LLM initialized")
 
@@ -83,6 +90,7 @@ def create_session(agent, pipeline) -> AgentSession:
 
 def create_customer_realtime_pipeline():
     """Create a pipeline specifically for customer service."""
+    from videosdk.plugins.google import GeminiRealtime, GeminiLiveConfig
     return Pipeline(
         llm=GeminiRealtime(
             api_key=os.getenv("GOOGLE_API_KEY"),
@@ -97,6 +105,7 @@ def create_customer_realtime_pipeline():
 
 def create_specialist_text_pipeline():
     """Create a text-only pipeline for specialist agents."""
+    from videosdk.plugins.openai import OpenAILLM
     return Pipeline(
         llm=OpenAILLM(
             api_key=os.getenv("OPENAI_API_KEY"),
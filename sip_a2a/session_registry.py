@@ -0,0 +1,402 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def current_owner() -> str:
+    """Identity of this server process, used as the owner of the calls it launches."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _event_name(fields: Dict[str, Any]) -> str:
+    """Lifecycle event for an update: the new status (connected, greeted, forwarded, ...) or "updated"."""
+    return fields.get("status") or "updated"
+
+
+def _matches(record: Dict[str, Any], status: Optional[str], caller: Optional[str], created_after: Optional[float], created_before: Optional[float]) -> bool:
+    created_at = record.get("created_at", record.get("updated_at", 0))
+    return (
+        (status is None or record.get("status") == status)
+        and (caller is None or caller in (record.get("caller_number") or ""))
+        and (created_after is None or created_at >= created_after)
+        and (created_before is None or created_at <= created_before)
+    )
+
+
+class SessionRegistry(ABC):
+    """
+    Shared store of active call sessions.
+
+    Each record is a JSON-serializable dict (room_id, caller_number, status, ...)
+    owned by the server process that launched the call. Owners heartbeat
+    periodically; records of owners that stopped heartbeating for longer than
+    ``ttl`` seconds are expired. A networked store such as Redis implements the
+    same methods (e.g. a hash per call plus a key with a TTL per owner, and a
+    stream for the events).
+
+    Every change is also appended to an event log (created, connected, greeted,
+    forwarded, ended, ...) with increasing ids, so watchers can follow changes
+    instead of re-reading every record.
+    """
+
+    # Whether other processes (server workers, agent jobs) see this registry's records and events
+    shared = False
+
+    def __init__(self, ttl: Optional[float] = None, event_log_size: Optional[int] = None):
+        """
+        Args:
+            ttl: Seconds without a heartbeat after which an owner's calls expire (env SESSION_REGISTRY_TTL)
+            event_log_size: Number of recent lifecycle events kept (env SESSION_EVENT_LOG_SIZE)
+        """
+        self.ttl = ttl if ttl is not None else float(os.getenv("SESSION_REGISTRY_TTL", 60))
+        self.event_log_size = event_log_size if event_log_size is not None else int(os.getenv("SESSION_EVENT_LOG_SIZE", 10000))
+        self.owner = current_owner()
+
+    @abstractmethod
+    def put(self, call_id: str, record: Dict[str, Any]) -> None:
+        """Create or replace a call record owned by this process."""
+
+    @abstractmethod
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        """Return a call record, or None."""
+
+    @abstractmethod
+    def update(self, call_id: str, **fields: Any) -> None:
+        """Merge fields into an existing call record."""
+
+    @abstractmethod
+    def remove(self, call_id: str, **fields: Any) -> None:
+        """Delete a call record; fields (e.g. the call's outcome) are added to the record sent with its ended event."""
+
+    @abstractmethod
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """Return every live call record, keyed by call_id."""
+
+    @abstractmethod
+    def events_since(self, after: int, limit: int = 100) -> List[Dict[str, Any]]:
+        """Return up to ``limit`` lifecycle events with an id greater than ``after``, oldest first."""
+
+    @abstractmethod
+    def last_event_id(self) -> int:
+        """Id of the newest event (0 if there are none)."""
+
+    @abstractmethod
+    def heartbeat(self) -> None:
+        """Mark this owner alive."""
+
+    @abstractmethod
+    def expire_stale(self) -> int:
+        """Remove records whose owner stopped heartbeating; returns how many were removed."""
+
+    def count(self) -> int:
+        return len(self.all())
+
+    def find(
+        self,
+        status: Optional[str] = None,
+        caller: Optional[str] = None,
+        created_after: Optional[float] = None,
+        created_before: Optional[float] = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> Tuple[int, List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Filter and page through call records, oldest first.
+
+        Args:
+            status: Only calls with this status
+            caller: Only calls whose caller number contains this string
+            created_after: Only calls created at or after this time (epoch seconds)
+            created_before: Only calls created at or before this time (epoch seconds)
+            offset: Matching calls to skip
+            limit: Maximum calls to return
+
+        Returns:
+            Total number of matching calls, and the requested page of (call_id, record)
+        """
+        matching = sorted(
+            ((call_id, record) for call_id, record in self.all().items() if _matches(record, status, caller, created_after, created_before)),
+            key=lambda item: (item[1].get("created_at", 0), item[0]),
+        )
+        return len(matching), matching[offset:offset + limit]
+
+    def __contains__(self, call_id: str) -> bool:
+        return self.get(call_id) is not None
+
+    def close(self) -> None:
+        pass
+
+
+class InMemorySessionRegistry(SessionRegistry):
+    """Process-local registry (the default, for a single server process)."""
+
+    def __init__(self, ttl: Optional[float] = None, event_log_size: Optional[int] = None):
+        super().__init__(ttl, event_log_size)
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._heartbeats: Dict[str, float] = {}
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=self.event_log_size)
+        self._last_event_id = 0
+
+    def _emit(self, call_id: str, event: str, record: Dict[str, Any]):
+        self._last_event_id += 1
+        self._events.append({"id": self._last_event_id, "call_id": call_id, "event": event, "at": time.time(), "record": dict(record)})
+
+    def put(self, call_id: str, record: Dict[str, Any]) -> None:
+        now = time.time()
+        self._records[call_id] = {**record, "owner": self.owner, "created_at": now, "updated_at": now}
+        self._emit(call_id, "created", self._records[call_id])
+
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(call_id)
+
+    def update(self, call_id: str, **fields: Any) -> None:
+        record = self._records.get(call_id)
+        if record is not None:
+            record.update(fields, updated_at=time.time())
+            self._emit(call_id, _event_name(fields), record)
+
+    def remove(self, call_id: str, **fields: Any) -> None:
+        record = self._records.pop(call_id, None)
+        if record is not None:
+            self._emit(call_id, "ended", {**record, **fields})
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        return dict(self._records)
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def events_since(self, after: int, limit: int = 100) -> List[Dict[str, Any]]:
+        if not self._events:
+            return []
+        # Event ids are consecutive, so the position of the next event is known
+        start = max(0, after + 1 - self._events[0]["id"])
+        return list(islice(self._events, start, start + limit))
+
+    def last_event_id(self) -> int:
+        return self._last_event_id
+
+    def heartbeat(self) -> None:
+        self._heartbeats[self.owner] = time.time()
+
+    def expire_stale(self) -> int:
+        cutoff = time.time() - self.ttl
+        dead = {owner for owner, seen in self._heartbeats.items() if seen < cutoff}
+        stale = [call_id for call_id, record in self._records.items() if record.get("owner") in dead]
+        for call_id in stale:
+            self._emit(call_id, "expired", self._records.pop(call_id))
+        return len(stale)
+
+
+class SQLiteSessionRegistry(SessionRegistry):
+    """
+    Registry in a local SQLite database in WAL mode, shared by every server
+    worker and agent process on the host.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, ttl: Optional[float] = None, event_log_size: Optional[int] = None):
+        super().__init__(ttl, event_log_size)
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "call_id TEXT PRIMARY KEY, owner TEXT NOT NULL, record TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS sessions_owner ON sessions (owner)")
+            db.execute("CREATE TABLE IF NOT EXISTS owners (owner TEXT PRIMARY KEY, heartbeat_at REAL NOT NULL)")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, call_id TEXT NOT NULL, event TEXT NOT NULL, record TEXT NOT NULL, at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread (and per process, since each process imports afresh)
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @staticmethod
+    def _emit(db: sqlite3.Connection, call_id: str, event: str, record_json: str, at: float):
+        db.execute("INSERT INTO events (call_id, event, record, at) VALUES (?, ?, ?, ?)", (call_id, event, record_json, at))
+
+    def put(self, call_id: str, record: Dict[str, Any]) -> None:
+        now = time.time()
+        record_json = json.dumps({**record, "owner": self.owner, "created_at": now, "updated_at": now})
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO sessions (call_id, owner, record, updated_at) VALUES (?, ?, ?, ?)",
+                (call_id, self.owner, record_json, now),
+            )
+            self._emit(db, call_id, "created", record_json, now)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def get(self, call_id: str) -> Optional[Dict[str, Any]]:
+        row = self._connect().execute("SELECT record FROM sessions WHERE call_id = ?", (call_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def update(self, call_id: str, **fields: Any) -> None:
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT record FROM sessions WHERE call_id = ?", (call_id,)).fetchone()
+            if row:
+                now = time.time()
+                record_json = json.dumps({**json.loads(row[0]), **fields, "updated_at": now})
+                db.execute(
+                    "UPDATE sessions SET record = ?, updated_at = ? WHERE call_id = ?",
+                    (record_json, now, call_id),
+                )
+                self._emit(db, call_id, _event_name(fields), record_json, now)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def remove(self, call_id: str, **fields: Any) -> None:
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT record FROM sessions WHERE call_id = ?", (call_id,)).fetchone()
+            if row:
+                db.execute("DELETE FROM sessions WHERE call_id = ?", (call_id,))
+                record_json = json.dumps({**json.loads(row[0]), **fields}) if fields else row[0]
+                self._emit(db, call_id, "ended", record_json, time.time())
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        rows = self._connect().execute("SELECT call_id, record FROM sessions").fetchall()
+        return {call_id: json.loads(record) for call_id, record in rows}
+
+    def count(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def find(
+        self,
+        status: Optional[str] = None,
+        caller: Optional[str] = None,
+        created_after: Optional[float] = None,
+        created_before: Optional[float] = None,
+        offset: int = 0,
+        limit: int = 100,
+    ) -> Tuple[int, List[Tuple[str, Dict[str, Any]]]]:
+        # Filter and page in SQLite instead of loading every record
+        clauses, params = [], []
+        if status is not None:
+            clauses.append("json_extract(record, '$.status') = ?")
+            params.append(status)
+        if caller is not None:
+            clauses.append("instr(json_extract(record, '$.caller_number'), ?) > 0")
+            params.append(caller)
+        if created_after is not None:
+            clauses.append("json_extract(record, '$.created_at') >= ?")
+            params.append(created_after)
+        if created_before is not None:
+            clauses.append("json_extract(record, '$.created_at') <= ?")
+            params.append(created_before)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        db = self._connect()
+        total = db.execute(f"SELECT COUNT(*) FROM sessions{where}", params).fetchone()[0]
+        rows = db.execute(
+            f"SELECT call_id, record FROM sessions{where} ORDER BY json_extract(record, '$.created_at'), call_id LIMIT ? OFFSET ?",
+            (*params, limit, offset),
+        ).fetchall()
+        return total, [(call_id, json.loads(record)) for call_id, record in rows]
+
+    def events_since(self, after: int, limit: int = 100) -> List[Dict[str, Any]]:
+        rows = self._connect().execute(
+            "SELECT id, call_id, event, record, at FROM events WHERE id > ? ORDER BY id LIMIT ?",
+            (after, limit),
+        ).fetchall()
+        return [
+            {"id": event_id, "call_id": call_id, "event": event, "at": at, "record": json.loads(record)}
+            for event_id, call_id, event, record, at in rows
+        ]
+
+    def last_event_id(self) -> int:
+        return self._connect().execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+
+    def heartbeat(self) -> None:
+        self._connect().execute(
+            "INSERT OR REPLACE INTO owners (owner, heartbeat_at) VALUES (?, ?)",
+            (self.owner, time.time()),
+        )
+
+    def expire_stale(self) -> int:
+        cutoff = time.time() - self.ttl
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            stale = db.execute(
+                "SELECT call_id, record FROM sessions WHERE owner IN (SELECT owner FROM owners WHERE heartbeat_at < ?)",
+                (cutoff,),
+            ).fetchall()
+            now = time.time()
+            for call_id, record in stale:
+                self._emit(db, call_id, "expired", record, now)
+            removed = db.execute(
+                "DELETE FROM sessions WHERE owner IN (SELECT owner FROM owners WHERE heartbeat_at < ?)",
+                (cutoff,),
+            ).rowcount
+            db.execute("DELETE FROM owners WHERE heartbeat_at < ?", (cutoff,))
+            # Keep only the most recent events
+            db.execute("DELETE FROM events WHERE id <= (SELECT MAX(id) FROM events) - ?", (self.event_log_size,))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        if removed:
+            logger.info(f"Expired {removed} call session(s) of dead workers")
+        return removed
+
+    def close(self) -> None:
+        db = getattr(self._local, "db", None)
+        if db is not None:
+            db.close()
+            self._local.db = None
+
+
+def create_session_registry(url: Optional[str] = None) -> SessionRegistry:
+    """
+    Create the registry configured by SESSION_REGISTRY_URL.
+
+    Args:
+        url: "memory://" (default), "sqlite:///relative.db" or "sqlite:////absolute/path.db"
+
+    Returns:
+        SessionRegistry instance
+    """
+    url = url or os.getenv("SESSION_REGISTRY_URL", "memory://")
+    if url.startswith("memory://"):
+        return InMemorySessionRegistry()
+    if url.startswith("sqlite:///"):
+        # sqlite:///relative.db or sqlite:////absolute/path.db
+        path = url[len("sqlite:///"):] or "sip_a2a_sessions.db"
+        logger.info(f"Using SQLite session registry at {path}")
+        return SQLiteSessionRegistry(path)
+    raise ValueError(f"Unsupported SESSION_REGISTRY_URL: {url}")
@@ -0,0 +1,96 @@
+import os
+import asyncio
+import logging
+from contextlib import suppress
+from typing import Any, List, Optional
+
+from videosdk.agents import AgentSession
+
+from agents.loan_agent import SIPLoanSpecialistAgent
+from session_manager import create_pipeline, create_session
+
+logger = logging.getLogger(__name__)
+
+
+class SpecialistHost:
+    """
+    Small fixed pool of long-lived loan specialists shared by every call in
+    the process (SPECIALIST_MODE=shared).
+
+    The specialists are started once and kept running across calls, instead of
+    building a specialist agent, pipeline and model client per call. Each
+    specialist keeps conversation history per call_id, and the customer agent
+    pins every call to one specialist, so histories never mix.
+    """
+
+    def __init__(self, size: Optional[int] = None, ready_timeout: float = 10.0, answer_cache: Optional[Any] = None):
+        """
+        Args:
+            size: Number of shared specialists (env SPECIALIST_POOL_SIZE)
+            ready_timeout: Seconds to wait for each specialist to register for A2A
+            answer_cache: Optional AnswerCache shared by the specialists
+        """
+        self.size = max(1, size if size is not None else int(os.getenv("SPECIALIST_POOL_SIZE", 1)))
+        self.ready_timeout = ready_timeout
+        self.answer_cache = answer_cache
+        self.agents: List[SIPLoanSpecialistAgent] = []
+        self._sessions: List[AgentSession] = []
+        self._tasks: List[asyncio.Task] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def started(self) -> bool:
+        return bool(self.agents)
+
+    async def start(self):
+        """Start the shared specialists once; later calls return immediately."""
+        async with self._lock:
+            if self.started:
+                return
+
+            agents: List[SIPLoanSpecialistAgent] = []
+            sessions: List[AgentSession] = []
+            tasks: List[asyncio.Task] = []
+            try:
+                for i in range(self.size):
+                    agent = SIPLoanSpecialistAgent(agent_id=f"sip_loan_specialist_{i + 1}", answer_cache=self.answer_cache)
+                    session = create_session(agent, create_pipeline("specialist"))
+                    tasks.append(asyncio.create_task(session.start(), name=f"shared-specialist-{i + 1}"))
+                    sessions.append(session)
+                    agents.append(agent)
+                await asyncio.gather(*(agent.wait_until_ready(self.ready_timeout) for agent in agents))
+            except BaseException:
+                # Leave the host unstarted, so the next call tries again from scratch
+                await self._stop(tasks, sessions)
+                raise
+
+            self.agents, self._sessions, self._tasks = agents, sessions, tasks
+            logger.info(f"Shared specialist host started with {self.size} specialist(s)")
+
+    def release_call(self, call_id: str):
+        """Drop any state the shared specialists hold for a finished call."""
+        for agent in self.agents:
+            agent.forget_call(call_id)
+
+    async def close(self):
+        """Stop the shared specialists."""
+        async with self._lock:
+            if not self.started:
+                return
+            tasks, sessions = self._tasks, self._sessions
+            self.agents, self._sessions, self._tasks = [], [], []
+            await self._stop(tasks, sessions)
+            logger.info("Shared specialist host closed")
+
+    @staticmethod
+    async def _stop(tasks: List[asyncio.Task], sessions: List[AgentSession]):
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+                with suppress(asyncio.CancelledError):
+                    await task
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                logger.error(f"Error closing shared specialist session: {e}")
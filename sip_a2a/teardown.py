@@ -0,0 +1,192 @@
+import os
+import asyncio
+import logging
+import tracemalloc
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# A teardown step: name and a factory for the coroutine that performs it
+TeardownStep = Tuple[str, Callable[[], Awaitable[Any]]]
+
+TEARDOWN_TIMEOUTS = metrics_registry.counter(
+    "sip_call_teardown_timeouts_total",
+    "Call teardown groups still running when the teardown budget ran out",
+    ["group"],
+)
+CALL_LEAKS = metrics_registry.counter(
+    "sip_call_leaks_total",
+    "Calls whose teardown left residue behind (tasks, fds, sockets, memory)",
+    ["kind"],
+)
+
+
+async def _run_group(steps: List[TeardownStep], progress: Dict[str, str], group: str):
+    for name, step in steps:
+        progress[group] = name
+        await step()
+
+
+async def run_teardown(groups: Dict[str, List[TeardownStep]], budget: float, label: str = "") -> Dict[str, str]:
+    """
+    Run teardown groups concurrently under a total time budget.
+
+    Steps within a group run in order (e.g. shut down the context, then clean up
+    the room); groups run in parallel. Groups still running when the budget runs
+    out are cancelled and left behind, so one hung close cannot stall the worker.
+
+    Args:
+        groups: Group name -> ordered steps
+        budget: Seconds allowed for the whole teardown
+        label: Prefix for log lines (the room id)
+
+    Returns:
+        Per-group result: "ok", "error: ..." or "timeout in <step>"
+    """
+    progress: Dict[str, str] = {}
+    tasks = {asyncio.ensure_future(_run_group(steps, progress, group)): group for group, steps in groups.items() if steps}
+    if not tasks:
+        return {}
+
+    done, pending = await asyncio.wait(tasks, timeout=budget)
+
+    results: Dict[str, str] = {}
+    for task in done:
+        group = tasks[task]
+        if task.cancelled():
+            results[group] = "cancelled"
+        elif task.exception() is not None:
+            results[group] = f"error: {task.exception()}"
+            logger.error(f"[{label}] Teardown {group} failed in {progress.get(group)}: {task.exception()}")
+        else:
+            results[group] = "ok"
+    for task in pending:
+        group = tasks[task]
+        task.cancel()
+        results[group] = f"timeout in {progress.get(group)}"
+        TEARDOWN_TIMEOUTS.inc(group=group)
+        logger.error(f"[{label}] Teardown {group} still in {progress.get(group)} after the {budget}s budget, abandoning it")
+    return results
+
+
+def _open_fds() -> Optional[Tuple[int, int]]:
+    """Open file descriptors and how many of them are sockets (Linux only)."""
+    try:
+        fds = os.listdir("/proc/self/fd")
+    except OSError:
+        return None
+    sockets = 0
+    for fd in fds:
+        try:
+            if os.readlink(f"/proc/self/fd/{fd}").startswith("socket:"):
+                sockets += 1
+        except OSError:
+            pass
+    return len(fds), sockets
+
+
+class LeakProbe:
+    """Process state captured when a call starts."""
+
+    def __init__(self, call_id: str, sequence: int, tasks: Set[asyncio.Task], fds: Optional[Tuple[int, int]], memory: Optional[int], concurrent: bool):
+        self.call_id = call_id
+        self.sequence = sequence
+        self.tasks = tasks
+        self.fds = fds
+        self.memory = memory
+        self.concurrent = concurrent
+
+
+class LeakChecker:
+    """
+    Flags calls whose teardown leaves residue in the worker process.
+
+    Compares the process before and after a call: asyncio tasks created during
+    the call that are still alive, open file descriptors and sockets, and traced
+    memory growth (only while tracemalloc is tracing, e.g. PYTHONTRACEMALLOC=1 or
+    LEAK_CHECK_TRACEMALLOC=true). When several calls overlap in one process their
+    residue cannot be told apart, so those calls are not checked.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        memory_threshold: Optional[int] = None,
+        ignore_tasks: Tuple[str, ...] = ("agent-pool-fill", "shared-specialist"),
+    ):
+        """
+        Args:
+            enabled: Check every call (env LEAK_CHECK, default true)
+            memory_threshold: Traced memory growth in bytes that counts as a leak (env LEAK_CHECK_MEMORY_BYTES)
+            ignore_tasks: Name prefixes of background tasks that may legitimately outlive a call
+        """
+        self.enabled = enabled if enabled is not None else os.getenv("LEAK_CHECK", "true").lower() == "true"
+        self.memory_threshold = memory_threshold if memory_threshold is not None else int(os.getenv("LEAK_CHECK_MEMORY_BYTES", 5 * 1024 * 1024))
+        self.ignore_tasks = ignore_tasks
+        self._in_flight = 0
+        self._started = 0
+
+        if self.enabled and os.getenv("LEAK_CHECK_TRACEMALLOC", "false").lower() == "true" and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def start(self, call_id: str) -> Optional[LeakProbe]:
+        """Capture the process state before a call."""
+        if not self.enabled:
+            return None
+        self._in_flight += 1
+        self._started += 1
+        return LeakProbe(
+            call_id,
+            sequence=self._started,
+            tasks=set(asyncio.all_tasks()),
+            fds=_open_fds(),
+            memory=tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None,
+            concurrent=self._in_flight > 1,
+        )
+
+    async def finish(self, probe: Optional[LeakProbe], label: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Compare the process state after a call's teardown with the probe.
+
+        Returns:
+            The residue found (empty if none), or None if the call was not checked
+        """
+        if probe is None:
+            return None
+        self._in_flight -= 1
+        if probe.concurrent or self._in_flight > 0 or self._started != probe.sequence:
+            return None
+
+        # Let tasks cancelled during teardown finish unwinding
+        for _ in range(3):
+            await asyncio.sleep(0)
+
+        residue: Dict[str, Any] = {}
+        current = asyncio.current_task()
+        tasks = [
+            task for task in asyncio.all_tasks()
+            if task not in probe.tasks and task is not current and not task.done()
+            and not task.get_name().startswith(self.ignore_tasks)
+        ]
+        if tasks:
+            residue["tasks"] = [f"{task.get_name()}: {getattr(task.get_coro(), '__qualname__', '?')}" for task in tasks]
+
+        fds = _open_fds()
+        if fds is not None and probe.fds is not None:
+            if fds[0] > probe.fds[0]:
+                residue["fds"] = fds[0] - probe.fds[0]
+            if fds[1] > probe.fds[1]:
+                residue["sockets"] = fds[1] - probe.fds[1]
+
+        if probe.memory is not None and tracemalloc.is_tracing():
+            growth = tracemalloc.get_traced_memory()[0] - probe.memory
+            if growth > self.memory_threshold:
+                residue["memory_bytes"] = growth
+
+        for kind in residue:
+            CALL_LEAKS.inc(kind=kind)
+        if residue:
+            logger.warning(f"[{label}] Call {probe.call_id} left residue after teardown: {residue}")
+        return residue
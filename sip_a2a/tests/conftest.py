@@ -0,0 +1,31 @@
+"""
+Test setup for the SIP server modules.
+
+The modules use flat imports (run from sip_a2a/), and main.py checks its
+configuration at import time, so both are arranged here before any test imports them.
+
+Run from the repository root:
+    python -m pytest sip_a2a/tests
+"""
+import os
+import sys
+import tempfile
+
+SIP_A2A_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(SIP_A2A_DIR)
+
+# sip_a2a modules first; the repository root (for fake_models) last, since its
+# example scripts (openai.py, ...) would otherwise shadow the installed packages
+if SIP_A2A_DIR not in sys.path:
+    sys.path.insert(0, SIP_A2A_DIR)
+if REPO_ROOT not in sys.path:
+    sys.path.append(REPO_ROOT)
+
+for _name in (
+    "VIDEOSDK_API_KEY", "VIDEOSDK_SECRET_KEY", "VIDEOSDK_TOKEN", "VIDEOSDK_SIP_USERNAME", "VIDEOSDK_SIP_PASSWORD",
+    "GOOGLE_API_KEY", "OPENAI_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN",
+):
+    os.environ.setdefault(_name, f"test-{_name.lower()}")
+os.environ.setdefault("TWILIO_PHONE_NUMBER", "+15550000000")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("METRICS_DIR", tempfile.mkdtemp(prefix="sip_a2a_tests_"))
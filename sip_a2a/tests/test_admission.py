@@ -0,0 +1,102 @@
+import asyncio
+
+import admission as admission_module
+from admission import AdmissionController, ADMITTED, QUEUED, REJECTED
+from loadtest import StandIns, serve
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_controller(monkeypatch, **kwargs) -> AdmissionController:
+    clock = Clock()
+    monkeypatch.setattr(admission_module.time, "monotonic", clock)
+    options = dict(max_active=1, max_queue=3, max_wait=60, poll_interval=10, priority_numbers=["+15550000001"])
+    options.update(kwargs)
+    controller = AdmissionController(**options)
+    controller.clock = clock
+    return controller
+
+
+def test_queue_serves_priority_callers_then_arrival_order(monkeypatch):
+    controller = make_controller(monkeypatch)
+    assert controller.try_admit("CA1") == ADMITTED
+    assert controller.try_admit("CA2", "+15559999999") == QUEUED
+    assert controller.try_admit("CA3", "+15559999999") == QUEUED
+    assert controller.try_admit("CA4", "+15550000001") == QUEUED
+    assert controller.try_admit("CA5") == REJECTED
+
+    admitted = []
+    for _ in range(3):
+        controller.release(admitted[-1] if admitted else "CA1")
+        # Every waiting caller polls; only the head of the queue gets the freed slot
+        for call_id in ("CA2", "CA3", "CA4"):
+            if call_id not in admitted and controller.try_admit(call_id) == ADMITTED:
+                admitted.append(call_id)
+    assert admitted == ["CA4", "CA2", "CA3"]
+
+
+def test_waiting_callers_expire(monkeypatch):
+    controller = make_controller(monkeypatch, max_wait=25)
+    controller.try_admit("CA1")
+    assert controller.try_admit("CApatient") == QUEUED
+    assert controller.try_admit("CAgone") == QUEUED
+
+    # The patient caller keeps polling; the other one hung up and stopped
+    for _ in range(3):
+        controller.clock.now += 11
+        result = controller.try_admit("CApatient")
+    assert not controller.is_waiting("CAgone")
+    # Waited longer than max_wait: told to call back
+    assert result == REJECTED
+    assert controller.stats()["queued"] == 0
+
+
+def test_slot_is_reclaimed_when_the_call_never_reports_its_end(monkeypatch):
+    controller = make_controller(monkeypatch, max_call_seconds=600)
+    assert controller.try_admit("CAlost") == ADMITTED
+    assert controller.free_slots() == 0
+    controller.clock.now += 601
+    assert controller.free_slots() == 1
+    assert controller.try_admit("CAnext") == ADMITTED
+
+
+def test_reservation_holds_a_slot_until_confirmed_or_released(monkeypatch):
+    controller = make_controller(monkeypatch, max_active=2)
+    first = controller.reserve()
+    second = controller.reserve()
+    assert first and second and first != second
+    assert controller.reserve() is None
+    assert controller.try_admit("CAincoming") == QUEUED
+
+    controller.confirm(first, "CAoutbound")
+    controller.release(second)
+    assert controller.stats()["active"] == 1
+    # The queued caller gets the released slot
+    assert controller.try_admit("CAincoming") == ADMITTED
+    controller.release("CAoutbound")
+    assert controller.stats()["active"] == 1
+
+
+def test_concurrent_outbound_calls_do_not_exceed_the_cap(monkeypatch):
+    import main
+
+    monkeypatch.setattr(main, "admission", AdmissionController(max_active=2, max_queue=0))
+    stand_ins = StandIns(room_latency=0.0, twilio_latency=0.3, call_duration=0.2)
+
+    async def scenario():
+        async with serve(main, stand_ins) as client:
+            responses = await asyncio.gather(*(
+                client.post("/call/make", params={"to_number": f"+1777000{i:04d}"}) for i in range(5)
+            ))
+            return [response.json()["status"] for response in responses]
+
+    statuses = asyncio.run(scenario())
+    assert statuses.count("success") == 2
+    assert statuses.count("error") == 3
+    assert stand_ins.api.calls_created == 2
@@ -0,0 +1,85 @@
+import asyncio
+
+from agent_pool import AgentPool
+
+
+class Factory:
+    def __init__(self):
+        self.built = 0
+
+    def __call__(self):
+        self.built += 1
+        return object()
+
+
+def serve_calls(pool: AgentPool, calls: int):
+    """Check out, refill and check in the way _agent_entrypoint does for each call."""
+    async def scenario():
+        for _ in range(calls):
+            shell = pool.checkout()
+            await pool.fill()
+            pool.checkin(shell)
+
+    asyncio.run(scenario())
+
+
+def test_pool_builds_nothing_until_started():
+    # A fresh WorkerJob process: one call per process, so pre-built shells would go unused
+    factory = Factory()
+    pool = AgentPool(None, factory, size=1, recycle_after=1)
+    serve_calls(pool, 5)
+    assert factory.built == 0
+    assert pool.stats()["misses"] == 0
+
+
+def test_started_pool_is_full_before_the_first_call():
+    factory = Factory()
+    pool = AgentPool(None, factory, size=1, recycle_after=1)
+    asyncio.run(pool.start())
+    assert factory.built == 1
+
+    serve_calls(pool, 3)
+    assert pool.stats()["hits"] == 3
+    assert pool.stats()["misses"] == 0
+    # Each call's shell is recycled and replaced by one built after its greeting
+    assert factory.built == 4
+
+
+def test_stop_cancels_a_background_fill():
+    factory = Factory()
+    pool = AgentPool(None, factory, size=3, recycle_after=1)
+    pool.active = True
+
+    async def scenario():
+        task = pool.fill_in_background()
+        # A second call while the fill is running reuses it
+        assert pool.fill_in_background() is task
+        await asyncio.sleep(0)
+        await pool.stop()
+        return task
+
+    task = asyncio.run(scenario())
+    assert task.cancelled()
+    assert factory.built < 3
+    assert pool.stats()["active"] is False
+    assert pool.stats()["idle"] == 0
+
+
+def test_failed_background_fill_is_logged(caplog):
+    pool = AgentPool(None, Factory(), size=1, recycle_after=1)
+    pool.active = True
+
+    async def broken_fill():
+        raise RuntimeError("plugin missing")
+
+    pool.fill = broken_fill
+
+    async def scenario():
+        task = pool.fill_in_background()
+        await asyncio.wait({task})
+        await asyncio.sleep(0)
+
+    with caplog.at_level("ERROR", logger="agent_pool"):
+        asyncio.run(scenario())
+    assert pool.stats()["build_failures"] == 1
+    assert "plugin missing" in caplog.text
@@ -0,0 +1,146 @@
+import time
+import asyncio
+
+import numpy as np
+import pytest
+
+from answer_cache import AnswerCache, SQLiteAnswerCache, VectorIndex, create_answer_cache
+
+PROMPT = "You are a loan specialist."
+
+# Queries about the same topic share a direction, so rephrasings are near-duplicates
+TOPICS = {"rate": [1.0, 0.0, 0.0], "term": [0.0, 1.0, 0.0], "fee": [0.0, 0.0, 1.0]}
+
+
+async def embed(text: str):
+    vector = [0.0, 0.0, 0.0]
+    for topic, direction in TOPICS.items():
+        vector = [a + text.count(topic) * b for a, b in zip(vector, direction)]
+    return vector
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_cache(request, tmp_path):
+    caches = []
+
+    def make(**kwargs):
+        if request.param == "memory":
+            cache = AnswerCache(**kwargs)
+        else:
+            cache = SQLiteAnswerCache(str(tmp_path / "answers.db"), **kwargs)
+        caches.append(cache)
+        return cache
+
+    yield make
+    for cache in caches:
+        cache.close()
+
+
+def test_hit_after_put_and_expiry(make_cache, monkeypatch):
+    cache = make_cache(max_size=8, ttl=60)
+
+    async def scenario():
+        await cache.put("What is the rate?", "Five percent.", PROMPT)
+        hit, _ = await cache.get("what is the RATE", PROMPT)
+        assert hit == "Five percent."
+        # A minute and a bit later the answer has expired
+        later = time.time() + 61, time.monotonic() + 61
+        monkeypatch.setattr(time, "time", lambda: later[0])
+        monkeypatch.setattr(time, "monotonic", lambda: later[1])
+        miss, _ = await cache.get("What is the rate?", PROMPT)
+        assert miss is None
+
+    asyncio.run(scenario())
+    assert cache.stats()["size"] == 0
+
+
+def test_prompt_change_invalidates(make_cache):
+    cache = make_cache(max_size=8, ttl=60)
+
+    async def scenario():
+        await cache.put("What is the rate?", "Five percent.", PROMPT)
+        miss, _ = await cache.get("What is the rate?", PROMPT + " Be brief.")
+        assert miss is None
+
+    asyncio.run(scenario())
+    assert cache.invalidations == 1
+
+
+def test_least_recently_used_answer_is_evicted(make_cache):
+    cache = make_cache(max_size=2, ttl=60)
+
+    async def scenario():
+        await cache.put("rate?", "Five percent.", PROMPT)
+        await cache.put("term?", "Five years.", PROMPT)
+        await cache.get("rate?", PROMPT)
+        await cache.put("fee?", "No fee.", PROMPT)
+        return [(await cache.get(q, PROMPT))[0] for q in ("rate?", "term?", "fee?")]
+
+    assert asyncio.run(scenario()) == ["Five percent.", None, "No fee."]
+
+
+def test_similar_query_skips_expired_entries(make_cache, monkeypatch):
+    cache = make_cache(max_size=8, ttl=60, embed=embed, similarity_threshold=0.9)
+
+    async def scenario():
+        # The closest match to the lookup is stored first, and expires first
+        await cache.put("rate", "Rates start at five percent.", PROMPT)
+        later = time.time() + 40, time.monotonic() + 40
+        monkeypatch.setattr(time, "time", lambda: later[0])
+        monkeypatch.setattr(time, "monotonic", lambda: later[1])
+        await cache.put("rate rate rate term", "Rates and terms vary.", PROMPT)
+        later = time.time() + 30, time.monotonic() + 30
+        monkeypatch.setattr(time, "time", lambda: later[0])
+        monkeypatch.setattr(time, "monotonic", lambda: later[1])
+        answer, _ = await cache.get("the rate", PROMPT)
+        return answer
+
+    assert asyncio.run(scenario()) == "Rates and terms vary."
+    assert cache.similar_hits == 1
+
+
+def test_sqlite_cache_is_shared_between_processes(tmp_path):
+    # Two caches on one database stand in for two worker processes
+    path = str(tmp_path / "answers.db")
+    first = SQLiteAnswerCache(path, max_size=8, ttl=60, embed=embed, similarity_threshold=0.9)
+    second = SQLiteAnswerCache(path, max_size=8, ttl=60, embed=embed, similarity_threshold=0.9)
+
+    async def scenario():
+        await first.put("What is the rate?", "Five percent.", PROMPT)
+        exact, _ = await second.get("what is the rate", PROMPT)
+        similar, _ = await second.get("rate please", PROMPT)
+        return exact, similar
+
+    try:
+        assert asyncio.run(scenario()) == ("Five percent.", "Five percent.")
+    finally:
+        first.close()
+        second.close()
+
+
+def test_vector_index_appends_without_rebuilding():
+    index = VectorIndex(capacity=2)
+    for i in range(5):
+        vector = np.zeros(8, dtype=np.float32)
+        vector[i] = 1.0
+        index.add(f"q{i}", vector)
+    matrix = index._matrix
+    assert matrix.shape == (8, 8)
+
+    index.remove("q1")
+    vector = np.zeros(8, dtype=np.float32)
+    vector[5] = 1.0
+    index.add("q5", vector)
+    # The freed row is reused in place
+    assert index._matrix is matrix
+    assert index.similar(vector, 0.9) == ["q5"]
+    assert len(index) == 5
+
+
+def test_create_answer_cache(tmp_path):
+    assert type(create_answer_cache("memory://")) is AnswerCache
+    cache = create_answer_cache(f"sqlite:///{tmp_path / 'answers.db'}")
+    assert isinstance(cache, SQLiteAnswerCache)
+    cache.close()
+    with pytest.raises(ValueError):
+        create_answer_cache("redis://localhost")
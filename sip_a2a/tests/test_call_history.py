@@ -0,0 +1,78 @@
+import call_history
+from call_history import CallHistory, CallRecord
+
+
+class Clock:
+    def __init__(self, now: float = 1_700_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_call(clock: Clock, index: int, outcome: str = "completed", setup: float = None, handle: float = 60.0,
+              inbound: bool = True) -> CallRecord:
+    record = CallRecord(f"CA{index:032d}", f"room-{index}", caller_number="+15550001111" if inbound else None)
+    if setup is not None:
+        record.answered(setup)
+    clock.now += handle
+    return record.finish(outcome)
+
+
+def test_oldest_calls_are_overwritten_once_the_buffer_is_full(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(call_history.time, "time", clock)
+    history = CallHistory(size=3)
+
+    for index, outcome in enumerate(("busy", "failed", "completed", "completed", "no-answer")):
+        history.append(make_call(clock, index, outcome))
+
+    assert len(history) == 3
+    stats = history.stats(window=3600)
+    assert stats["calls"] == 3
+    assert stats["completed_total"] == 5
+    # busy and failed were the two oldest calls
+    assert stats["outcomes"] == {"completed": 2, "no-answer": 1}
+
+
+def test_stats_aggregate_calls_inside_the_window(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(call_history.time, "time", clock)
+    history = CallHistory(size=100)
+
+    # Ended more than the window ago
+    history.append(make_call(clock, 0, "failed", setup=9.0, handle=10.0))
+    clock.now += 600
+    for index in range(1, 11):
+        history.append(make_call(clock, index, setup=index / 10, handle=30.0, inbound=index % 2 == 0))
+    history.append(make_call(clock, 11, "launch_failed", handle=0.0))
+    history.append(make_call(clock, 12, "some-new-twilio-status", setup=0.5, handle=30.0))
+
+    stats = history.stats(window=300)
+    assert stats["calls"] == 12
+    assert stats["calls_per_minute"] == 2.4
+    assert stats["mean_handle_seconds"] == 27.5
+    # The launch failure never reached setup, so it is left out of the setup percentiles
+    assert stats["setup_seconds"] == {"p50": 0.5, "p90": 0.9, "p99": 1.0}
+    assert stats["outcomes"] == {"completed": 10, "launch_failed": 1, "other": 1}
+    assert stats["directions"] == {"inbound": 7, "outbound": 5}
+
+
+def test_empty_history_has_no_aggregates():
+    stats = CallHistory(size=10).stats()
+    assert stats["calls"] == 0
+    assert stats["mean_handle_seconds"] is None
+    assert stats["setup_seconds"] == {"p50": None, "p90": None, "p99": None}
+    assert stats["outcomes"] == {} and stats["directions"] == {}
+
+
+def test_bridged_calls_are_counted_under_their_dial_status(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(call_history.time, "time", clock)
+    history = CallHistory(size=10)
+
+    # DialCallStatus is "answered" for a call whose SIP leg was bridged
+    for index, outcome in enumerate(("answered", "answered", "completed", "no-answer")):
+        history.append(make_call(clock, index, outcome))
+
+    assert history.stats(window=3600)["outcomes"] == {"answered": 2, "completed": 1, "no-answer": 1}
@@ -0,0 +1,69 @@
+import gc
+import asyncio
+
+from videosdk.agents import AgentSession
+
+from loadtest import OfflineRoom
+from worker_pool import run_in_job_scope
+
+CALLS = 1000
+WARMUP_CALLS = 50
+# Allowed resident memory growth over the soak (a few hundred bytes per call is allocator noise)
+MAX_RSS_GROWTH = 5 * 1024 * 1024
+
+
+def rss_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * 4096
+
+
+def live_sessions() -> int:
+    gc.collect()
+    return sum(isinstance(obj, AgentSession) for obj in gc.get_objects())
+
+
+async def simulated_call(main, index: int):
+    """One call through _agent_entrypoint on the fake models; the caller hangs up right after the greeting."""
+    ctx = main._make_context(f"room-soak-{index}", "soak", call_id=f"CAsoak{index:020d}")
+    room = OfflineRoom(join_delay=0.0, call_duration=0.0)
+
+    async def connect():
+        ctx.room = room
+
+    async def shutdown():
+        pass
+
+    ctx.connect = connect
+    ctx.shutdown = shutdown
+    await run_in_job_scope(main._agent_entrypoint, ctx)
+
+
+def test_thousand_calls_leave_nothing_behind(monkeypatch):
+    import main
+
+    residues = []
+    finish = main.leak_checker.finish
+
+    async def recording_finish(probe, label=""):
+        residue = await finish(probe, label=label)
+        residues.append(residue)
+        return residue
+
+    monkeypatch.setattr(main.leak_checker, "finish", recording_finish)
+
+    async def scenario():
+        # Let imports, caches and the allocator settle before taking the baseline
+        for index in range(WARMUP_CALLS):
+            await simulated_call(main, index)
+        baseline = len(asyncio.all_tasks()), live_sessions(), rss_bytes()
+        for index in range(WARMUP_CALLS, WARMUP_CALLS + CALLS):
+            await simulated_call(main, index)
+        return baseline, (len(asyncio.all_tasks()), live_sessions(), rss_bytes())
+
+    (tasks_before, sessions_before, rss_before), (tasks_after, sessions_after, rss_after) = asyncio.run(scenario())
+    assert tasks_after == tasks_before
+    assert sessions_after == sessions_before == 0
+    assert rss_after - rss_before < MAX_RSS_GROWTH
+    # Calls ran one at a time, so the leak checker inspected every one of them
+    assert len(residues) == WARMUP_CALLS + CALLS
+    assert all(residue == {} for residue in residues)
@@ -0,0 +1,177 @@
+import time
+import asyncio
+
+from campaign import CampaignDialer, DONE, FAILED, INVALID
+
+
+class FakeCarrier:
+    """Dial stand-in: records when each call was placed and ends it ``call_duration`` seconds later."""
+
+    def __init__(self, call_duration: float = 0.0, outcomes=None, failures: int = 0, refusals: int = 0):
+        self.call_duration = call_duration
+        # Final status per attempt, in order (default "completed")
+        self.outcomes = list(outcomes or [])
+        self.failures = failures
+        # Dials refused up front, the way place_outbound_call does when admission has no free slot
+        self.refusals = refusals
+        self.dialer = None
+        self.dialed_at = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def dial(self, number: str):
+        self.dialed_at.append(time.monotonic())
+        if self.refusals:
+            self.refusals -= 1
+            return {"status": "failed", "error": "Server at capacity, try again later.", "retryable": True, "reason": "capacity"}
+        if self.failures:
+            self.failures -= 1
+            return {"status": "failed", "error": "Twilio 503", "retryable": True}
+        sid = f"CA{len(self.dialed_at):032d}"
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        outcome = self.outcomes.pop(0) if self.outcomes else "completed"
+        asyncio.get_running_loop().call_later(self.call_duration, self._end, sid, outcome)
+        return {"sid": sid, "room_id": f"room-{sid}"}
+
+    def _end(self, sid: str, outcome: str):
+        self.in_flight -= 1
+        self.dialer.call_ended(sid, outcome)
+
+
+def make_dialer(carrier: FakeCarrier, capacity: int = 100, **kwargs) -> CampaignDialer:
+    kwargs.setdefault("cps", 1000)
+    kwargs.setdefault("poll_interval", 0.01)
+    # Like admission, the server's free slots shrink with every call in progress
+    dialer = CampaignDialer(carrier.dial, lambda: capacity - carrier.in_flight, **kwargs)
+    carrier.dialer = dialer
+    return dialer
+
+
+def numbers(count: int):
+    return [f"+1555{i:07d}" for i in range(count)]
+
+
+def run_campaign(dialer: CampaignDialer, contacts, **kwargs):
+    async def scenario():
+        campaign = dialer.create(contacts, **kwargs)
+        await asyncio.wait_for(campaign._task, timeout=10)
+        return campaign
+
+    return asyncio.run(scenario())
+
+
+def test_call_creations_are_spaced_by_the_cps_limit():
+    carrier = FakeCarrier()
+    campaign = run_campaign(make_dialer(carrier, cps=20), numbers(6))
+
+    assert campaign.progress()["states"] == {DONE: 6}
+    # Dial times are taken when each dial task starts, so allow a little scheduling jitter per gap
+    gaps = [later - earlier for earlier, later in zip(carrier.dialed_at, carrier.dialed_at[1:])]
+    assert min(gaps) >= 0.04
+    assert carrier.dialed_at[-1] - carrier.dialed_at[0] >= 5 * 0.05 - 0.01
+
+
+def test_calls_in_flight_never_exceed_the_campaign_cap():
+    carrier = FakeCarrier(call_duration=0.05)
+    campaign = run_campaign(make_dialer(carrier), numbers(8) + ["not-a-number"], max_concurrency=2)
+
+    assert campaign.progress()["states"] == {DONE: 8, INVALID: 1}
+    assert carrier.peak_in_flight == 2
+
+
+def test_calls_in_flight_never_exceed_the_server_capacity():
+    carrier = FakeCarrier(call_duration=0.05)
+    campaign = run_campaign(make_dialer(carrier, capacity=1), numbers(4), max_concurrency=10)
+
+    assert campaign.progress()["states"] == {DONE: 4}
+    assert carrier.peak_in_flight == 1
+
+
+def test_failed_dials_are_retried_with_exponential_backoff():
+    carrier = FakeCarrier(failures=5)
+    campaign = run_campaign(make_dialer(carrier, retry_delay=0.05), numbers(1), max_attempts=3)
+
+    contact = campaign.contacts[0]
+    assert contact.state == FAILED and contact.attempts == 3
+    assert contact.error == "Twilio 503"
+    first, second = (later - earlier for earlier, later in zip(carrier.dialed_at, carrier.dialed_at[1:]))
+    assert 0.05 <= first < 0.1
+    assert 0.1 <= second < 0.2
+
+
+def test_retry_outcomes_redial_until_the_call_completes():
+    carrier = FakeCarrier(outcomes=["busy", "busy", "completed"])
+    campaign = run_campaign(make_dialer(carrier, retry_delay=0.01), numbers(1), max_attempts=3, retry_outcomes=["busy"])
+
+    contact = campaign.contacts[0]
+    assert contact.state == DONE and contact.outcome == "completed"
+    assert contact.attempts == 3 and campaign.retried == 2
+
+
+def test_stop_ends_a_campaign_woken_just_before_the_cancel():
+    carrier = FakeCarrier()
+    # No free slots and no polling, so the campaign only wakes up when told to
+    dialer = make_dialer(carrier, capacity=0, poll_interval=60)
+
+    async def scenario():
+        campaign = dialer.create(numbers(3))
+        await asyncio.sleep(0.05)
+        campaign._wakeup.set()
+        stopping = asyncio.ensure_future(dialer.stop())
+        stopped = (await asyncio.wait({stopping}, timeout=2))[0]
+        if not stopped:
+            # Unblock the hung stop() so the test fails instead of hanging
+            campaign._task.cancel()
+            await stopping
+        return stopped, campaign
+
+    stopped, campaign = asyncio.run(scenario())
+    assert stopped
+    assert campaign._task.done()
+    assert carrier.dialed_at == []
+
+
+def test_dials_refused_for_capacity_do_not_use_up_attempts():
+    carrier = FakeCarrier(refusals=4)
+    campaign = run_campaign(make_dialer(carrier, retry_delay=0.05), numbers(1), max_attempts=2)
+
+    contact = campaign.contacts[0]
+    assert contact.state == DONE and contact.attempts == 1
+    assert len(carrier.dialed_at) == 5
+    assert campaign.retried == 0
+
+
+def test_finished_campaigns_are_evicted_beyond_the_cap():
+    carrier = FakeCarrier()
+    dialer = make_dialer(carrier, max_finished=2)
+
+    async def scenario():
+        campaigns = []
+        for _ in range(4):
+            campaign = dialer.create(numbers(1))
+            await asyncio.wait_for(campaign._task, timeout=10)
+            campaigns.append(campaign)
+        return campaigns
+
+    campaigns = asyncio.run(scenario())
+    assert list(dialer.campaigns) == [campaign.campaign_id for campaign in campaigns[-2:]]
+
+
+def test_finished_campaigns_are_evicted_after_the_retention_window():
+    carrier = FakeCarrier()
+    dialer = make_dialer(carrier, retention=0.05)
+
+    async def scenario():
+        finished = dialer.create(numbers(1))
+        await asyncio.wait_for(finished._task, timeout=10)
+        assert dialer.get(finished.campaign_id) is finished
+        await asyncio.sleep(0.1)
+        running = dialer.create(numbers(1))
+        evicted = dialer.get(finished.campaign_id) is None
+        await dialer.stop()
+        return evicted, running
+
+    evicted, running = asyncio.run(scenario())
+    assert evicted
+    assert dialer.get(running.campaign_id) is running
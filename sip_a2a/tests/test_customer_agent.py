@@ -0,0 +1,155 @@
+import time
+import asyncio
+from types import SimpleNamespace
+
+from videosdk.agents import A2AMessage
+from videosdk.agents.utterance_handle import UtteranceHandle
+
+from agents import customer_agent
+from agents.customer_agent import SIPCustomerServiceAgent
+
+
+class PlaybackSession:
+    """Session stand-in: audio starts ``first_audio`` seconds after say() and plays for ``duration``."""
+
+    def __init__(self, first_audio: float, duration: float):
+        self.first_audio = first_audio
+        self.duration = duration
+        self.spoken = []
+        self.cut_off = []
+        self._handlers = {}
+        self._current = None
+
+    def on(self, event, handler):
+        self._handlers.setdefault(event, []).append(handler)
+
+    def _emit_state(self, state: str):
+        for handler in self._handlers.get("agent_state_changed", []):
+            handler({"state": state})
+
+    def _finish(self, text: str, handle: UtteranceHandle):
+        if not handle.done():
+            self.spoken.append(text)
+            handle._mark_done()
+            self._emit_state("idle")
+
+    async def say(self, text: str) -> UtteranceHandle:
+        # Like AgentSession.say: a new utterance interrupts one still playing
+        if self._current is not None and not self._current.done():
+            self.cut_off.append(self._current.id)
+            self._current.interrupt()
+        handle = UtteranceHandle(utterance_id=f"utt_{len(self.spoken) + len(self.cut_off)}")
+        self._current = handle
+        loop = asyncio.get_running_loop()
+        loop.call_later(self.first_audio, self._emit_state, "speaking")
+        loop.call_later(self.first_audio + self.duration, self._finish, text, handle)
+        return handle
+
+
+class Recorder:
+    def __init__(self):
+        self.values = []
+
+    def observe(self, value, **labels):
+        self.values.append(value)
+
+
+def make_agent(session: PlaybackSession) -> SIPCustomerServiceAgent:
+    agent = SIPCustomerServiceAgent(ctx=SimpleNamespace(call_id="CAcustomer"))
+    agent.session = session
+    session.on("agent_state_changed", agent._on_agent_state_changed)
+    return agent
+
+
+def pend(agent: SIPCustomerServiceAgent, request_id: str):
+    agent._pending_requests[request_id] = {"query": "loan rates?", "sent_at": time.perf_counter(), "answered": False, "first_audio": False}
+
+
+def answer(request_id: str, text: str) -> A2AMessage:
+    return A2AMessage(
+        from_agent="loan_specialist",
+        to_agent="sip_customer_service_CAcustomer",
+        type="specialist_response",
+        content={"response": text, "call_id": "CAcustomer", "request_id": request_id},
+    )
+
+
+def test_answers_play_out_in_order_without_cutting_each_other_off():
+    session = PlaybackSession(first_audio=0.02, duration=0.1)
+    agent = make_agent(session)
+
+    async def scenario():
+        for request_id in ("r1", "r2", "r3"):
+            pend(agent, request_id)
+        await asyncio.gather(*(agent.handle_specialist_response(answer(r, f"answer {r}")) for r in ("r1", "r2", "r3")))
+        await agent.wait_until_spoken()
+
+    asyncio.run(scenario())
+    assert session.cut_off == []
+    assert session.spoken == ["answer r1", "answer r2", "answer r3"]
+
+
+def test_first_audio_is_measured_when_playback_starts(monkeypatch):
+    first_audio, round_trip = Recorder(), Recorder()
+    monkeypatch.setattr(customer_agent, "SPECIALIST_FIRST_AUDIO_SECONDS", first_audio)
+    monkeypatch.setattr(customer_agent, "SPECIALIST_ROUND_TRIP_SECONDS", round_trip)
+    session = PlaybackSession(first_audio=0.3, duration=0.05)
+    agent = make_agent(session)
+
+    async def scenario():
+        pend(agent, "r1")
+        await agent.handle_specialist_response(answer("r1", "Rates start at five percent."))
+        await agent.wait_until_spoken()
+
+    asyncio.run(scenario())
+    assert len(round_trip.values) == 1 and len(first_audio.values) == 1
+    assert round_trip.values[0] < 0.1
+    assert first_audio.values[0] >= 0.3
+
+
+def test_stuck_playback_does_not_hold_later_answers(monkeypatch):
+    monkeypatch.setattr(SIPCustomerServiceAgent, "PLAYBACK_TIMEOUT_BASE", 0.1)
+    monkeypatch.setattr(SIPCustomerServiceAgent, "PLAYBACK_SECONDS_PER_WORD", 0.0)
+    # The first utterance never finishes playing
+    session = PlaybackSession(first_audio=0.01, duration=3600)
+    agent = make_agent(session)
+
+    async def scenario():
+        pend(agent, "r1")
+        pend(agent, "r2")
+        started_at = time.perf_counter()
+        await asyncio.gather(agent.handle_specialist_response(answer("r1", "one")), agent.handle_specialist_response(answer("r2", "two")))
+        await agent.wait_until_spoken()
+        return time.perf_counter() - started_at
+
+    assert asyncio.run(scenario()) < 1.0
+
+
+def chunk(request_id: str, seq: int, text: str = "", final: bool = False) -> A2AMessage:
+    return A2AMessage(
+        from_agent="loan_specialist",
+        to_agent="sip_customer_service_CAcustomer",
+        type="specialist_response_chunk",
+        content={"request_id": request_id, "call_id": "CAcustomer", "seq": seq, "text": text, "final": final},
+    )
+
+
+def test_streamed_chunks_are_handed_off_without_waiting_for_playback():
+    session = PlaybackSession(first_audio=0.01, duration=0.2)
+    agent = make_agent(session)
+
+    async def scenario():
+        pend(agent, "r1")
+        started_at = time.perf_counter()
+        # The specialist's send_message waits for these handlers, so they must not wait for the audio
+        for message in (chunk("r1", 1, "second."), chunk("r1", 0, "First."), chunk("r1", 2, final=True)):
+            await agent.handle_specialist_response_chunk(message)
+        handed_off = time.perf_counter() - started_at
+        assert "r1" in agent._pending_requests
+        await agent.wait_until_spoken()
+        return handed_off
+
+    assert asyncio.run(scenario()) < 0.1
+    assert session.spoken == ["First.", "second."]
+    assert session.cut_off == []
+    assert agent._pending_requests == {}
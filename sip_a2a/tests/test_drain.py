@@ -0,0 +1,29 @@
+import asyncio
+import logging
+
+from drain import DrainController
+
+
+def test_log_shows_the_deadline_in_effect(caplog):
+    controller = DrainController(deadline=300, poll_interval=0.01)
+    torn_down = []
+
+    async def hang_up(call_id):
+        torn_down.append(call_id)
+
+    with caplog.at_level(logging.WARNING, logger="drain"):
+        results = asyncio.run(controller.drain(lambda: ["CA1"], lambda call_id: [("hangup", lambda: hang_up(call_id))], deadline=0))
+
+    assert "deadline 0s" in caplog.text
+    assert "300s" not in caplog.text
+    assert torn_down == ["CA1"] and results == {"CA1": {"hangup": "ok"}}
+
+
+def test_shortened_deadline_is_logged_when_already_draining(caplog):
+    controller = DrainController(deadline=300, poll_interval=0.01)
+    controller.begin("admin")
+
+    with caplog.at_level(logging.WARNING, logger="drain"):
+        asyncio.run(controller.drain(lambda: [], lambda call_id: [], deadline=0))
+
+    assert "Drain deadline changed to 0s" in caplog.text
@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+from videosdk.agents import A2AMessage, ChatRole
+
+from agents.loan_agent import SIPLoanSpecialistAgent
+
+
+class SlowLLM:
+    """LLM stand-in that takes ``delay`` seconds to answer each query."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def chat(self, history):
+        await asyncio.sleep(self.delay)
+        yield SimpleNamespace(content="Rates start at five percent.")
+
+
+class Outbox:
+    def __init__(self):
+        self.sent = []
+
+    async def send_message(self, to_agent, message_type, content):
+        self.sent.append(content)
+
+
+def make_agent(monkeypatch, llm_delay: float, timeout: float, concurrency: int) -> SIPLoanSpecialistAgent:
+    monkeypatch.setenv("SPECIALIST_MAX_CONCURRENCY", str(concurrency))
+    monkeypatch.setenv("SPECIALIST_REQUEST_TIMEOUT", str(timeout))
+    agent = SIPLoanSpecialistAgent()
+    agent.session = SimpleNamespace(pipeline=SimpleNamespace(llm=SlowLLM(llm_delay)))
+    agent.a2a = Outbox()
+    return agent
+
+
+def query(call_id: str, request_id: str) -> A2AMessage:
+    return A2AMessage(
+        from_agent=f"sip_customer_service_{call_id}",
+        to_agent="sip_loan_specialist_1",
+        type="specialist_query",
+        content={"query": "What are your loan rates?", "call_id": call_id, "request_id": request_id},
+    )
+
+
+def test_timeout_covers_the_wait_for_a_free_slot(monkeypatch):
+    # One slot, held longer than the timeout by the first query
+    agent = make_agent(monkeypatch, llm_delay=0.5, timeout=0.2, concurrency=1)
+
+    async def scenario():
+        await agent.handle_specialist_query(query("CAfirst", "r1"))
+        await agent.handle_specialist_query(query("CAsecond", "r2"))
+        await asyncio.sleep(0.3)
+        # The second query has waited past its timeout without ever getting the slot
+        return {content["request_id"]: content for content in agent.a2a.sent}
+
+    answered = asyncio.run(scenario())
+    assert answered["r1"]["error"] == "timeout"
+    assert answered["r2"]["error"] == "timeout"
+
+
+def test_unanswered_question_is_dropped_from_the_history(monkeypatch):
+    agent = make_agent(monkeypatch, llm_delay=0.3, timeout=0.1, concurrency=8)
+
+    async def scenario():
+        await agent.handle_specialist_query(query("CAcall", "r1"))
+        await asyncio.sleep(0.2)
+        agent.session.pipeline.llm.delay = 0.0
+        await agent.handle_specialist_query(query("CAcall", "r2"))
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert [content.get("error") for content in agent.a2a.sent] == ["timeout", None]
+    roles = [item.role for item in agent._histories["CAcall"].items]
+    assert roles == [ChatRole.SYSTEM, ChatRole.USER, ChatRole.ASSISTANT]
+
+
+class RecordingCache:
+    """Answer cache stand-in that never hits and records every lookup and store."""
+
+    def __init__(self):
+        self.lookups = []
+        self.stored = []
+
+    async def get(self, query, instructions):
+        self.lookups.append(query)
+        return None, None
+
+    async def put(self, query, response, instructions, llm_seconds, vector=None):
+        self.stored.append(query)
+
+    def stats(self):
+        return {}
+
+
+def test_follow_up_turns_bypass_the_answer_cache(monkeypatch):
+    agent = make_agent(monkeypatch, llm_delay=0.0, timeout=1.0, concurrency=8)
+    agent.answer_cache = RecordingCache()
+
+    async def scenario():
+        await agent.answer_query("CAcall", "What are your loan rates?")
+        await agent.answer_query("CAcall", "And for that one?")
+
+    asyncio.run(scenario())
+    assert agent.answer_cache.lookups == ["What are your loan rates?"]
+    assert agent.answer_cache.stored == ["What are your loan rates?"]
+
+
+def test_retry_of_a_failed_first_turn_is_still_a_first_turn(monkeypatch):
+    agent = make_agent(monkeypatch, llm_delay=0.3, timeout=0.1, concurrency=8)
+    agent.answer_cache = RecordingCache()
+
+    async def scenario():
+        await agent.handle_specialist_query(query("CAcall", "r1"))
+        await asyncio.sleep(0.2)
+        agent.session.pipeline.llm.delay = 0.0
+        await agent.handle_specialist_query(query("CAcall", "r2"))
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert [content.get("error") for content in agent.a2a.sent] == ["timeout", None]
+    assert len(agent.answer_cache.lookups) == 2
+    assert agent.answer_cache.stored == ["What are your loan rates?"]
@@ -0,0 +1,72 @@
+import os
+import sys
+import subprocess
+
+from metrics import MetricsRegistry
+
+SIP_A2A_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# A worker process: records a call, writes its snapshot, then waits (or exits) as told
+WORKER = """
+import sys
+from metrics import registry, CALLS_TOTAL, ACTIVE_CALLS, CALL_PHASE_SECONDS
+CALLS_TOTAL.inc(int(sys.argv[1]))
+ACTIVE_CALLS.inc()
+CALL_PHASE_SECONDS.observe(0.2, phase="greeted")
+registry.flush(force=True)
+print("flushed", flush=True)
+if sys.argv[2] == "stay":
+    sys.stdin.read()
+"""
+
+
+def start_worker(directory: str, calls: int, stay: bool) -> subprocess.Popen:
+    worker = subprocess.Popen(
+        [sys.executable, "-c", WORKER, str(calls), "stay" if stay else "exit"],
+        cwd=SIP_A2A_DIR, env={**os.environ, "METRICS_DIR": directory},
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True,
+    )
+    assert worker.stdout.readline().strip() == "flushed"
+    return worker
+
+
+def server_registry(directory: str) -> MetricsRegistry:
+    registry = MetricsRegistry(directory=directory)
+    calls = registry.counter("sip_calls_total", "Agent jobs started")
+    registry.gauge("sip_active_calls", "Calls whose agent job is currently running")
+    registry.histogram("sip_call_phase_seconds", "Duration of each agent job phase", ["phase"])
+    calls.inc()
+    return registry
+
+
+def test_server_merges_snapshots_of_live_and_exited_workers(tmp_path):
+    directory = str(tmp_path)
+    live = start_worker(directory, calls=2, stay=True)
+    exited = start_worker(directory, calls=3, stay=False)
+    exited.wait()
+    try:
+        registry = server_registry(directory)
+        for _ in range(2):
+            # Exited workers are folded in once and their snapshot removed, so a second scrape agrees
+            rendered = registry.render()
+            assert "sip_calls_total 6.0" in rendered
+            assert 'sip_call_phase_seconds_count{phase="greeted"} 2' in rendered
+            # Gauges only count processes that are still running
+            assert "sip_active_calls 1.0" in rendered
+        assert os.listdir(directory) == [f"metrics-{live.pid}.json"]
+    finally:
+        live.stdin.close()
+        live.wait()
+
+
+def test_reset_keeps_snapshots_of_running_processes(tmp_path):
+    directory = str(tmp_path)
+    live = start_worker(directory, calls=1, stay=True)
+    exited = start_worker(directory, calls=1, stay=False)
+    exited.wait()
+    try:
+        server_registry(directory).reset_directory()
+        assert os.listdir(directory) == [f"metrics-{live.pid}.json"]
+    finally:
+        live.stdin.close()
+        live.wait()
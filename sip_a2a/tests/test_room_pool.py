@@ -0,0 +1,26 @@
+import asyncio
+
+from room_pool import RoomPool
+
+
+def test_pool_restarts_under_a_new_event_loop():
+    created = []
+
+    async def create_room():
+        created.append(f"room-{len(created)}")
+        return created[-1]
+
+    pool = RoomPool(create_room, target_size=2, max_age=60)
+
+    async def run_once():
+        await pool.start()
+        while len(pool._rooms) < 2:
+            await asyncio.sleep(0.01)
+        # acquire() sets the refill event just before stop() cancels the loop
+        room_id = await pool.acquire()
+        await asyncio.wait_for(pool.stop(), timeout=5)
+        return room_id
+
+    # Each app lifespan (and each test) runs under its own event loop
+    assert asyncio.run(run_once()) == "room-0"
+    assert asyncio.run(run_once()) == "room-2"
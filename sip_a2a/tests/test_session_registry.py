@@ -0,0 +1,165 @@
+import time
+import asyncio
+
+import pytest
+
+import session_registry as registry_module
+from session_registry import InMemorySessionRegistry, SQLiteSessionRegistry, create_session_registry
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_registry(request, tmp_path):
+    registries = []
+
+    def make(**kwargs):
+        if request.param == "memory":
+            registry = InMemorySessionRegistry(**kwargs)
+        else:
+            registry = SQLiteSessionRegistry(str(tmp_path / "sessions.db"), **kwargs)
+        registries.append(registry)
+        return registry
+
+    yield make
+    for registry in registries:
+        registry.close()
+
+
+def test_lifecycle_is_recorded_as_events(make_registry):
+    registry = make_registry()
+    start = registry.last_event_id()
+    registry.put("CA1", {"room_id": "room-1", "caller_number": "+15550001", "status": "starting"})
+    registry.update("CA1", status="greeted")
+    registry.update("CAmissing", status="greeted")
+    registry.remove("CA1", outcome="busy")
+    registry.remove("CA1")
+
+    events = registry.events_since(start)
+    assert [(e["call_id"], e["event"]) for e in events] == [("CA1", "created"), ("CA1", "greeted"), ("CA1", "ended")]
+    assert events[-1]["record"]["outcome"] == "busy"
+    assert events[-1]["record"]["owner"] == registry.owner
+    assert registry.last_event_id() == events[-1]["id"]
+    assert "CA1" not in registry
+
+
+def test_events_since_pages_in_order(make_registry):
+    registry = make_registry()
+    start = registry.last_event_id()
+    for i in range(7):
+        registry.put(f"CA{i}", {"room_id": f"room-{i}", "caller_number": None, "status": "starting"})
+
+    seen, after = [], start
+    while True:
+        page = registry.events_since(after, limit=3)
+        if not page:
+            break
+        seen.extend(e["call_id"] for e in page)
+        after = page[-1]["id"]
+    assert seen == [f"CA{i}" for i in range(7)]
+
+
+def test_find_filters_and_pages(make_registry):
+    registry = make_registry()
+    for i in range(5):
+        registry.put(f"CA{i}", {"room_id": f"room-{i}", "caller_number": f"+1555000{i}", "status": "greeted" if i % 2 else "connected"})
+    total, page = registry.find(status="greeted")
+    assert total == 2 and [call_id for call_id, _ in page] == ["CA1", "CA3"]
+    total, page = registry.find(caller="0004")
+    assert total == 1 and page[0][0] == "CA4"
+    total, page = registry.find(offset=3, limit=10)
+    assert total == 5 and [call_id for call_id, _ in page] == ["CA3", "CA4"]
+
+
+def test_calls_expire_when_their_owner_stops_heartbeating(make_registry, monkeypatch):
+    registry = make_registry(ttl=30)
+    registry.heartbeat()
+    registry.put("CA1", {"room_id": "room-1", "caller_number": None, "status": "greeted"})
+    start = registry.last_event_id()
+    assert registry.expire_stale() == 0
+
+    later = time.time() + 31
+    monkeypatch.setattr(registry_module.time, "time", lambda: later)
+    assert registry.expire_stale() == 1
+    assert registry.count() == 0
+    assert [(e["call_id"], e["event"]) for e in registry.events_since(start)] == [("CA1", "expired")]
+
+
+def test_only_dead_owners_calls_expire(tmp_path, monkeypatch):
+    path = str(tmp_path / "sessions.db")
+    live, dead = SQLiteSessionRegistry(path, ttl=30), SQLiteSessionRegistry(path, ttl=30)
+    dead.owner = "other-host:1"
+    try:
+        for registry, call_id in ((live, "CAlive"), (dead, "CAorphan")):
+            registry.heartbeat()
+            registry.put(call_id, {"room_id": call_id, "caller_number": None, "status": "greeted"})
+
+        later = time.time() + 31
+        monkeypatch.setattr(registry_module.time, "time", lambda: later)
+        live.heartbeat()
+        assert live.expire_stale() == 1
+        assert set(live.all()) == {"CAlive"}
+    finally:
+        live.close()
+        dead.close()
+
+
+def test_sqlite_registry_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first, second = SQLiteSessionRegistry(path), SQLiteSessionRegistry(path)
+    try:
+        first.put("CA1", {"room_id": "room-1", "caller_number": None, "status": "starting"})
+        second.update("CA1", status="connected")
+        assert first.get("CA1")["status"] == "connected"
+        assert [e["event"] for e in first.events_since(0)] == ["created", "connected"]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_create_session_registry(tmp_path):
+    assert isinstance(create_session_registry("memory://"), InMemorySessionRegistry)
+    registry = create_session_registry(f"sqlite:///{tmp_path / 'sessions.db'}")
+    assert isinstance(registry, SQLiteSessionRegistry) and registry.shared
+    registry.close()
+    with pytest.raises(ValueError):
+        create_session_registry("redis://localhost")
+
+
+def test_call_ended_on_another_worker_frees_the_owners_slot(monkeypatch, tmp_path):
+    import main
+    from admission import AdmissionController, ADMITTED
+    from call_history import CallHistory, CallRecord
+
+    path = str(tmp_path / "sessions.db")
+    owner = SQLiteSessionRegistry(path)
+    other_worker = SQLiteSessionRegistry(path)
+    other_worker.owner = "other-host:2"
+    admission = AdmissionController(max_active=1, max_queue=0)
+    history = CallHistory(size=8)
+    monkeypatch.setattr(main, "session_registry", owner)
+    monkeypatch.setattr(main, "admission", admission)
+    monkeypatch.setattr(main, "call_history", history)
+    monkeypatch.setattr(main, "CALL_END_WATCH_INTERVAL", 0.05)
+
+    async def scenario():
+        watcher = asyncio.create_task(main._watch_calls_ended_elsewhere())
+        await asyncio.sleep(0)
+        # This worker answered the call...
+        assert admission.try_admit("CAcross") == ADMITTED
+        owner.put("CAcross", {"room_id": "room-1", "caller_number": "+15550001", "status": "greeted"})
+        main.local_calls["CAcross"] = CallRecord("CAcross", "room-1", "+15550001")
+        # ...and Twilio's dial-complete callback reached the other one
+        other_worker.remove("CAcross", outcome="busy")
+        for _ in range(40):
+            if "CAcross" not in main.local_calls:
+                break
+            await asyncio.sleep(0.05)
+        watcher.cancel()
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        main.local_calls.pop("CAcross", None)
+        owner.close()
+        other_worker.close()
+    assert admission.stats()["active"] == 0
+    assert history.stats()["outcomes"] == {"busy": 1}
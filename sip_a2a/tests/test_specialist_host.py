@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+
+from agents.loan_agent import SIPLoanSpecialistAgent
+from specialist_host import SpecialistHost
+
+
+def shared_specialist_tasks():
+    return [task for task in asyncio.all_tasks() if task.get_name().startswith("shared-specialist") and not task.done()]
+
+
+def test_failed_start_leaves_the_host_unstarted_so_the_next_call_retries(monkeypatch):
+    monkeypatch.setenv("AGENT_MODEL", "fake")
+    ready = SIPLoanSpecialistAgent.wait_until_ready
+    attempts = []
+
+    async def flaky_ready(agent, timeout):
+        attempts.append(agent.id)
+        if len(attempts) == 1:
+            raise asyncio.TimeoutError()
+        await ready(agent, timeout)
+
+    monkeypatch.setattr(SIPLoanSpecialistAgent, "wait_until_ready", flaky_ready)
+    host = SpecialistHost(size=1, ready_timeout=5)
+
+    async def scenario():
+        with pytest.raises(asyncio.TimeoutError):
+            await host.start()
+        assert not host.started
+        # The half-started specialist was stopped rather than left running
+        assert shared_specialist_tasks() == []
+
+        await host.start()
+        assert host.started and len(host.agents) == 1
+
+        await host.close()
+        assert not host.started
+        assert shared_specialist_tasks() == []
+
+    asyncio.run(scenario())
+    assert len(attempts) == 2
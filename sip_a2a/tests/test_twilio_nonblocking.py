@@ -0,0 +1,70 @@
+import sys
+import time
+import asyncio
+
+from loadtest import StandIns, StubApiServer, serve
+
+TWILIO_LATENCY = 1.5
+
+
+def test_slow_twilio_does_not_delay_incoming_webhooks(monkeypatch):
+    import main
+
+    # Force the thread pool transport, where the blocking sync client is used
+    monkeypatch.setitem(sys.modules, "twilio.http.async_http_client", None)
+    stand_ins = StandIns(room_latency=0.0, twilio_latency=TWILIO_LATENCY, call_duration=0.2)
+    incoming_latencies = []
+    outbound_latencies = []
+
+    async def timed_post(client, latencies, url, **kwargs):
+        started_at = time.perf_counter()
+        response = await client.post(url, **kwargs)
+        latencies.append(time.perf_counter() - started_at)
+        return response
+
+    async def scenario():
+        async with serve(main, stand_ins) as client:
+            outbound = [
+                asyncio.create_task(timed_post(client, outbound_latencies, "/call/make", params={"to_number": f"+1666000{i:04d}"}))
+                for i in range(4)
+            ]
+            # Incoming calls arrive while the Twilio requests are in flight
+            await asyncio.sleep(0.1)
+            for i in range(8):
+                form = {"CallSid": f"CAnonblocking{i:020d}", "From": f"+1555000{i:04d}", "To": "+15550000000"}
+                response = await timed_post(client, incoming_latencies, "/webhook/incoming", data=form)
+                assert response.status_code == 200
+                assert "<Sip" in response.text
+                await asyncio.sleep(0.05)
+            for response in await asyncio.gather(*outbound):
+                assert response.json()["status"] == "success"
+            assert main.twilio_manager._executor is not None
+
+    asyncio.run(scenario())
+
+    assert stand_ins.api.calls_created == 4
+    assert min(outbound_latencies) >= TWILIO_LATENCY
+    # A blocked event loop would hold every webhook until the Twilio requests returned
+    assert max(incoming_latencies) < TWILIO_LATENCY / 2
+
+
+def test_hangup_starts_the_transport_on_first_use(monkeypatch):
+    import main
+    from twilio.base.client_base import ClientBase
+
+    monkeypatch.setitem(sys.modules, "twilio.http.async_http_client", None)
+    manager = main.TwilioManager()
+    api = StubApiServer(room_latency=0.0)
+
+    async def scenario():
+        base_url = await api.start()
+        monkeypatch.setattr(ClientBase, "get_hostname", lambda client, uri: base_url + uri.split("twilio.com", 1)[1])
+        try:
+            assert manager._executor is None
+            await manager.hangup("CAhangup")
+        finally:
+            await manager.aclose()
+            await api.stop()
+
+    asyncio.run(scenario())
+    assert api.calls_hung_up == 1
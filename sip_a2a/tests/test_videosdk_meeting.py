@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+
+def make_meeting(handler):
+    meeting = main.VideoSDKMeeting("token")
+    meeting.client = httpx.AsyncClient(base_url=meeting.base_url, transport=httpx.MockTransport(handler))
+    return meeting
+
+
+def test_connect_errors_are_retried():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) < 3:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"roomId": "room-1"})
+
+    assert asyncio.run(make_meeting(handler).create_room()) == "room-1"
+    assert len(attempts) == 3
+
+
+def test_read_timeouts_are_not_retried():
+    # The request reached the API and may have created a room; retrying could orphan it
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        raise httpx.ReadTimeout("timed out", request=request)
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(make_meeting(handler).create_room())
+    assert len(attempts) == 1
+
+
+def test_retryable_status_codes_are_retried():
+    statuses = [503, 429, 200]
+
+    def handler(request):
+        status = statuses.pop(0)
+        return httpx.Response(status, json={"roomId": "room-2"} if status == 200 else {})
+
+    assert asyncio.run(make_meeting(handler).create_room()) == "room-2"
+    assert not statuses
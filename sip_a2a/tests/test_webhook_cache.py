@@ -0,0 +1,125 @@
+import time
+import asyncio
+
+import pytest
+
+import webhook_cache
+from loadtest import StandIns, serve
+from webhook_cache import IdempotencyCache
+
+
+class Computation:
+    """Webhook handler stand-in that counts how often it really ran."""
+
+    def __init__(self, delay: float = 0.0, cacheable: bool = True, error: Exception = None):
+        self.delay = delay
+        self.cacheable = cacheable
+        self.error = error
+        self.runs = 0
+
+    async def __call__(self):
+        self.runs += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return f"response {self.runs}", self.cacheable
+
+
+def test_concurrent_duplicates_share_one_computation():
+    cache = IdempotencyCache("test", ttl=60)
+    compute = Computation(delay=0.05)
+
+    async def scenario():
+        return await asyncio.gather(*(cache.run("CA1", compute) for _ in range(5)))
+
+    assert asyncio.run(scenario()) == ["response 1"] * 5
+    assert compute.runs == 1
+    assert (cache.misses, cache.joined) == (1, 4)
+
+
+def test_finished_response_is_replayed_until_it_expires(monkeypatch):
+    cache = IdempotencyCache("test", ttl=60)
+    compute = Computation()
+    now = [1000.0]
+    monkeypatch.setattr(webhook_cache.time, "monotonic", lambda: now[0])
+
+    async def scenario():
+        first = await cache.run("CA1", compute)
+        now[0] += 59
+        replay = await cache.run("CA1", compute)
+        now[0] += 2
+        fresh = await cache.run("CA1", compute)
+        return first, replay, fresh
+
+    assert asyncio.run(scenario()) == ("response 1", "response 1", "response 2")
+    assert cache.replayed == 1
+
+
+def test_uncacheable_responses_and_failures_are_recomputed():
+    cache = IdempotencyCache("test", ttl=60)
+    hold = Computation(cacheable=False)
+    failing = Computation(error=RuntimeError("room API down"))
+
+    async def scenario():
+        assert await cache.run("CAhold", hold) == "response 1"
+        assert await cache.run("CAhold", hold) == "response 2"
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                await cache.run("CAfail", failing)
+
+    asyncio.run(scenario())
+    assert hold.runs == 2 and failing.runs == 2
+    assert cache.stats()["entries"] == 0
+
+
+def test_joined_duplicates_see_the_failure():
+    cache = IdempotencyCache("test", ttl=60)
+    failing = Computation(delay=0.05, error=RuntimeError("room API down"))
+
+    async def scenario():
+        return await asyncio.gather(*(cache.run("CA1", failing) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert failing.runs == 1
+
+
+def test_oldest_entries_are_evicted_beyond_the_limit():
+    cache = IdempotencyCache("test", ttl=60, max_entries=2)
+    compute = Computation()
+
+    async def scenario():
+        for key in ("CA1", "CA2", "CA3"):
+            await cache.run(key, compute)
+        await cache.run("CA1", compute)
+
+    asyncio.run(scenario())
+    assert compute.runs == 4
+
+
+def test_retry_after_a_failed_agent_launch_tries_again(monkeypatch):
+    import main
+
+    launches = []
+    launch = main.start_customer_agent_for_call
+
+    def flaky_launch(call_id, room_id, caller_number=None, was_queued=False):
+        launches.append(room_id)
+        if len(launches) == 1:
+            return {"status": "error", "call_id": call_id, "error": "worker unavailable"}
+        return launch(call_id, room_id, caller_number, was_queued=was_queued)
+
+    monkeypatch.setattr(main, "start_customer_agent_for_call", flaky_launch)
+    stand_ins = StandIns(room_latency=0.0, twilio_latency=0.0, call_duration=0.1)
+    form = {"CallSid": f"CAretry{int(time.time() * 1000):020d}", "From": "+15550001111", "To": "+15550000000"}
+
+    async def scenario():
+        async with serve(main, stand_ins) as client:
+            for _ in range(3):
+                response = await client.post("/webhook/incoming", data=form)
+                assert response.status_code == 200
+
+    asyncio.run(scenario())
+    # The failed launch is not replayed; the retry launches an agent, and later retries replay that
+    assert len(launches) == 2
+    assert stand_ins.jobs_launched == 1
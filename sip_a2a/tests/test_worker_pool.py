@@ -0,0 +1,163 @@
+import os
+import json
+import time
+import asyncio
+import queue
+import functools
+from types import SimpleNamespace
+
+from worker_pool import WorkerPool, _WorkerState
+
+
+class _Context:
+    """Picklable stand-in for a call's JobContext."""
+
+    def __init__(self, out_path: str):
+        self.out_path = out_path
+
+
+def _make_context(out_path: str) -> _Context:
+    return _Context(out_path)
+
+
+async def _record_entrypoint(ctx):
+    """Record what a pooled job sees of its job and session scope."""
+    from videosdk.agents.job import get_current_job_context
+    from videosdk.agents.event_bus import _default_event_bus, get_current_event_bus
+
+    with open(ctx.out_path, "w") as f:
+        json.dump({
+            "pid": os.getpid(),
+            "job_context_set": get_current_job_context() is ctx,
+            "session_event_bus": get_current_event_bus() is not _default_event_bus,
+        }, f)
+
+
+async def _record_warmup(out_path: str):
+    with open(out_path, "w") as f:
+        f.write(str(os.getpid()))
+
+
+async def _record_shutdown(out_path: str):
+    with open(out_path, "w") as f:
+        f.write("closed")
+
+
+async def _wait_until(predicate, timeout: float):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.05)
+
+
+def test_pooled_job_runs_with_job_context_and_session_scope(tmp_path):
+    out_path = str(tmp_path / "job.json")
+
+    async def scenario():
+        pool = WorkerPool(_record_entrypoint, size=1, calls_per_worker=1, max_calls=0, preload=(), pin_cpus=False)
+        await pool.start()
+        try:
+            await _wait_until(lambda: pool.idle_slots() == 1, timeout=30)
+            job = pool.try_dispatch("CA-pooled", functools.partial(_make_context, out_path))
+            assert job is not None and job.call_id == "CA-pooled"
+            await _wait_until(lambda: any(w["handled_calls"] == 1 and w["active_calls"] == 0 for w in pool.stats()["workers"]), timeout=30)
+        finally:
+            await pool.stop()
+
+    asyncio.run(scenario())
+
+    with open(out_path) as f:
+        seen = json.load(f)
+    assert seen["pid"] != os.getpid()
+    assert seen["job_context_set"]
+    assert seen["session_event_bus"]
+
+
+def test_workers_warm_up_before_reporting_ready(tmp_path):
+    out_path = str(tmp_path / "warmup")
+
+    async def scenario():
+        pool = WorkerPool(
+            _record_entrypoint, size=1, preload=(), pin_cpus=False,
+            warmup=functools.partial(_record_warmup, out_path),
+        )
+        await pool.start()
+        try:
+            await _wait_until(lambda: pool.idle_slots() == 1, timeout=30)
+            assert os.path.exists(out_path)
+        finally:
+            await pool.stop()
+
+    asyncio.run(scenario())
+
+
+def test_workers_shut_down_before_exiting(tmp_path):
+    job_path, shutdown_path = str(tmp_path / "job.json"), str(tmp_path / "shutdown")
+
+    async def scenario():
+        # The worker exits after its one call, and is replaced
+        pool = WorkerPool(
+            _record_entrypoint, size=1, max_calls=1, preload=(), pin_cpus=False,
+            shutdown=functools.partial(_record_shutdown, shutdown_path),
+        )
+        await pool.start()
+        try:
+            await _wait_until(lambda: pool.idle_slots() == 1, timeout=30)
+            assert pool.try_dispatch("CA-last", functools.partial(_make_context, job_path)) is not None
+            await _wait_until(lambda: os.path.exists(shutdown_path), timeout=30)
+        finally:
+            await pool.stop()
+
+    asyncio.run(scenario())
+    assert os.path.exists(job_path)
+
+
+def test_dispatch_falls_back_when_pool_disabled():
+    pool = WorkerPool(_record_entrypoint, size=0)
+    assert pool.try_dispatch("CA-fallback", functools.partial(_make_context, "unused")) is None
+
+
+def _add_fake_worker(pool: WorkerPool, pid: int, alive: bool = True) -> _WorkerState:
+    state = _WorkerState(0, SimpleNamespace(pid=pid, exitcode=None if alive else -9, is_alive=lambda: alive))
+    pool._workers[pid] = state
+    return state
+
+
+def test_worker_taking_its_last_call_stops_counting_as_idle():
+    pool = WorkerPool(_record_entrypoint, size=1, calls_per_worker=2, max_calls=3, preload=(), pin_cpus=False)
+    _add_fake_worker(pool, pid=1001)
+    pool._handle_event("ready", 1001, None)
+    assert pool.idle_slots() == 2
+
+    for call_id in ("CA1", "CA2"):
+        pool._handle_event("started", 1001, call_id)
+        pool._handle_event("finished", 1001, call_id)
+    assert pool.idle_slots() == 2
+
+    pool._handle_event("started", 1001, "CA3")
+    # It is exiting after this call, so its other slot will never take a job
+    assert pool.idle_slots() == 0
+    pool._handle_event("finished", 1001, "CA3")
+    assert pool.idle_slots() == 0
+
+
+def test_dead_workers_are_replaced_while_events_keep_arriving(monkeypatch):
+    monkeypatch.setattr(WorkerPool, "REAP_INTERVAL", 0.2)
+    pool = WorkerPool(_record_entrypoint, size=1, preload=(), pin_cpus=False)
+    pool._events = queue.Queue()
+    _add_fake_worker(pool, pid=1002, alive=False)
+    spawned = []
+    monkeypatch.setattr(pool, "_spawn", lambda: spawned.append(True))
+
+    async def scenario():
+        task = asyncio.create_task(pool._event_loop())
+        # Steady load: the events queue never goes idle for a whole reap interval
+        for _ in range(20):
+            pool._events.put(("finished", 9999, "CA-other"))
+            await asyncio.sleep(0.05)
+        pool._events.put(None)
+        await task
+
+    asyncio.run(scenario())
+    assert spawned == [True]
+    assert 1002 not in pool._workers
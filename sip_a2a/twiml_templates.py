@@ -0,0 +1,31 @@
+from xml.sax.saxutils import escape
+
+# Stands in for the room id while a template is rendered; must survive XML serialization unchanged
+ROOM_PLACEHOLDER = "__SIP_A2A_ROOM_ID__"
+
+
+class RoomTwiMLTemplate:
+    """
+    TwiML document serialized once, with only the room id substituted per request.
+
+    The document is built with the regular Twilio builders (so credentials and
+    URLs are escaped by the serializer) using ROOM_PLACEHOLDER as the room id,
+    then split into byte strings around the placeholder. Rendering is a join of
+    three byte strings.
+    """
+
+    __slots__ = ("_parts",)
+
+    def __init__(self, twiml: str):
+        """
+        Args:
+            twiml: Serialized TwiML containing ROOM_PLACEHOLDER wherever the room id goes
+        """
+        parts = twiml.split(ROOM_PLACEHOLDER)
+        if len(parts) < 2:
+            raise ValueError("TwiML template does not contain the room placeholder")
+        self._parts = [part.encode() for part in parts]
+
+    def render(self, room_id: str) -> bytes:
+        """Return the TwiML for a room as UTF-8 bytes."""
+        return escape(room_id, {'"': "&quot;"}).encode().join(self._parts)
@@ -0,0 +1,110 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_DUPLICATES = metrics_registry.counter(
+    "sip_webhook_duplicates_total",
+    "Repeated webhooks answered from the idempotency cache (replayed: after the first finished, joined: while it ran)",
+    ["webhook", "kind"],
+)
+
+# compute() returns the response and whether repeats may replay it
+Computation = Callable[[], Awaitable[Tuple[Any, bool]]]
+
+
+class IdempotencyCache:
+    """
+    Remembers the response to a webhook by key (Twilio's CallSid) so a retried
+    webhook gets the same answer without repeating its side effects.
+
+    Requests for a key that is still being handled wait for that first request
+    and share its response (single flight). Finished responses are replayed for
+    ``ttl`` seconds when the computation marked them cacheable; responses that
+    must be recomputed on every request (e.g. the hold loop) and failures are
+    forgotten as soon as they complete.
+    """
+
+    def __init__(self, webhook: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        """
+        Args:
+            webhook: Name used in logs and metrics
+            ttl: Seconds a response is replayed (env WEBHOOK_IDEMPOTENCY_TTL)
+            max_entries: Responses kept at most, oldest evicted first (env WEBHOOK_IDEMPOTENCY_SIZE)
+        """
+        self.webhook = webhook
+        self.ttl = ttl if ttl is not None else float(os.getenv("WEBHOOK_IDEMPOTENCY_TTL", 300))
+        self.max_entries = max_entries if max_entries is not None else int(os.getenv("WEBHOOK_IDEMPOTENCY_SIZE", 10000))
+        # key -> (stored_at, future); insertion order is expiry order since the TTL is fixed
+        self._entries: "OrderedDict[str, Tuple[float, asyncio.Future]]" = OrderedDict()
+        self.misses = 0
+        self.replayed = 0
+        self.joined = 0
+
+    async def run(self, key: str, compute: Computation) -> Any:
+        """Return the response for ``key``, computing it only if no request for the key ran recently."""
+        self._expire()
+        entry = self._entries.get(key)
+        if entry is not None:
+            future = entry[1]
+            kind = "replayed" if future.done() else "joined"
+            if kind == "replayed":
+                self.replayed += 1
+            else:
+                self.joined += 1
+            WEBHOOK_DUPLICATES.inc(webhook=self.webhook, kind=kind)
+            logger.info(f"Duplicate {self.webhook} webhook for {key} ({kind})")
+            # Shielded so a waiter whose client disconnects does not cancel the first request's result
+            return await asyncio.shield(future)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._entries[key] = (time.monotonic(), future)
+        try:
+            response, cacheable = await compute()
+        except asyncio.CancelledError:
+            self._forget(key, future)
+            future.cancel()
+            raise
+        except Exception as e:
+            self._forget(key, future)
+            future.set_exception(e)
+            # Mark retrieved so the event loop does not warn when no duplicate was waiting
+            future.exception()
+            raise
+        if not cacheable:
+            self._forget(key, future)
+        future.set_result(response)
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "ttl": self.ttl,
+            "misses": self.misses,
+            "replayed": self.replayed,
+            "joined": self.joined,
+        }
+
+    def _forget(self, key: str, future: asyncio.Future):
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is future:
+            del self._entries[key]
+
+    def _expire(self):
+        now = time.monotonic()
+        for _ in range(len(self._entries)):
+            key, (stored_at, future) = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_entries and now - stored_at < self.ttl:
+                break
+            if future.done():
+                del self._entries[key]
+            else:
+                # Still running: keep it so duplicates keep joining it
+                self._entries.move_to_end(key)
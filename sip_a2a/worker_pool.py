@@ -0,0 +1,381 @@
+import asyncio
+import os
+import time
+import queue
+import logging
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from metrics import registry as metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Heavy modules imported once by the fork server, so forked workers start warm
+DEFAULT_PRELOAD = (
+    "videosdk.agents",
+    "videosdk.plugins.openai",
+    "videosdk.plugins.google",
+    "session_manager",
+    "agents.customer_agent",
+    "agents.loan_agent",
+)
+
+WORKER_SPAWN_READY_SECONDS = metrics_registry.histogram(
+    "sip_worker_spawn_ready_seconds",
+    "Time from starting a pooled worker process until it is ready to take calls",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+WORKER_DISPATCHES = metrics_registry.counter(
+    "sip_worker_dispatches_total",
+    "Calls launched through the worker pool (pooled) or a fresh WorkerJob (fallback)",
+    ["result"],
+)
+
+
+class PooledJob:
+    """Handle for a call dispatched to a pooled worker."""
+
+    __slots__ = ("call_id", "dispatched_at")
+
+    def __init__(self, call_id: str):
+        self.call_id = call_id
+        self.dispatched_at = time.monotonic()
+
+
+class _WorkerState:
+    __slots__ = ("index", "process", "spawned_at", "ready_at", "active", "handled", "retiring")
+
+    def __init__(self, index: int, process: multiprocessing.Process):
+        self.index = index
+        self.process = process
+        self.spawned_at = time.monotonic()
+        self.ready_at: Optional[float] = None
+        self.active = 0
+        self.handled = 0
+        # Took its last call (max_calls) and exits once its calls end
+        self.retiring = False
+
+
+class WorkerPool:
+    """
+    Pre-forked agent worker processes that take calls from a shared queue.
+
+    Workers are forked from a fork server that has already imported the agent
+    SDKs and plugins, and stay alive across calls, so a call does not pay for
+    process spawn and imports the way a fresh WorkerJob does. Each worker is
+    pinned to one of the available cores and runs up to ``calls_per_worker``
+    calls at once; it is replaced after ``max_calls`` calls, or if it dies.
+    """
+
+    # Consecutive workers allowed to die before becoming ready before respawning stops
+    MAX_STARTUP_FAILURES = 3
+    # Seconds between checks for exited workers, however busy the events queue is
+    REAP_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        entrypoint: Callable[[Any], Any],
+        size: Optional[int] = None,
+        calls_per_worker: Optional[int] = None,
+        max_calls: Optional[int] = None,
+        preload: Sequence[str] = DEFAULT_PRELOAD,
+        pin_cpus: Optional[bool] = None,
+        warmup: Optional[Callable[[], Any]] = None,
+        shutdown: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Args:
+            entrypoint: Module-level async function run with the job context of each call
+            size: Number of worker processes (env WORKER_POOL_SIZE, 0 disables the pool, "auto" uses every core)
+            calls_per_worker: Concurrent calls per worker (env WORKER_CALLS_PER_PROCESS)
+            max_calls: Calls a worker handles before it is replaced (env WORKER_MAX_CALLS, 0 for no limit)
+            preload: Modules the fork server imports before forking workers
+            pin_cpus: Pin each worker to one core (env WORKER_POOL_PIN_CPUS)
+            warmup: Module-level async function each worker awaits before it reports ready
+            shutdown: Module-level async function each worker awaits before it exits
+        """
+        self._entrypoint = entrypoint
+        self._warmup = warmup
+        self._shutdown = shutdown
+        self._cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else list(range(os.cpu_count() or 1))
+
+        if size is None:
+            configured = os.getenv("WORKER_POOL_SIZE", "0")
+            size = len(self._cpus) if configured == "auto" else int(configured)
+        self.size = max(0, size)
+        self.calls_per_worker = max(1, calls_per_worker if calls_per_worker is not None else int(os.getenv("WORKER_CALLS_PER_PROCESS", 1)))
+        self.max_calls = max_calls if max_calls is not None else int(os.getenv("WORKER_MAX_CALLS", 100))
+        self.pin_cpus = pin_cpus if pin_cpus is not None else os.getenv("WORKER_POOL_PIN_CPUS", "true").lower() == "true"
+
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._mp = multiprocessing.get_context(method)
+        if method == "forkserver":
+            self._mp.set_forkserver_preload(list(preload))
+
+        self._jobs = None
+        self._events = None
+        self._workers: Dict[int, _WorkerState] = {}
+        self._next_index = 0
+        # Calls queued for the pool that no worker has picked up yet
+        self._pending = 0
+        self._event_task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._startup_failures = 0
+
+        metrics_registry.gauge("sip_worker_pool_idle_slots", "Call slots free in pooled worker processes").set_function(self.idle_slots)
+        metrics_registry.gauge("sip_worker_pool_rss_bytes", "Resident memory of all pooled worker processes").set_function(
+            lambda: sum(rss or 0 for rss in (_rss_bytes(pid) for pid in self._workers))
+        )
+
+    @property
+    def started(self) -> bool:
+        return self._event_task is not None
+
+    async def start(self):
+        """Fork the workers and start collecting their events."""
+        if self.size <= 0 or self.started:
+            return
+        self._stopping = False
+        self._jobs = self._mp.Queue()
+        self._events = self._mp.Queue()
+        for _ in range(self.size):
+            self._spawn()
+        self._event_task = asyncio.create_task(self._event_loop())
+        logger.info(f"Worker pool started with {self.size} worker(s) (calls_per_worker={self.calls_per_worker})")
+
+    async def stop(self, timeout: float = 10.0):
+        """Ask workers to exit once their current calls end; terminate stragglers after ``timeout``."""
+        if not self.started:
+            return
+        self._stopping = True
+        for _ in self._workers:
+            self._jobs.put(None)
+
+        loop = asyncio.get_running_loop()
+        deadline = time.monotonic() + timeout
+        for state in list(self._workers.values()):
+            await loop.run_in_executor(None, state.process.join, max(0.0, deadline - time.monotonic()))
+            if state.process.is_alive():
+                logger.warning(f"Worker {state.process.pid} did not exit in time, terminating")
+                state.process.terminate()
+
+        self._events.put(None)
+        await self._event_task
+        self._event_task = None
+        self._workers.clear()
+        logger.info("Worker pool stopped")
+
+    def idle_slots(self) -> int:
+        """Call slots that ready workers can take right now."""
+        free = sum(
+            self.calls_per_worker - state.active
+            for state in self._workers.values()
+            if state.ready_at is not None and not state.retiring
+        )
+        return max(0, free - self._pending)
+
+    def try_dispatch(self, call_id: str, make_context: Callable[[], Any]) -> Optional[PooledJob]:
+        """
+        Hand a call to an idle worker.
+
+        Args:
+            call_id: Call the job belongs to
+            make_context: Picklable factory building the call's JobContext
+
+        Returns:
+            PooledJob, or None when no worker is idle and the caller should launch the job itself
+        """
+        if not self.started or self.idle_slots() <= 0:
+            WORKER_DISPATCHES.inc(result="fallback")
+            return None
+        self._pending += 1
+        self._jobs.put((call_id, make_context))
+        WORKER_DISPATCHES.inc(result="pooled")
+        return PooledJob(call_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return per-worker readiness, load and memory."""
+        workers: List[Dict[str, Any]] = []
+        for pid, state in self._workers.items():
+            workers.append({
+                "pid": pid,
+                "cpu": self._cpu_for(state.index),
+                "ready": state.ready_at is not None,
+                "spawn_to_ready_ms": round((state.ready_at - state.spawned_at) * 1000, 1) if state.ready_at else None,
+                "active_calls": state.active,
+                "handled_calls": state.handled,
+                "retiring": state.retiring,
+                "rss_bytes": _rss_bytes(pid),
+            })
+        return {
+            "size": self.size,
+            "calls_per_worker": self.calls_per_worker,
+            "idle_slots": self.idle_slots(),
+            "pending": self._pending,
+            "workers": workers,
+        }
+
+    def _cpu_for(self, index: int) -> Optional[int]:
+        return self._cpus[index % len(self._cpus)] if self.pin_cpus and self._cpus else None
+
+    def _spawn(self):
+        index = self._next_index
+        self._next_index += 1
+        process = self._mp.Process(
+            target=_worker_main,
+            args=(self._entrypoint, self._jobs, self._events, self._cpu_for(index), self.calls_per_worker, self.max_calls, self._warmup, self._shutdown),
+            name=f"sip-agent-worker-{index}",
+            daemon=True,
+        )
+        state = _WorkerState(index, process)
+        process.start()
+        self._workers[process.pid] = state
+
+    def _reap(self):
+        """Replace workers that exited or died."""
+        for pid, state in list(self._workers.items()):
+            if state.process.is_alive():
+                continue
+            self._workers.pop(pid, None)
+            if state.active:
+                logger.error(f"Worker {pid} exited with code {state.process.exitcode} during {state.active} call(s)")
+            if state.ready_at is None:
+                self._startup_failures += 1
+                logger.error(f"Worker {pid} exited with code {state.process.exitcode} before becoming ready")
+            if self._stopping:
+                continue
+            if self._startup_failures >= self.MAX_STARTUP_FAILURES:
+                logger.error("Worker pool stopped respawning after repeated startup failures; calls fall back to WorkerJob")
+                continue
+            self._spawn()
+
+    def _handle_event(self, kind: str, pid: int, call_id: Optional[str]):
+        state = self._workers.get(pid)
+        if state is None:
+            return
+        if kind == "ready":
+            self._startup_failures = 0
+            state.ready_at = time.monotonic()
+            spawn_to_ready = state.ready_at - state.spawned_at
+            WORKER_SPAWN_READY_SECONDS.observe(spawn_to_ready)
+            logger.info(f"Worker {pid} ready on cpu {self._cpu_for(state.index)} in {spawn_to_ready * 1000:.0f}ms (rss={_rss_bytes(pid)})")
+        elif kind == "started":
+            self._pending = max(0, self._pending - 1)
+            state.active += 1
+            state.handled += 1
+            logger.info(f"Worker {pid} picked up call {call_id}")
+            if 0 < self.max_calls <= state.handled:
+                # The worker leaves its job loop now; its free slots would never be used
+                state.retiring = True
+                logger.info(f"Worker {pid} took its last call ({state.handled}), retiring")
+        elif kind == "finished":
+            state.active = max(0, state.active - 1)
+
+    async def _event_loop(self):
+        loop = asyncio.get_running_loop()
+        next_reap_at = time.monotonic() + self.REAP_INTERVAL
+        while True:
+            try:
+                event = await loop.run_in_executor(None, self._events.get, True, self.REAP_INTERVAL)
+            except queue.Empty:
+                event = ()
+            if event is None:
+                return
+            if event:
+                self._handle_event(*event)
+            # On a timer rather than only when idle: under steady load the queue never runs empty
+            if time.monotonic() >= next_reap_at:
+                self._reap()
+                next_reap_at = time.monotonic() + self.REAP_INTERVAL
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, from /proc (None where unavailable)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _worker_main(entrypoint, jobs, events, cpu: Optional[int], calls_per_worker: int, max_calls: int, warmup=None, shutdown=None):
+    """Body of a pooled worker process."""
+    if cpu is not None and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, {cpu})
+        except OSError as e:
+            logger.warning(f"Could not pin worker {os.getpid()} to cpu {cpu}: {e}")
+    asyncio.run(_worker_loop(entrypoint, jobs, events, calls_per_worker, max_calls, warmup, shutdown))
+
+
+async def _worker_loop(entrypoint, jobs, events, calls_per_worker: int, max_calls: int, warmup=None, shutdown=None):
+    pid = os.getpid()
+    loop = asyncio.get_running_loop()
+    slots = asyncio.Semaphore(calls_per_worker)
+    tasks = set()
+    handled = 0
+
+    if warmup is not None:
+        # Failing to warm up only costs the first call its head start
+        try:
+            await warmup()
+        except Exception as e:
+            logger.error(f"Worker {pid} warmup failed: {e}", exc_info=True)
+    events.put(("ready", pid, None))
+    while max_calls <= 0 or handled < max_calls:
+        await slots.acquire()
+        job = await loop.run_in_executor(None, jobs.get)
+        if job is None:
+            break
+        call_id, make_context = job
+        handled += 1
+        events.put(("started", pid, call_id))
+        task = asyncio.create_task(_run_job(entrypoint, call_id, make_context, events, slots))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    if shutdown is not None:
+        try:
+            await shutdown()
+        except Exception as e:
+            logger.error(f"Worker {pid} shutdown failed: {e}", exc_info=True)
+
+
+async def run_in_job_scope(entrypoint, job_context):
+    """
+    Run an agent entrypoint the way WorkerJob does: with the job context set
+    and a fresh per-session metrics collector and event bus bound to it.
+
+    Must be awaited in the task that runs the call, since both are context
+    variables.
+    """
+    from videosdk.agents.job import (
+        _set_current_job_context,
+        _reset_current_job_context,
+        _enter_session_scope,
+        _exit_session_scope,
+    )
+
+    token = _set_current_job_context(job_context)
+    session_token = _enter_session_scope()
+    try:
+        return await entrypoint(job_context)
+    finally:
+        _exit_session_scope(session_token)
+        _reset_current_job_context(token)
+
+
+async def _run_job(entrypoint, call_id: str, make_context, events, slots: asyncio.Semaphore):
+    pid = os.getpid()
+    try:
+        await run_in_job_scope(entrypoint, make_context())
+    except Exception as e:
+        logger.error(f"Pooled job for call {call_id} failed in worker {pid}: {e}", exc_info=True)
+    finally:
+        slots.release()
+        events.put(("finished", pid, call_id))
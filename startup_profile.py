@@ -0,0 +1,207 @@
+"""
+Import-time profile and regression check for every entry point in the repo.
+
+Each entry point is loaded (not run: its ``__main__`` block is skipped) in a
+fresh interpreter with ``python -X importtime``, and the report shows how long
+the process took to become ready and which imports it spent that time on.
+
+Usage:
+    python startup_profile.py                          # report for every entry point
+    python startup_profile.py sip_a2a/main.py --depth 3
+    python startup_profile.py --save startup_baseline.json
+    python startup_profile.py --check startup_baseline.json --tolerance 0.4
+
+Import times vary by about 25% between runs on a busy machine, so --save and
+--check keep the best of 5 runs (against 3 for a plain report) and the check
+only fails on growth beyond that noise.
+"""
+import os
+import sys
+import glob
+import json
+import argparse
+import subprocess
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Runs per entry point when no --repeat is given: a baseline and the check against it compare like with like
+REPORT_REPEAT = 3
+BASELINE_REPEAT = 5
+
+ENTRY_POINTS = (
+    "gemini.py",
+    "openai.py",
+    "aws.py",
+    "basicAgents/*.py",
+    "fuctionTools/*.py",
+    "mcp/mcp.py",
+    "sip_a2a/main.py",
+)
+
+# Placeholders so entry points that check their configuration at import time still load
+PLACEHOLDER_ENV = (
+    "VIDEOSDK_API_KEY", "VIDEOSDK_SECRET_KEY", "VIDEOSDK_TOKEN", "VIDEOSDK_SIP_USERNAME", "VIDEOSDK_SIP_PASSWORD",
+    "GOOGLE_API_KEY", "OPENAI_API_KEY", "TWILIO_ACCOUNT_SID", "TWILIO_AUTH_TOKEN", "TWILIO_PHONE_NUMBER",
+)
+
+# The repo root goes last on sys.path, since its example scripts (openai.py, ...) share names with packages
+LOADER = (
+    "import os, sys, time, runpy; started_at = time.perf_counter(); "
+    "path = sys.argv[1]; sys.path.insert(0, os.path.dirname(path)); sys.path.append({root!r}); "
+    "runpy.run_path(path, run_name='__startup_profile__'); "
+    "sys.stdout.write(str(time.perf_counter() - started_at))"
+)
+
+
+class ImportNode:
+    """One import from the -X importtime output, with the imports it triggered."""
+
+    __slots__ = ("name", "self_us", "cumulative_us", "children")
+
+    def __init__(self, name: str, self_us: int, cumulative_us: int):
+        self.name = name
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.children: List["ImportNode"] = []
+
+
+def parse_importtime(stderr: str) -> List[ImportNode]:
+    """
+    Build the import tree from ``-X importtime`` output.
+
+    Lines are printed when an import finishes, so children come before their
+    parent; nesting depth is the indentation of the module name.
+    """
+    pending: Dict[int, List[ImportNode]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            node = ImportNode(name.strip(), int(self_us), int(cumulative_us))
+        except ValueError:
+            continue
+        # "| json", "|   json.decoder", "|     json.scanner"
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        node.children = pending.pop(depth + 1, [])
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def profile_entry_point(path: str, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Load one entry point ``repeat`` times and keep the fastest run.
+
+    Returns:
+        status, ready_ms (time to load the module once the interpreter is up), import_ms (all imports,
+        including the interpreter's own) and the import tree
+    """
+    env = dict(os.environ)
+    for name in PLACEHOLDER_ENV:
+        env.setdefault(name, f"startup-profile-{name.lower()}")
+
+    best: Optional[Dict[str, Any]] = None
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", LOADER.format(root=ROOT), path],
+            cwd=os.path.dirname(path), env=env, capture_output=True, text=True,
+        )
+        roots = parse_importtime(proc.stderr)
+        if proc.returncode != 0:
+            error = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+            return {"status": "error", "error": error[-1] if error else f"exit code {proc.returncode}", "roots": roots}
+        result = {
+            "status": "ok",
+            "ready_ms": round(float(proc.stdout.strip().splitlines()[-1]) * 1000, 1),
+            "import_ms": round(sum(node.cumulative_us for node in roots) / 1000, 1),
+            "roots": roots,
+        }
+        if best is None or result["import_ms"] < best["import_ms"]:
+            best = result
+    return best
+
+
+def find_entry_points(patterns: List[str]) -> List[str]:
+    paths: List[str] = []
+    for pattern in patterns:
+        paths.extend(sorted(glob.glob(os.path.join(ROOT, pattern))))
+    return paths
+
+
+def print_tree(nodes: List[ImportNode], depth: int, min_ms: float, indent: int = 1):
+    for node in sorted(nodes, key=lambda n: n.cumulative_us, reverse=True):
+        if node.cumulative_us / 1000 < min_ms:
+            break
+        print(f"{'  ' * indent}{node.cumulative_us / 1000:9.1f} ms  {node.name}")
+        if indent < depth:
+            print_tree(node.children, depth, min_ms, indent + 1)
+
+
+def check_regressions(results: Dict[str, Dict[str, Any]], baseline: Dict[str, float], tolerance: float, slack_ms: float) -> List[str]:
+    """Entry points whose import time grew beyond the baseline by more than the tolerance."""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        if result["status"] != "ok":
+            regressions.append(f"{name}: failed to load ({result['error']})")
+            continue
+        limit = baseline[name] * (1 + tolerance) + slack_ms
+        if result["import_ms"] > limit:
+            regressions.append(f"{name}: {result['import_ms']} ms > {limit:.1f} ms (baseline {baseline[name]} ms)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time profile of the repo's entry points")
+    parser.add_argument("entry_points", nargs="*", help="Entry points (paths or globs relative to the repo root); default: all")
+    parser.add_argument("--repeat", type=int, default=None,
+                        help=f"Runs per entry point; the fastest is reported (default: {REPORT_REPEAT}, "
+                             f"or {BASELINE_REPEAT} with --save/--check)")
+    parser.add_argument("--depth", type=int, default=2, help="Levels of the import tree to show")
+    parser.add_argument("--min-ms", type=float, default=5.0, help="Hide imports faster than this")
+    parser.add_argument("--json", action="store_true", help="Print import times as JSON instead of trees")
+    parser.add_argument("--save", metavar="BASELINE", help="Write import times to a baseline file")
+    parser.add_argument("--check", metavar="BASELINE", help="Fail if import time regressed against a baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.4, help="Allowed relative growth over the baseline")
+    parser.add_argument("--slack-ms", type=float, default=50.0, help="Allowed absolute growth over the baseline (noise floor)")
+    args = parser.parse_args(argv)
+    if args.repeat is None:
+        args.repeat = BASELINE_REPEAT if args.save or args.check else REPORT_REPEAT
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for path in find_entry_points(args.entry_points or list(ENTRY_POINTS)):
+        name = os.path.relpath(path, ROOT)
+        results[name] = profile_entry_point(path, args.repeat)
+
+    if args.json:
+        print(json.dumps({name: {k: v for k, v in result.items() if k != "roots"} for name, result in results.items()}, indent=2))
+    else:
+        for name, result in results.items():
+            if result["status"] != "ok":
+                print(f"{name}: failed to load ({result['error']})")
+                continue
+            print(f"{name}: ready in {result['ready_ms']} ms, imports {result['import_ms']} ms")
+            print_tree(result["roots"], args.depth, args.min_ms)
+
+    if args.save:
+        baseline = {name: result["import_ms"] for name, result in results.items() if result["status"] == "ok"}
+        with open(args.save, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Saved baseline for {len(baseline)} entry point(s) to {args.save}")
+
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)
+        regressions = check_regressions(results, baseline, args.tolerance, args.slack_ms)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No import-time regressions against {args.check}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())